@@ -1,7 +1,16 @@
-import covjsonkit.api
-import covjsonkit.decoder.TimeSeries
-import covjsonkit.decoder.VerticalProfile
-import covjsonkit.encoder.TimeSeries
-import covjsonkit.encoder.VerticalProfile
+import importlib
 
 from .version import __version__
+
+
+def __getattr__(name):
+    # Submodules such as covjsonkit.api are imported on first access so that
+    # `import covjsonkit` does not pull in xarray, pandas and pydantic
+    try:
+        module = importlib.import_module(f".{name}", __name__)
+    except ModuleNotFoundError as e:
+        if e.name != f"{__name__}.{name}":
+            raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = module
+    return module
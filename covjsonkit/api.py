@@ -1,50 +1,72 @@
+import importlib
 import logging
+from collections.abc import Mapping
 
-from conflator import Conflator
-
-import covjsonkit.decoder.BoundingBox
-import covjsonkit.decoder.Frame
-import covjsonkit.decoder.Path
-import covjsonkit.decoder.Shapefile
-import covjsonkit.decoder.TimeSeries
-import covjsonkit.decoder.VerticalProfile
-import covjsonkit.decoder.Wkt
-import covjsonkit.encoder.BoundingBox
-import covjsonkit.encoder.Frame
-import covjsonkit.encoder.Path
-import covjsonkit.encoder.Shapefile
-import covjsonkit.encoder.TimeSeries
-import covjsonkit.encoder.VerticalProfile
-import covjsonkit.encoder.Wkt
-
-from .config import CovjsonKitConfig
-
-features_encoder = {
-    "pointseries": covjsonkit.encoder.TimeSeries.TimeSeries,
-    "verticalprofile": covjsonkit.encoder.VerticalProfile.VerticalProfile,
-    "boundingbox": covjsonkit.encoder.BoundingBox.BoundingBox,
-    "shapefile": covjsonkit.encoder.Shapefile.Shapefile,
-    "frame": covjsonkit.encoder.Frame.Frame,
-    "path": covjsonkit.encoder.Path.Path,
-    "polygon": covjsonkit.encoder.Wkt.Wkt,
-}
-features_decoder = {
-    "pointseries": covjsonkit.decoder.TimeSeries.TimeSeries,
-    "verticalprofile": covjsonkit.decoder.VerticalProfile.VerticalProfile,
-    "boundingbox": covjsonkit.decoder.BoundingBox.BoundingBox,
-    "shapefile": covjsonkit.decoder.Shapefile.Shapefile,
-    "frame": covjsonkit.decoder.Frame.Frame,
-    "path": covjsonkit.decoder.Path.Path,
-    "polygon": covjsonkit.decoder.Wkt.Wkt,
-}
+
+class FeatureRegistry(Mapping):
+    """
+    Maps feature types to encoder or decoder classes, importing each
+    feature module the first time it is looked up.
+    """
+
+    def __init__(self, package, modules):
+        self.package = package
+        self.modules = modules
+        self._classes = {}
+
+    def __getitem__(self, feature_type):
+        try:
+            return self._classes[feature_type]
+        except KeyError:
+            pass
+        module_name = self.modules[feature_type]
+        module = importlib.import_module(f"{self.package}.{module_name}")
+        feature = getattr(module, module_name)
+        self._classes[feature_type] = feature
+        return feature
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def __len__(self):
+        return len(self.modules)
+
+
+features_encoder = FeatureRegistry(
+    "covjsonkit.encoder",
+    {
+        "pointseries": "TimeSeries",
+        "verticalprofile": "VerticalProfile",
+        "boundingbox": "BoundingBox",
+        "shapefile": "Shapefile",
+        "frame": "Frame",
+        "path": "Path",
+        "polygon": "Wkt",
+    },
+)
+features_decoder = FeatureRegistry(
+    "covjsonkit.decoder",
+    {
+        "pointseries": "TimeSeries",
+        "verticalprofile": "VerticalProfile",
+        "boundingbox": "BoundingBox",
+        "shapefile": "Shapefile",
+        "frame": "Frame",
+        "path": "Path",
+        "polygon": "Wkt",
+        "grid": "Grid",
+    },
+)
 
 
 class Covjsonkit:
     def __init__(self, config=None):
+        # conflator pulls in pydantic, so only import it once a kit is created
+        from .config import CovjsonKitConfig, default_config
+
         # If no config check default locations
         if config is None:
-            self.conf = Conflator(app_name="covjsonkit", model=CovjsonKitConfig).load()
-            logging.debug("Config loaded from file: %s", self.conf)  # noqa: E501
+            self.conf = default_config()
         # else initialise with provided config
         else:
             self.conf = CovjsonKitConfig.model_validate(config)
@@ -58,7 +80,11 @@ class Covjsonkit:
         feature = self._feature_factory(domaintype.lower(), "encoder")
         return feature(self.conf, domaintype)
 
-    def decode(self, covjson):
+    def decode(self, covjson, parse_hook=None):
+        # Parse files and bytes here, the domain type picks the decoder
+        from .decoder.decoder import load_covjson
+
+        covjson = load_covjson(covjson, parse_hook=parse_hook)
         requesttype = covjson["domainType"]
         if requesttype == "timeseries":
             requesttype = "PointSeries"
@@ -69,6 +95,31 @@ class Covjsonkit:
         feature = self._feature_factory(requesttype.lower(), "decoder")
         return feature(covjson)
 
+    def stream(self, covjson):
+        """Open a CoverageCollection to read its coverages one at a time."""
+        from .decoder.stream import CoverageStream
+
+        return CoverageStream(covjson, decoder=self.decode)
+
+    def merge(self, collections):
+        """
+        Merge CoverageCollections (dictionaries, paths, files or bytes) with
+        the same domainType and referencing into one dictionary.
+        """
+        from .decoder.merge import merge
+
+        return merge(collections)
+
+    def concat(self, sources, out=None):
+        """
+        Merge CoverageCollections as ``merge`` does, splicing their JSON
+        rather than parsing their coverages. Returns the JSON, or writes it
+        to ``out``.
+        """
+        from .decoder.merge import concat
+
+        return concat(sources, out=out)
+
     def _feature_factory(self, feature_type, encoder_decoder):
         if encoder_decoder == "encoder":
             features = features_encoder
@@ -1,5 +1,26 @@
-from conflator import ConfigModel
+import functools
+import logging
+
+from conflator import ConfigModel, Conflator
 
 
 class CovjsonKitConfig(ConfigModel):
     param_db: str = "ecmwf"
+    # Write each distinct domain once and refer to it from later coverages
+    shared_domain: bool = False
+    # Write regular lat/lon grids as Grid domains rather than point lists
+    grid_domain: bool = False
+    # Write evenly spaced time axes as start/stop/num
+    compact_time: bool = False
+
+
+@functools.lru_cache(maxsize=None)
+def default_config():
+    """
+    Load the covjsonkit config from the default locations. This happens
+    on first use rather than on import and only once per process; pass a
+    config to Covjsonkit to override it for a single instance.
+    """
+    conf = Conflator(app_name="covjsonkit", model=CovjsonKitConfig).load()
+    logging.debug("Config loaded from file: %s", conf)  # noqa: E501
+    return conf
@@ -1,4 +1,4 @@
-import xarray as xr
+import numpy as np
 
 from .decoder import Decoder
 
@@ -35,71 +35,24 @@ class BoundingBox(Decoder):
     def get_coordinates(self):
         return self.domains[0]["axes"]
 
-    def to_geopandas(self):
-        pass
+    def to_xarray(self, dtype=np.float64, lazy=False, chunks=None):
+        import xarray as xr
 
-    def to_xarray(self):
         dims = ["datetimes", "number", "steps", "points"]
         dataarraydict = {}
 
         # Get coordinates
-        x = []
-        y = []
-        z = []
-        datetimes = []
-        for coord in self.get_coordinates()["composite"]["values"]:
-            x.append(float(coord[0]))
-            y.append(float(coord[1]))
-            z.append(float(coord[2]))
-        for datetime in self.get_coordinates()["t"]["values"]:
-            datetimes.append(datetime)
+        composite = np.asarray(self.get_coordinates()["composite"]["values"], dtype=np.float64)
+        x = composite[:, 0]
+        y = composite[:, 1]
+        z = composite[:, 2]
 
-        values = {}
-        for parameter in self.parameters:
-            values[parameter] = {}
-
-        datetimes = []
-        numbers = []
-        steps = []
-        for coverage in self.coverages:
-            if "number" not in coverage["mars:metadata"]:
-                coverage["mars:metadata"]["number"] = 0
-            numbers.append(coverage["mars:metadata"]["number"])
-            if "step" not in coverage["mars:metadata"]:
-                coverage["mars:metadata"]["step"] = 0
-            steps.append(coverage["mars:metadata"]["step"])
-            datetimes.append(coverage["domain"]["axes"]["t"]["values"][0])
-            for parameter in self.parameters:
-                # values[parameter].append(coverage["ranges"][parameter]["values"])
-                if coverage["domain"]["axes"]["t"]["values"][0] not in values[parameter]:
-                    values[parameter][coverage["domain"]["axes"]["t"]["values"][0]] = {}
-                if (
-                    coverage["mars:metadata"]["number"]
-                    not in values[parameter][coverage["domain"]["axes"]["t"]["values"][0]]
-                ):
-                    values[parameter][coverage["domain"]["axes"]["t"]["values"][0]][
-                        coverage["mars:metadata"]["number"]
-                    ] = {}
-                values[parameter][coverage["domain"]["axes"]["t"]["values"][0]][coverage["mars:metadata"]["number"]][
-                    coverage["mars:metadata"]["step"]
-                ] = coverage["ranges"][parameter]["values"]
-
-        datetimes = list(set(datetimes))
-        numbers = list(set(numbers))
-        steps = list(set(steps))
-
-        new_values = {}
-        for parameter in values.keys():
-            new_values[parameter] = []
-            for i, datetime in enumerate(datetimes):
-                new_values[parameter].append([])
-                for j, number in enumerate(numbers):
-                    new_values[parameter][i].append([])
-                    for k, step in enumerate(steps):
-                        new_values[parameter][i][j].append(values[parameter][datetime][number][step])
+        (datetimes, numbers, steps), positions = self.index.cube("datetime", "number", "step")
 
         for parameter in self.parameters:
-            dataarray = xr.DataArray(new_values[parameter], dims=dims)
+            dataarray = xr.DataArray(
+                self.range_array(parameter, positions, dtype=dtype, lazy=lazy, chunks=chunks), dims=dims
+            )
             dataarray.attrs["type"] = self.get_parameter_metadata(parameter)["type"]
             dataarray.attrs["units"] = self.get_parameter_metadata(parameter)["unit"]["symbol"]
             dataarray.attrs["long_name"] = self.get_parameter_metadata(parameter)["observedProperty"]["id"]
@@ -111,7 +64,7 @@ class BoundingBox(Decoder):
                 datetimes=(["datetimes"], datetimes),
                 number=(["number"], numbers),
                 steps=(["steps"], steps),
-                points=(["points"], list(range(0, len(x)))),
+                points=(["points"], np.arange(len(x))),
                 x=(["points"], x),
                 y=(["points"], y),
                 z=(["points"], z),
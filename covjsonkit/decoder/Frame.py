@@ -1,4 +1,4 @@
-import xarray as xr
+import numpy as np
 
 from .decoder import Decoder
 
@@ -32,23 +32,21 @@ class Frame(Decoder):
     def get_coordinates(self):
         return self.domains[0]["axes"]
 
-    def to_geopandas(self):
-        pass
+    def to_xarray(self, dtype=np.float64, lazy=False, chunks=None):
+        import xarray as xr
 
-    def to_xarray(self):
         dims = ["points"]
         dataarraydict = {}
 
         # Get coordinates
-        x = []
-        y = []
-        for coord in self.get_coordinates()["composite"]["values"]:
-            x.append(float(coord[0]))
-            y.append(float(coord[1]))
+        composite = np.asarray(self.get_coordinates()["composite"]["values"], dtype=np.float64)
+        x = composite[:, 0]
+        y = composite[:, 1]
 
         # Get values
         for parameter in self.parameters:
-            dataarray = xr.DataArray(self.get_values()[parameter][0], dims=dims)
+            values = self.range_array(parameter, np.array([0]), dtype=dtype, lazy=lazy, chunks=chunks)[0]
+            dataarray = xr.DataArray(values, dims=dims)
             dataarray.attrs["type"] = self.get_parameter_metadata(parameter)["type"]
             dataarray.attrs["units"] = self.get_parameter_metadata(parameter)["unit"]["symbol"]
             dataarray.attrs["long_name"] = self.get_parameter_metadata(parameter)["observedProperty"]["id"]
@@ -56,7 +54,7 @@ class Frame(Decoder):
 
         ds = xr.Dataset(
             dataarraydict,
-            coords=dict(points=(["points"], list(range(0, len(x)))), x=(["points"], x), y=(["points"], y)),
+            coords=dict(points=(["points"], np.arange(len(x))), x=(["points"], x), y=(["points"], y)),
         )
         for mars_metadata in self.mars_metadata[0]:
             ds.attrs[mars_metadata] = self.mars_metadata[0][mars_metadata]
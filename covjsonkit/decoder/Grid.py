@@ -0,0 +1,133 @@
+import numpy as np
+
+from .decoder import Decoder
+from .spatial import in_lon_range
+
+GRID_DIMS = ["z", "x", "y"]
+
+
+def axis_values(axis):
+    if "values" in axis:
+        return np.asarray(axis["values"])
+    return np.linspace(axis["start"], axis["stop"], axis["num"])
+
+
+class Grid(Decoder):
+    def __init__(self, covjson):
+        super().__init__(covjson)
+        self.domains = self.get_domains()
+        self.ranges = self.get_ranges()
+
+    def get_domains(self):
+        domains = []
+        for coverage in self.coverage.coverages:
+            domains.append(coverage["domain"])
+        return domains
+
+    def get_ranges(self):
+        ranges = []
+        for coverage in self.coverage.coverages:
+            ranges.append(coverage["ranges"])
+        return ranges
+
+    def get_values(self):
+        values = {}
+        for parameter in self.parameters:
+            values[parameter] = []
+            for range in self.ranges:
+                values[parameter].append(range[parameter]["values"])
+        return values
+
+    def get_coordinates(self):
+        return self.domains[0]["axes"]
+
+    def stack_ranges(self, parameter, positions, dtype=np.float64):
+        # Ranges are laid out z, x, y whatever their axisNames
+        axes = self.get_coordinates()
+        shape = tuple(len(axis_values(axes[dim])) for dim in GRID_DIMS)
+        stacked = np.full(positions.shape + shape, np.nan, dtype=dtype)
+        for cell in zip(*np.nonzero(positions >= 0)):
+            range = self.coverages[positions[cell]]["ranges"][parameter]
+            # None (missing) becomes NaN
+            array = np.asarray(range["values"], dtype=dtype).reshape(range["shape"])
+            stacked[cell] = array.transpose([range["axisNames"].index(dim) for dim in GRID_DIMS])
+        return stacked
+
+    def domain_points(self, domain):
+        axes = domain["axes"]
+        grid = np.meshgrid(*(axis_values(axes[dim]) for dim in GRID_DIMS), indexing="ij")
+        return {dim: values.ravel() for dim, values in zip(GRID_DIMS, grid)}
+
+    def coverage_values(self, coverage, parameter, dtype=np.float64):
+        range = coverage["ranges"][parameter]
+        array = np.asarray(range["values"], dtype=dtype).reshape(range["shape"])
+        return array.transpose([range["axisNames"].index(dim) for dim in GRID_DIMS]).ravel()
+
+    def subset_domain(self, domain, bbox=None, time_range=None, date=None):
+        # The x and y axes are cut separately so that the domain stays a grid
+        axes = domain["axes"]
+        if bbox is None:
+            return domain, None
+        lat_min, lon_min, lat_max, lon_max = bbox
+        x, y = axis_values(axes["x"]), axis_values(axes["y"])
+        keep = {
+            "x": np.flatnonzero((x >= lat_min) & (x <= lat_max)),
+            "y": np.flatnonzero(in_lon_range(y, lon_min, lon_max)),
+        }
+        if len(keep["x"]) == 0 or len(keep["y"]) == 0:
+            return None, None
+        if len(keep["x"]) == len(x) and len(keep["y"]) == len(y):
+            return domain, None
+        cut = dict(axes, x={"values": x[keep["x"]]}, y={"values": y[keep["y"]]})
+        return dict(domain, axes=cut), keep
+
+    def subset_range(self, range, selection):
+        array = np.asarray(range["values"]).reshape(range["shape"])
+        for axis, dim in enumerate(range["axisNames"]):
+            if dim in selection:
+                array = np.take(array, selection[dim], axis=axis)
+        values = array.ravel()
+        return dict(range, shape=list(array.shape), values=values.tolist() if values.dtype == object else values)
+
+    def to_xarray(self, dtype=np.float64, lazy=False, chunks=None):
+        import xarray as xr
+
+        axes = self.get_coordinates()
+        x = axis_values(axes["x"])
+        y = axis_values(axes["y"])
+        z = axis_values(axes["z"])
+
+        (datetimes, numbers, steps), positions = self.index.cube("datetime", "number", "step")
+
+        dims = ["datetimes", "number", "steps"] + GRID_DIMS
+        values = {
+            parameter: self.range_array(parameter, positions, dtype=dtype, lazy=lazy, chunks=chunks)
+            for parameter in self.parameters
+        }
+
+        dataarraydict = {}
+        for parameter in self.parameters:
+            dataarray = xr.DataArray(values[parameter], dims=dims)
+            dataarray.attrs["type"] = self.get_parameter_metadata(parameter)["type"]
+            dataarray.attrs["units"] = self.get_parameter_metadata(parameter)["unit"]["symbol"]
+            dataarray.attrs["long_name"] = self.get_parameter_metadata(parameter)["observedProperty"]["id"]
+            dataarraydict[dataarray.attrs["long_name"]] = dataarray
+
+        ds = xr.Dataset(
+            dataarraydict,
+            coords=dict(
+                datetimes=(["datetimes"], datetimes),
+                number=(["number"], numbers),
+                steps=(["steps"], steps),
+                z=(["z"], z),
+                x=(["x"], x),
+                y=(["y"], y),
+            ),
+        )
+        for mars_metadata in self.mars_metadata[0]:
+            ds.attrs[mars_metadata] = self.mars_metadata[0][mars_metadata]
+
+        # Add date attribute
+        ds.attrs["date"] = self.get_coordinates()["t"]["values"][0]
+
+        return ds
@@ -1,9 +1,13 @@
-import xarray as xr
+import numpy as np
+
+from covjsonkit.encoder.valid_time import valid_times
 
 from .decoder import Decoder
 
 
 class Path(Decoder):
+    timed_points = True
+
     def __init__(self, covjson):
         super().__init__(covjson)
         self.domains = self.get_domains()
@@ -32,68 +36,33 @@ class Path(Decoder):
     def get_coordinates(self):
         return self.domains[0]["axes"]
 
-    def to_geopandas(self):
-        pass
+    def point_times(self, points, date):
+        # The t of a trajectory point is its step in hours
+        t = np.asarray(points["t"])
+        if t.dtype.kind not in "iuf":
+            return t
+        if date is None:
+            raise ValueError("Trajectory coverages need a forecast date to be matched on time")
+        return valid_times(date, t)
+
+    def to_xarray(self, dtype=np.float64, lazy=False, chunks=None):
+        import xarray as xr
 
-    def to_xarray(self):
         dims = ["datetimes", "number", "steps", "points"]
         dataarraydict = {}
 
         # Get coordinates
-        x = []
-        y = []
-        t = []
-        for coord in self.get_coordinates()["composite"]["values"]:
-            x.append(float(coord[1]))
-            y.append(float(coord[2]))
-            t.append(coord[0])
+        composite = self.get_coordinates()["composite"]["values"]
+        t = [coord[0] for coord in composite]
+        x = np.array([coord[1] for coord in composite], dtype=np.float64)
+        y = np.array([coord[2] for coord in composite], dtype=np.float64)
 
-        values = {}
-        for parameter in self.parameters:
-            values[parameter] = {}
-
-        datetimes = []
-        numbers = []
-        steps = []
-        for coverage in self.coverages:
-            if "number" not in coverage["mars:metadata"]:
-                coverage["mars:metadata"]["number"] = 0
-            numbers.append(coverage["mars:metadata"]["number"])
-            if "step" not in coverage["mars:metadata"]:
-                coverage["mars:metadata"]["step"] = 0
-            steps.append(coverage["mars:metadata"]["step"])
-            datetimes.append(coverage["mars:metadata"]["Forecast date"])
-            for parameter in self.parameters:
-                # values[parameter].append(coverage["ranges"][parameter]["values"])
-                if coverage["mars:metadata"]["Forecast date"] not in values[parameter]:
-                    values[parameter][coverage["mars:metadata"]["Forecast date"]] = {}
-                if (
-                    coverage["mars:metadata"]["number"]
-                    not in values[parameter][coverage["mars:metadata"]["Forecast date"]]
-                ):
-                    values[parameter][coverage["mars:metadata"]["Forecast date"]][
-                        coverage["mars:metadata"]["number"]
-                    ] = {}
-                values[parameter][coverage["mars:metadata"]["Forecast date"]][coverage["mars:metadata"]["number"]][
-                    coverage["mars:metadata"]["step"]
-                ] = coverage["ranges"][parameter]["values"]
-
-        datetimes = list(set(datetimes))
-        numbers = list(set(numbers))
-        steps = list(set(steps))
-
-        new_values = {}
-        for parameter in values.keys():
-            new_values[parameter] = []
-            for i, datetime in enumerate(datetimes):
-                new_values[parameter].append([])
-                for j, number in enumerate(numbers):
-                    new_values[parameter][i].append([])
-                    for k, step in enumerate(steps):
-                        new_values[parameter][i][j].append(values[parameter][datetime][number][step])
+        (datetimes, numbers, steps), positions = self.index.cube("Forecast date", "number", "step")
 
         for parameter in self.parameters:
-            dataarray = xr.DataArray(new_values[parameter], dims=dims)
+            dataarray = xr.DataArray(
+                self.range_array(parameter, positions, dtype=dtype, lazy=lazy, chunks=chunks), dims=dims
+            )
             dataarray.attrs["type"] = self.get_parameter_metadata(parameter)["type"]
             dataarray.attrs["units"] = self.get_parameter_metadata(parameter)["unit"]["symbol"]
             dataarray.attrs["long_name"] = self.get_parameter_metadata(parameter)["observedProperty"]["id"]
@@ -105,7 +74,7 @@ class Path(Decoder):
                 datetimes=(["datetimes"], datetimes),
                 number=(["number"], numbers),
                 steps=(["steps"], steps),
-                points=(["points"], list(range(0, len(x)))),
+                points=(["points"], np.arange(len(x))),
                 x=(["points"], x),
                 y=(["points"], y),
                 t=(["points"], t),
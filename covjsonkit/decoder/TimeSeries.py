@@ -1,10 +1,11 @@
-import pandas as pd
-import xarray as xr
+import numpy as np
 
-from .decoder import Decoder
+from .decoder import Decoder, time_index, time_values
 
 
 class TimeSeries(Decoder):
+    timed_points = True
+
     def __init__(self, covjson):
         super().__init__(covjson)
         self.domains = self.get_domains()
@@ -39,8 +40,8 @@ class TimeSeries(Decoder):
             x = domain["axes"]["x"]["values"][0]
             y = domain["axes"]["y"]["values"][0]
             z = domain["axes"]["z"]["values"][0]
-            fct = domain["axes"]["t"]["values"][0]
-            ts = domain["axes"]["t"]["values"]
+            ts = time_values(domain["axes"]["t"])
+            fct = ts[0]
             if "number" in self.mars_metadata[ind]:
                 num = self.mars_metadata[ind]["number"]
             else:
@@ -54,11 +55,25 @@ class TimeSeries(Decoder):
                 coord_dict[param].append(coords)
         return coord_dict
 
-    def to_geopandas(self):
-        pass
+    def domain_points(self, domain):
+        axes = domain["axes"]
+        t = np.asarray(time_values(axes["t"]))
+        points = {dim: np.full(len(t), axes[dim]["values"][0], dtype=np.float64) for dim in ("x", "y", "z")}
+        points["t"] = t
+        return points
+
+    def cut_domain(self, domain, positions):
+        axis = domain["axes"]["t"]
+        if "values" in axis:
+            t = [axis["values"][position] for position in positions]
+        else:
+            t = [value + "Z" for value in np.datetime_as_string(time_values(axis)[positions], unit="s").tolist()]
+        return dict(domain, axes=dict(domain["axes"], t={"values": t}))
 
     # function to convert covjson to xarray dataset
-    def to_xarray(self):
+    def to_xarray(self, dtype=np.float64, lazy=False, chunks=None):
+        import xarray as xr
+
         dims = ["x", "y", "z", "number", "datetime", "t"]
         dataarraydict = {}
 
@@ -67,40 +82,17 @@ class TimeSeries(Decoder):
         x = coords[0]["axes"]["x"]["values"]
         y = coords[0]["axes"]["y"]["values"]
         z = coords[0]["axes"]["z"]["values"]
-        steps = coords[0]["axes"]["t"]["values"]
-        steps = [step.replace("Z", "") for step in steps]
-        steps = pd.to_datetime(steps)
+        steps = time_index(coords[0]["axes"]["t"])
         # steps = list(range(len(steps)))
 
-        num = []
-        datetime = []
-        for coverage in self.covjson["coverages"]:
-            num.append(coverage["mars:metadata"]["number"])
-            datetime.append(coverage["mars:metadata"]["Forecast date"])
-
-        nums = list(set(num))
-        datetime = list(set(datetime))
-
-        param_values = {}
-
-        for parameter in self.parameters:
-            param_values[parameter] = []
-            for i, num in enumerate(nums):
-                param_values[parameter].append([])
-                for j, date in enumerate(datetime):
-                    param_values[parameter][i].append([])
-                    for k, step in enumerate(steps):
-                        for coverage in self.covjson["coverages"]:
-                            if (
-                                coverage["mars:metadata"]["number"] == num
-                                and coverage["mars:metadata"]["Forecast date"] == date
-                            ):
-                                param_values[parameter][i][j] = coverage["ranges"][parameter]["values"]
+        (nums, datetime), positions = self.index.cube("number", "Forecast date")
 
         for parameter in self.parameters:
             param_coords = {"x": x, "y": y, "z": z, "number": nums, "datetime": datetime, "t": steps}
+            values = self.range_array(parameter, positions, dtype=dtype, lazy=lazy, chunks=chunks)
+            values = values[np.newaxis, np.newaxis, np.newaxis]
             dataarray = xr.DataArray(
-                [[[param_values[parameter]]]],
+                values,
                 dims=dims,
                 coords=param_coords,
                 name=parameter,
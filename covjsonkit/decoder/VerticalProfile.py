@@ -1,10 +1,11 @@
-import pandas as pd
-import xarray as xr
+import numpy as np
 
-from .decoder import Decoder
+from .decoder import Decoder, time_values
 
 
 class VerticalProfile(Decoder):
+    timed_points = True
+
     def __init__(self, covjson):
         super().__init__(covjson)
         self.domains = self.get_domains()
@@ -30,7 +31,7 @@ class VerticalProfile(Decoder):
         for ind, domain in enumerate(self.domains):
             x = domain["axes"]["x"]["values"][0]
             y = domain["axes"]["y"]["values"][0]
-            t = domain["axes"]["t"]["values"]
+            t = time_values(domain["axes"]["t"])
             zs = domain["axes"]["z"]["values"]
             num = self.mars_metadata[ind]["number"]
             for param in self.parameters:
@@ -50,10 +51,17 @@ class VerticalProfile(Decoder):
                 values[parameter].append(range[parameter]["values"])
         return values
 
-    def to_geopandas(self):
-        pass
+    def domain_points(self, domain):
+        axes = domain["axes"]
+        z = np.asarray(axes["z"]["values"], dtype=np.float64)
+        points = {dim: np.full(len(z), axes[dim]["values"][0], dtype=np.float64) for dim in ("x", "y")}
+        points["z"] = z
+        points["t"] = np.repeat(np.asarray(time_values(axes["t"]))[:1], len(z))
+        return points
+
+    def to_xarray(self, dtype=np.float64, lazy=False, chunks=None):
+        import xarray as xr
 
-    def to_xarray(self):
         dims = [
             "x",
             "y",
@@ -69,40 +77,8 @@ class VerticalProfile(Decoder):
         x = coords[0]["axes"]["x"]["values"]
         y = coords[0]["axes"]["y"]["values"]
         z = coords[0]["axes"]["z"]["values"]
-        steps = coords[0]["axes"]["t"]["values"]
-        steps = [step.replace("Z", "") for step in steps]
-        steps = pd.to_datetime(steps)
-        # steps = list(range(len(steps)))
-
-        num = []
-        datetime = []
-        steps = []
-        for coverage in self.covjson["coverages"]:
-            num.append(coverage["mars:metadata"]["number"])
-            datetime.append(coverage["mars:metadata"]["Forecast date"])
-            steps.append(coverage["mars:metadata"]["step"])
 
-        nums = list(set(num))
-        datetime = list(set(datetime))
-        steps = list(set(steps))
-
-        param_values = {}
-
-        for parameter in self.parameters:
-            param_values[parameter] = []
-            for i, num in enumerate(nums):
-                param_values[parameter].append([])
-                for j, date in enumerate(datetime):
-                    param_values[parameter][i].append([])
-                    for k, step in enumerate(steps):
-                        param_values[parameter][i][j].append([])
-                        for coverage in self.covjson["coverages"]:
-                            if (
-                                coverage["mars:metadata"]["number"] == num
-                                and coverage["mars:metadata"]["Forecast date"] == date
-                                and coverage["mars:metadata"]["step"] == step
-                            ):
-                                param_values[parameter][i][j][k] = coverage["ranges"][parameter]["values"]
+        (nums, datetime, steps), positions = self.index.cube("number", "Forecast date", "step")
 
         for parameter in self.parameters:
             param_coords = {
@@ -114,8 +90,10 @@ class VerticalProfile(Decoder):
                 "z": z,
             }
 
+            values = self.range_array(parameter, positions, dtype=dtype, lazy=lazy, chunks=chunks)
+            values = values[np.newaxis, np.newaxis]
             dataarray = xr.DataArray(
-                [[param_values[parameter]]],
+                values,
                 dims=dims,
                 coords=param_coords,
                 name=parameter,
@@ -1,22 +1,170 @@
-import json
+import functools
+import io
+import logging
+import mmap
+import operator
+import os
+import time
 from abc import ABC, abstractmethod
 
+import numpy as np
+import orjson
+
 from covjsonkit.Coverage import Coverage
 from covjsonkit.CoverageCollection import CoverageCollection
+from covjsonkit.encoder.valid_time import valid_times
+
+from .index import CoverageIndex
+from .spatial import SpatialIndex, in_bbox
+from .stream import loaded_range
+
+
+def _read_file(f):
+    try:
+        fileno = f.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return f.read()
+    # Map regular files read from the start so orjson parses the page
+    # cache without a copy
+    if os.fstat(fileno).st_size == 0 or f.tell() != 0:
+        return f.read()
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+def load_covjson(covjson, parse_hook=None):
+    """
+    Load CoverageJSON from a dictionary (returned as it is), a path, bytes,
+    a bytearray, a memoryview or a file object opened in either mode.
+
+    Files are memory-mapped where possible and everything is parsed with
+    orjson. ``parse_hook``, if given, is called with the parse time in
+    seconds and the number of bytes parsed.
+    """
+    if isinstance(covjson, dict):
+        return covjson
+
+    start = time.perf_counter()
+    if isinstance(covjson, (str, os.PathLike)):
+        with open(covjson, "rb") as f:
+            data = _read_file(f)
+    elif isinstance(covjson, (bytes, bytearray, memoryview)):
+        data = covjson
+    elif hasattr(covjson, "read"):
+        data = _read_file(covjson)
+    else:
+        raise TypeError("Covjson must be a dictionary, a covjson file or covjson bytes")
+
+    if isinstance(data, mmap.mmap):
+        try:
+            with memoryview(data) as view:
+                size = len(view)
+                result = orjson.loads(view)
+        finally:
+            data.close()
+    else:
+        size = len(data)
+        result = orjson.loads(data)
+
+    elapsed = time.perf_counter() - start
+    logging.debug("Parsed %s bytes of covjson in %s", size, elapsed)  # noqa: E501
+    if parse_hook is not None:
+        parse_hook(elapsed, size)
+    return result
+
+
+def time_values(axis):
+    """
+    The values of a t axis. Listed values are returned as they are, a
+    compact start/stop/num axis is expanded to a numpy.datetime64 range
+    without going through strings.
+    """
+    if "values" in axis:
+        return axis["values"]
+    start = np.datetime64(axis["start"].rstrip("Z"))
+    if axis["num"] == 1:
+        return np.array([start])
+    stop = np.datetime64(axis["stop"].rstrip("Z"))
+    return start + (stop - start) // (axis["num"] - 1) * np.arange(axis["num"])
+
+
+def time_index(axis):
+    """A t axis as a pandas DatetimeIndex, in UTC without a time zone."""
+    import pandas as pd
+
+    values = time_values(axis)
+    if "values" in axis:
+        values = [value.replace("Z", "") for value in values]
+    return pd.to_datetime(values)
+
+
+def datetimes(values):
+    """
+    Times as numpy.datetime64 in UTC, without a time zone. Numbers, and
+    values that are not all times, are returned as they are.
+    """
+    import pandas as pd
+
+    values = np.asarray(values)
+    if values.dtype.kind in "biufmM":
+        return values
+    try:
+        return pd.to_datetime(values, utc=True, format="ISO8601").tz_convert(None).to_numpy()
+    except (TypeError, ValueError):
+        return values
+
+
+def time_mask(values, time_range):
+    """Whether each time is within ``time_range``, a (start, end) pair where either may be None."""
+    times = datetimes(values)
+    mask = np.ones(len(times), dtype=bool)
+    start, end = time_range
+    if start is not None:
+        mask &= times >= datetimes([start])[0]
+    if end is not None:
+        mask &= times <= datetimes([end])[0]
+    return mask
+
+
+def take(values, positions):
+    """
+    The items of a list, or rows of an array, at ``positions``. Lists parsed
+    from JSON are picked from rather than converted to an array first, so
+    the cost is that of the items taken.
+    """
+    if isinstance(values, list):
+        if len(positions) == 0:
+            return []
+        items = operator.itemgetter(*positions)(values)
+        return list(items) if len(positions) > 1 else [items]
+    return np.asarray(values)[positions]
+
+
+def composite_columns(composite):
+    """The columns of a composite axis, named after its coordinates."""
+    names = composite.get("coordinates", ["x", "y", "z"])
+    values = composite["values"]
+    if len(values) == 0:
+        return {name: np.empty(0) for name in names}
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        array = np.asarray(values, dtype=object)
+    array = array.reshape(len(values), -1)
+    return {name: array[:, i] for i, name in enumerate(names[: array.shape[1]])}
 
 
 class Decoder(ABC):
+    # Whether the points of a domain have valid times of their own (see
+    # point_times) rather than the valid time of their coverage
+    timed_points = False
+
     def __init__(self, covjson):
-        # if python dictionary no need for loading, otherwise load json file
-        if isinstance(covjson, dict):
-            self.covjson = covjson
-        elif isinstance(covjson, str):
-            with open(covjson) as json_file:
-                self.covjson = json.load(json_file)
-        else:
-            raise TypeError("Covjson must be dictionary or covjson file")
+        # if python dictionary no need for loading, otherwise load json file or bytes
+        self.covjson = load_covjson(covjson)
 
         self.type = self.get_type()
+        if self.type == "CoverageCollection":
+            self.resolve_domains()
 
         if self.type == "Coverage":
             self.coverage = Coverage(self.covjson)
@@ -33,6 +181,318 @@ class Decoder(ABC):
     def get_type(self):
         return self.covjson["type"]
 
+    def resolve_domains(self):
+        # Shared domains: coverages may refer to the domain of an earlier
+        # coverage by its id instead of repeating it. Referring coverages are
+        # copied with the domain, so the covjson passed in is left as it is
+        domains = {}
+        coverages = []
+        for coverage in self.covjson["coverages"]:
+            domain = coverage["domain"]
+            if isinstance(domain, str):
+                if domain not in domains:
+                    raise ValueError(f"Unresolved domain reference: {domain}")
+                coverage = {**coverage, "domain": domains[domain]}
+            elif "id" in domain:
+                domains[domain["id"]] = domain
+            coverages.append(coverage)
+        if domains:
+            self.covjson = {**self.covjson, "coverages": coverages}
+
+    @functools.cached_property
+    def index(self):
+        """A CoverageIndex of the coverages, built the first time it is used."""
+        return CoverageIndex.from_coverages(self.coverages)
+
+    def select(self, **query):
+        """
+        The coverages whose mars metadata match the query, in order, e.g.
+        ``select(number=1, step=[0, 6])``. See CoverageIndex.
+        """
+        return [self.coverages[position] for position in self.index.positions(**query)]
+
+    def stack_ranges(self, parameter, positions, dtype=np.float64):
+        """
+        The values of a parameter in the coverages at ``positions`` (an array
+        of positions, -1 where there is no coverage) as one array, with the
+        shape of ``positions`` followed by that of the values. Values that are
+        missing, or null, are NaN.
+        """
+        present = positions >= 0
+        values = [self.coverages[position]["ranges"][parameter]["values"] for position in positions[present]]
+        try:
+            block = np.array(values, dtype=dtype)
+        except ValueError:
+            raise ValueError(f"Ranges of {parameter} do not all have the same shape") from None
+        if len(values) == 0:
+            block = block.reshape(0, 0)
+        if len(values) == positions.size:
+            return block.reshape(positions.shape + block.shape[1:])
+        stacked = np.full(positions.shape + block.shape[1:], np.nan, dtype=dtype)
+        stacked[present] = block
+        return stacked
+
+    def range_array(self, parameter, positions, dtype=np.float64, lazy=False, chunks=None):
+        """
+        ``stack_ranges``, or with ``lazy`` a dask array that decodes the
+        coverages of each chunk (see lazy.lazy_ranges) only when computed.
+        """
+        if not lazy:
+            return self.stack_ranges(parameter, positions, dtype=dtype)
+        from .lazy import lazy_ranges
+
+        return lazy_ranges(self, parameter, positions, dtype=dtype, chunks=chunks)
+
+    def domain_points(self, domain):
+        """
+        The coordinates of each value of a coverage on ``domain``, as arrays
+        by axis name. Composite domains by default.
+        """
+        return composite_columns(domain["axes"]["composite"])
+
+    def coverage_values(self, coverage, parameter, dtype=np.float64):
+        """The values of a parameter in a coverage as a flat array, in the order of ``domain_points``."""
+        return np.asarray(coverage["ranges"][parameter]["values"], dtype=dtype).ravel()
+
+    @functools.cached_property
+    def spatial_index(self):
+        """
+        A SpatialIndex of the points of the coverages (x is the latitude, y
+        the longitude), built the first time it is used. Every coverage must
+        have the points of the first.
+        """
+        domains = {id(coverage["domain"]): coverage["domain"] for coverage in self.coverages}
+        if not domains:
+            return SpatialIndex([], [])
+        points = [self.domain_points(domain) for domain in domains.values()]
+        lats, lons = (np.asarray(points[0][axis], dtype=np.float64) for axis in ("x", "y"))
+        for other in points[1:]:
+            if not (np.array_equal(other["x"], lats) and np.array_equal(other["y"], lons)):
+                raise ValueError("Coverages do not all have the same points")
+        return SpatialIndex(lats, lons)
+
+    def point_values(self, points, dtype=np.float64):
+        """
+        The values of each parameter at ``points`` (positions in the points of
+        ``spatial_index``) in every coverage, as arrays of coverages by points.
+        Parameters missing from a coverage are NaN.
+        """
+        points = np.asarray(points, dtype=np.intp)
+        values = {}
+        for parameter in self.parameters:
+            block = np.full((len(self.coverages), len(points)), np.nan, dtype=dtype)
+            for position, coverage in enumerate(self.coverages):
+                if parameter in coverage["ranges"]:
+                    block[position] = self.coverage_values(coverage, parameter, dtype=dtype)[points]
+            values[parameter] = block
+        return values
+
+    def nearest(self, lat, lon, k=1, dtype=np.float64):
+        """
+        The positions of the ``k`` points nearest to (lat, lon), nearest
+        first, and ``point_values`` at them.
+        """
+        points, _ = self.spatial_index.nearest(lat, lon, k)
+        return points, self.point_values(points, dtype=dtype)
+
+    def within(self, bbox, dtype=np.float64):
+        """
+        The positions of the points inside ``bbox`` (lat_min, lon_min,
+        lat_max, lon_max; see SpatialIndex.within) and ``point_values`` at them.
+        """
+        points = self.spatial_index.within(bbox)
+        return points, self.point_values(points, dtype=dtype)
+
+    def coverage_date(self, coverage):
+        """
+        The forecast date of a coverage: its "Forecast date", or else the
+        first time of its t axis. None when it has neither.
+        """
+        date = coverage.get("mars:metadata", {}).get("Forecast date")
+        if date is None and "t" in coverage["domain"]["axes"]:
+            date = time_values(coverage["domain"]["axes"]["t"])[0]
+        return date
+
+    def valid_time(self, coverage):
+        """
+        The valid time of a coverage, its forecast date plus its step in
+        hours, as numpy.datetime64. None when it has no forecast date.
+        """
+        date = self.coverage_date(coverage)
+        if date is None:
+            return None
+        return valid_times(date, [coverage.get("mars:metadata", {}).get("step", 0)])[0]
+
+    def point_times(self, points, date):
+        """
+        The valid time of each of ``points`` (see ``domain_points``) in a
+        coverage of forecast ``date``, for domains with ``timed_points``.
+        """
+        return points["t"]
+
+    def point_mask(self, domain, bbox=None, time_range=None, date=None):
+        """
+        Whether each point of ``domain`` (see ``domain_points``) is inside
+        ``bbox`` and, if it has ``timed_points``, ``time_range``. Other
+        points have the valid time of their coverage, which ``subset``
+        matches before cutting the domain.
+        """
+        points = self.domain_points(domain)
+        mask = np.ones(len(next(iter(points.values()))), dtype=bool)
+        if bbox is not None:
+            mask &= in_bbox(points["x"], points["y"], bbox)
+        if time_range is not None and self.timed_points:
+            mask &= time_mask(self.point_times(points, date), time_range)
+        return mask
+
+    def subset_domain(self, domain, bbox=None, time_range=None, date=None):
+        """
+        The domain cut to the points inside ``bbox`` and ``time_range`` (see
+        ``point_mask``) and the selection that ``subset_range`` cuts its
+        ranges with: the positions of the points kept, or None when all are.
+        The domain is None when no point is kept.
+        """
+        mask = self.point_mask(domain, bbox=bbox, time_range=time_range, date=date)
+        if mask.all():
+            return domain, None
+        if not mask.any():
+            return None, None
+        positions = np.flatnonzero(mask)
+        return self.cut_domain(domain, positions), positions
+
+    def cut_domain(self, domain, positions):
+        """A composite domain with only the points at ``positions``."""
+        composite = domain["axes"]["composite"]
+        axes = dict(domain["axes"], composite=dict(composite, values=take(composite["values"], positions)))
+        return dict(domain, axes=axes)
+
+    def subset_range(self, range, selection):
+        """A range with only the values at the positions in ``selection``."""
+        return dict(range, shape=[len(selection)], values=take(range["values"], selection))
+
+    def subset(self, parameters=None, numbers=None, steps=None, time_range=None, bbox=None, as_bytes=False):
+        """
+        A CoverageCollection with only the coverages, parameters and points
+        matching every argument given: ``numbers`` and ``steps`` as in
+        ``select``, ``time_range`` as a (start, end) pair of times (either may
+        be None) and ``bbox`` as (lat_min, lon_min, lat_max, lon_max), see
+        spatial.in_bbox. ``time_range`` is matched against valid times, the
+        forecast date plus the step: the time of each point for domains with
+        ``timed_points`` (time series, vertical profiles and trajectories),
+        otherwise that of each coverage (see ``valid_time``). Range values
+        are cut with index arrays, and ranges and domains that are not cut
+        are shared with this collection. Shared domains stay shared. Values
+        left in the buffer by ``CoverageStream.decode_lazily`` are parsed.
+        Returns a dictionary, or with ``as_bytes`` its JSON.
+        """
+        if self.type != "CoverageCollection":
+            raise TypeError("Only a CoverageCollection can be subset")
+        if parameters is None:
+            parameters = self.parameters
+        elif isinstance(parameters, str):
+            parameters = [parameters]
+        for parameter in parameters:
+            if parameter not in self.covjson["parameters"]:
+                raise KeyError(f"Coverages have no parameter {parameter!r}")
+
+        query = {}
+        if numbers is not None:
+            query["number"] = numbers
+        if steps is not None:
+            query["step"] = steps
+
+        domains = {}
+        written = set()
+        coverages = []
+        for position in self.index.positions(**query):
+            coverage = self.coverages[position]
+            domain = coverage["domain"]
+            date = None
+            if time_range is not None:
+                if self.timed_points:
+                    date = self.coverage_date(coverage)
+                else:
+                    valid = self.valid_time(coverage)
+                    if valid is not None and not time_mask([valid], time_range)[0]:
+                        continue
+            # Coverages sharing a domain are cut once
+            key = (id(domain), date)
+            if key not in domains:
+                domains[key] = self.subset_domain(domain, bbox=bbox, time_range=time_range, date=date)
+            cut, selection = domains[key]
+            if cut is None:
+                continue
+
+            ranges = {}
+            for parameter in parameters:
+                if parameter in coverage["ranges"]:
+                    range = loaded_range(coverage["ranges"][parameter])
+                    ranges[parameter] = range if selection is None else self.subset_range(range, selection)
+            if "id" in cut and id(cut) in written:
+                cut = cut["id"]
+            else:
+                written.add(id(cut))
+            coverages.append(dict(coverage, domain=cut, ranges=ranges))
+
+        covjson = {key: value for key, value in self.covjson.items() if key != "coverages"}
+        covjson["parameters"] = {parameter: self.covjson["parameters"][parameter] for parameter in parameters}
+        covjson["coverages"] = coverages
+        if as_bytes:
+            return orjson.dumps(covjson, option=orjson.OPT_SERIALIZE_NUMPY)
+        return covjson
+
+    def to_pandas(self, dtype=np.float64):
+        """
+        The coverages as a long DataFrame: a row per value of each coverage,
+        with its coordinates, number, step and forecast date, and a column per
+        parameter. Columns are built from arrays a coverage at a time.
+        """
+        import pandas as pd
+
+        points = {}
+        coverage_points = []
+        for coverage in self.coverages:
+            domain = coverage["domain"]
+            # Coverages sharing a domain share its points
+            if id(domain) not in points:
+                points[id(domain)] = (domain, self.domain_points(domain))
+            coverage_points.append(points[id(domain)][1])
+        counts = np.array([len(next(iter(columns.values()), ())) for columns in coverage_points], dtype=np.intp)
+
+        frame = {}
+        for name in dict.fromkeys(name for columns in coverage_points for name in columns):
+            parts = [columns.get(name, np.full(count, np.nan)) for columns, count in zip(coverage_points, counts)]
+            frame[name] = np.concatenate(parts) if len(parts) else np.empty(0)
+        if "t" in frame:
+            frame["t"] = datetimes(frame["t"])
+
+        date_key = "Forecast date" if "Forecast date" in self.index else "datetime"
+        frame["number"] = np.repeat(self.index.column("number"), counts)
+        frame["step"] = np.repeat(self.index.column("step"), counts)
+        frame["forecast_date"] = np.repeat(datetimes(self.index.column(date_key)), counts)
+
+        for parameter in self.parameters:
+            parts = []
+            for coverage, count in zip(self.coverages, counts):
+                if parameter in coverage["ranges"]:
+                    values = self.coverage_values(coverage, parameter, dtype=dtype)
+                    if len(values) != count:
+                        raise ValueError(f"{parameter} has {len(values)} values for {count} points")
+                else:
+                    values = np.full(count, np.nan, dtype=dtype)
+                parts.append(values)
+            name = self.get_parameter_metadata(parameter)["observedProperty"]["id"]
+            frame[name] = np.concatenate(parts) if len(parts) else np.empty(0, dtype=dtype)
+
+        return pd.DataFrame(frame, copy=False)
+
+    def to_geopandas(self, dtype=np.float64):
+        """``to_pandas`` with a point per row (x is the latitude, y the longitude), in WGS 84."""
+        import geopandas as gpd
+
+        frame = self.to_pandas(dtype=dtype)
+        return gpd.GeoDataFrame(frame, geometry=gpd.points_from_xy(frame["y"], frame["x"]), crs="EPSG:4326")
+
     def get_parameters(self):
         return list(self.covjson["parameters"].keys())
 
@@ -67,10 +527,6 @@ class Decoder(ABC):
     def get_values(self):
         pass
 
-    @abstractmethod
-    def to_geopandas(self):
-        pass
-
     @abstractmethod
     def to_xarray(self):
         pass
@@ -0,0 +1,155 @@
+import itertools
+
+import numpy as np
+
+# Keys that every coverage is indexed on, with their value when missing
+DEFAULTS = {"number": 0, "step": 0}
+
+# Query names for keys that are not valid Python identifiers
+ALIASES = {"forecast_date": "Forecast date"}
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+def sort_key(value):
+    """Orders numbers, and strings of numbers such as steps, by value and everything else as strings."""
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(value))
+
+
+def first_time(coverage):
+    """The first time of the t axis of a coverage, or None."""
+    try:
+        t = coverage["domain"]["axes"]["t"]
+    except (KeyError, TypeError):
+        return None
+    values = t.get("values")
+    return values[0] if values else t.get("start")
+
+
+class CoverageIndex:
+    """
+    The values of the keys of each coverage, built once so that coverages
+    can be looked up without scanning the whole collection.
+
+    Each key is a column with one value per coverage, None where a coverage
+    does not have the key. A column is encoded as integer codes the first
+    time it is queried, so that queries and ``cube`` run on arrays. Values of
+    each key are listed in order of first appearance. Queries name keys as
+    keyword arguments (``forecast_date`` stands for "Forecast date") and
+    match a value, or any of a list, tuple or set of values.
+    """
+
+    def __init__(self, records):
+        self.size = len(records)
+        keys = dict.fromkeys(itertools.chain.from_iterable(records))
+        self._columns = {key: [record.get(key) for record in records] for key in keys}
+        self._encoded = {}
+
+    @classmethod
+    def from_coverages(cls, coverages):
+        """
+        Index coverages on their mars metadata, with DEFAULTS filled in,
+        and ``datetime``, the first time of their t axis.
+        """
+        index = cls([coverage.get("mars:metadata", {}) for coverage in coverages])
+        for key, default in DEFAULTS.items():
+            column = index._columns.get(key, [None] * index.size)
+            index._columns[key] = [default if value is None else value for value in column]
+        column = index._columns.get("datetime", [None] * index.size)
+        index._columns["datetime"] = [
+            first_time(coverage) if value is None else value for value, coverage in zip(column, coverages)
+        ]
+        return index
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return ALIASES.get(key, key) in self._columns
+
+    def keys(self):
+        return list(self._columns)
+
+    def column(self, key):
+        """The value of a key for each coverage (None where a coverage has none), as an array."""
+        column = self._columns.get(ALIASES.get(key, key), [None] * self.size)
+        try:
+            return np.array(column)
+        except ValueError:
+            return np.array(column, dtype=object)
+
+    def _encode(self, key):
+        """The distinct values of a key and the code of each coverage's value (-1 where it has none)."""
+        import pandas as pd
+
+        key = ALIASES.get(key, key)
+        if key not in self._encoded:
+            column = self._columns.get(key, [None] * self.size)
+            try:
+                codes, values = pd.factorize(pd.Series(column, dtype=object))
+                values = values.tolist()
+            except TypeError:
+                # Lists and dictionaries, which pandas cannot hash
+                column = [None if value is None else _hashable(value) for value in column]
+                codes, values = pd.factorize(pd.Series(column, dtype=object))
+                values = values.tolist()
+            lookup = {value: code for code, value in enumerate(values)}
+            self._encoded[key] = (values, lookup, codes.astype(np.intp, copy=False))
+        return self._encoded[key]
+
+    def values(self, key):
+        """The distinct values of a key, in order of first appearance."""
+        return list(self._encode(key)[0])
+
+    def sorted_values(self, key):
+        """The distinct values of a key in order (see sort_key)."""
+        return sorted(self.values(key), key=sort_key)
+
+    def _matches(self, key, value):
+        if ALIASES.get(key, key) not in self._columns:
+            raise KeyError(f"Coverages have no key {ALIASES.get(key, key)!r}")
+        _, lookup, codes = self._encode(key)
+        if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+            wanted = [lookup.get(_hashable(item), -2) for item in value]
+        else:
+            wanted = [lookup.get(_hashable(value), -2)]
+        return np.isin(codes, wanted)
+
+    def positions(self, **query):
+        """The sorted positions of the coverages matching every key of the query."""
+        matches = np.ones(self.size, dtype=bool)
+        for key, value in query.items():
+            matches &= self._matches(key, value)
+        return np.flatnonzero(matches).tolist()
+
+    def cube(self, *keys):
+        """
+        The sorted values of each of ``keys`` and an array, with an axis per
+        key, of the position of the last coverage with each combination of
+        them (-1 where there is none).
+        """
+        labels = []
+        ranks = []
+        present = np.ones(self.size, dtype=bool)
+        for key in keys:
+            values, _, codes = self._encode(key)
+            order = sorted(range(len(values)), key=lambda code: sort_key(values[code]))
+            rank = np.empty(len(values), dtype=np.intp)
+            rank[order] = np.arange(len(values))
+            labels.append([values[code] for code in order])
+            ranks.append((rank, codes))
+            present &= codes >= 0
+
+        positions = np.full(tuple(len(values) for values in labels), -1, dtype=np.intp)
+        cells = tuple(rank[codes[present]] for rank, codes in ranks)
+        np.maximum.at(positions, cells, np.flatnonzero(present))
+        return labels, positions
@@ -0,0 +1,63 @@
+"""
+Lazy range arrays for ``to_xarray(lazy=True)``.
+
+A LazyRanges is an array-like over the ranges of one parameter, laid out
+as Decoder.stack_ranges lays them out, that only converts the coverages it
+is indexed with. Wrapped in a dask array, each chunk is converted when a
+computation needs it, and chunks can be converted in parallel.
+
+A decoder built from a parsed collection already holds every value as a
+Python object, so this only saves the arrays that are not computed. A
+decoder from CoverageStream.decode_lazily holds none: each chunk then
+parses the values of its own coverages from the stream's buffer.
+"""
+
+import numpy as np
+
+
+class LazyRanges:
+    def __init__(self, decoder, parameter, positions, dtype=np.float64):
+        self.decoder = decoder
+        self.parameter = parameter
+        self.positions = positions
+        self.dtype = np.dtype(dtype)
+        # Decode a single coverage for the shape of the values
+        sample = decoder.stack_ranges(parameter, positions[positions >= 0][:1], dtype=self.dtype)
+        self.shape = positions.shape + sample.shape[1:]
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        return self[...].astype(dtype or self.dtype, copy=False)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(item is Ellipsis for item in key):
+            at = next(i for i, item in enumerate(key) if item is Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:at] + fill + key[at + 1 :]
+        key = key + (slice(None),) * (self.ndim - len(key))
+        cube = self.positions.ndim
+        values = self.decoder.stack_ranges(self.parameter, self.positions[key[:cube]], dtype=self.dtype)
+        return values[(Ellipsis,) + key[cube:]]
+
+
+def lazy_ranges(decoder, parameter, positions, dtype=np.float64, chunks=None):
+    """
+    A dask array of the ranges of a parameter at ``positions``. ``chunks``
+    is the number of coverages per chunk along each axis of ``positions``
+    (an int or a tuple, 1 by default); the values of a coverage are never
+    split between chunks.
+    """
+    import dask.array as da
+
+    ranges = LazyRanges(decoder, parameter, positions, dtype=dtype)
+    if chunks is None:
+        chunks = 1
+    if isinstance(chunks, int):
+        chunks = (chunks,) * positions.ndim
+    chunks = tuple(chunks) + (-1,) * (ranges.ndim - positions.ndim)
+    return da.from_array(ranges, chunks=chunks, name=False, lock=False, meta=np.empty((0,) * ranges.ndim, ranges.dtype))
@@ -0,0 +1,190 @@
+"""
+Merge CoverageCollections into one.
+
+``merge`` combines parsed collections. ``concat`` combines their JSON: the
+coverages of each document are copied byte for byte, and only their domain
+member is looked at (and parsed, for shared domains) so that references
+can be rewritten. Both check that the collections can be merged, and give
+shared domains ids that are unique in the result, writing identical shared
+domains only once.
+"""
+
+import hashlib
+
+import orjson
+
+from .decoder import load_covjson
+from .stream import CoverageStream, _members, _value_end, loaded_range
+
+# Members that must be the same in every collection merged
+_SAME = ("domainType", "referencing")
+
+
+def merge_headers(headers):
+    """
+    The header (every member but the coverages) of the collection merging
+    collections with ``headers``. Parameters are combined; a parameter
+    defined by several collections must be defined the same way.
+    """
+    if len(headers) == 0:
+        raise ValueError("No collections to merge")
+    merged = dict(headers[0])
+    parameters = {}
+    for n, header in enumerate(headers):
+        if header.get("type") != "CoverageCollection":
+            raise TypeError("Only CoverageCollections can be merged")
+        for key in _SAME:
+            if header.get(key) != merged.get(key):
+                raise ValueError(f"Collection {n} has a different {key} than collection 0")
+        for name, parameter in header.get("parameters", {}).items():
+            if parameters.setdefault(name, parameter) != parameter:
+                raise ValueError(f"Collection {n} defines parameter {name!r} differently")
+    merged["parameters"] = parameters
+    return merged
+
+
+class SharedDomains:
+    """
+    The ids of the shared domains of a merged collection. Domains with the
+    same contents get one id whatever their ids were; a domain whose id is
+    already taken by another domain is given a new one. References are
+    resolved within the collection they come from.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.used = set()
+        self.local = {}
+
+    def start(self):
+        """Move on to the coverages of the next collection."""
+        self.local = {}
+
+    def reference(self, domain_id):
+        """The id in the merged collection of a domain referred to by ``domain_id``."""
+        try:
+            return self.local[domain_id]
+        except KeyError:
+            raise ValueError(f"Unresolved domain reference: {domain_id}") from None
+
+    def add(self, domain):
+        """
+        The id in the merged collection of a domain with an id, and whether
+        it is the first domain with these contents.
+        """
+        contents = {key: value for key, value in domain.items() if key != "id"}
+        key = hashlib.sha256(orjson.dumps(contents, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)).digest()
+        first = key not in self.ids
+        if first:
+            domain_id = domain["id"]
+            count = len(self.used)
+            while domain_id in self.used:
+                domain_id = f"#domain-{count}"
+                count += 1
+            self.used.add(domain_id)
+            self.ids[key] = domain_id
+        self.local[domain["id"]] = self.ids[key]
+        return self.ids[key], first
+
+
+def merge(collections):
+    """
+    One CoverageCollection with the coverages of ``collections`` (anything
+    ``load_covjson`` takes), in order. Coverages are shared with the
+    collections, unless their domain has to be rewritten or their range
+    values parsed (RangeValues of ``CoverageStream.decode_lazily``).
+    """
+    collections = [load_covjson(collection) for collection in collections]
+    merged = merge_headers([{k: v for k, v in c.items() if k != "coverages"} for c in collections])
+
+    domains = SharedDomains()
+    coverages = []
+    for collection in collections:
+        domains.start()
+        # Decoded collections repeat the same domain object instead of referring to it
+        written = {}
+        for coverage in collection["coverages"]:
+            domain = coverage["domain"]
+            if isinstance(domain, str):
+                domain_id = domains.reference(domain)
+                if domain_id != domain:
+                    coverage = dict(coverage, domain=domain_id)
+            elif "id" in domain:
+                if id(domain) in written:
+                    domain_id, first = written[id(domain)], False
+                else:
+                    domain_id, first = domains.add(domain)
+                    written[id(domain)] = domain_id
+                if not first:
+                    coverage = dict(coverage, domain=domain_id)
+                elif domain_id != domain["id"]:
+                    coverage = dict(coverage, domain=dict(domain, id=domain_id))
+            ranges = coverage.get("ranges", {})
+            loaded = {parameter: loaded_range(range) for parameter, range in ranges.items()}
+            if any(loaded[parameter] is not range for parameter, range in ranges.items()):
+                coverage = dict(coverage, ranges=loaded)
+            coverages.append(coverage)
+
+    merged["coverages"] = coverages
+    return merged
+
+
+def _splice(buffer, start, end, domains):
+    """The JSON of the coverage at ``start``:``end`` with its domain id or reference rewritten if need be."""
+    for key, value in _members(buffer, start):
+        if key == "domain":
+            break
+    else:
+        return buffer[start:end]
+
+    if buffer[value] == ord('"'):
+        value_end = _value_end(buffer, value)
+        reference = orjson.loads(buffer[value:value_end])
+        domain_id = domains.reference(reference)
+        if domain_id == reference:
+            return buffer[start:end]
+        replacement = orjson.dumps(domain_id)
+    else:
+        # Only shared domains are parsed
+        if all(key != "id" for key, _ in _members(buffer, value)):
+            return buffer[start:end]
+        value_end = _value_end(buffer, value)
+        domain = orjson.loads(buffer[value:value_end])
+        domain_id, first = domains.add(domain)
+        if first and domain_id == domain["id"]:
+            return buffer[start:end]
+        replacement = orjson.dumps(dict(domain, id=domain_id) if first else domain_id)
+    return b"".join((buffer[start:value], replacement, buffer[value_end:end]))
+
+
+def concat(sources, out=None):
+    """
+    The JSON of one CoverageCollection with the coverages of ``sources``
+    (paths, files or bytes of CoverageJSON, or dictionaries, which are
+    serialised first), spliced from their JSON without parsing them. Written
+    to ``out``, a file object opened in binary mode, if given.
+    """
+    streams = []
+    try:
+        for source in sources:
+            if isinstance(source, dict):
+                source = orjson.dumps(source, option=orjson.OPT_SERIALIZE_NUMPY)
+            streams.append(CoverageStream(source))
+        header = merge_headers([stream.covjson for stream in streams])
+
+        chunks = []
+        write = chunks.append if out is None else out.write
+        write(orjson.dumps(header)[:-1] + b',"coverages":[')
+        domains = SharedDomains()
+        separator = b""
+        for stream in streams:
+            domains.start()
+            for start, end in stream.extents():
+                write(separator)
+                write(_splice(stream.buffer, start, end, domains))
+                separator = b","
+        write(b"]}")
+    finally:
+        for stream in streams:
+            stream.close()
+    return b"".join(chunks) if out is None else None
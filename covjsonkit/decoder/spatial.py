@@ -0,0 +1,172 @@
+"""
+A spatial index over the (lat, lon) points of a decoded domain.
+
+Points are bucketed into a regular latitude/longitude grid of cells and
+sorted by cell, so the points of any block of cells are found with binary
+searches. Cells wrap around the antimeridian. ``nearest`` searches a
+growing block of cells around the query until nothing outside the block
+can be nearer than the k-th point found, which also holds near the poles.
+"""
+
+import numpy as np
+
+# Mean radius of the Earth, in km
+EARTH_RADIUS = 6371.0
+
+
+def normalise_longitude(lons):
+    """Longitudes in [-180, 180)."""
+    return (np.asarray(lons, dtype=np.float64) + 180.0) % 360.0 - 180.0
+
+
+def haversine(lat, lon, lats, lons):
+    """Great-circle distances in km from a point to each of ``lats``/``lons``, in degrees."""
+    lat, lon, lats, lons = (np.radians(values) for values in (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def in_lon_range(lons, lon_min, lon_max):
+    """Whether each longitude is from lon_min east to lon_max, across the antimeridian if need be."""
+    if lon_max - lon_min >= 360.0:
+        return np.ones(np.shape(lons), dtype=bool)
+    lons = normalise_longitude(lons)
+    lon_min, lon_max = normalise_longitude([lon_min, lon_max])
+    if lon_min <= lon_max:
+        return (lons >= lon_min) & (lons <= lon_max)
+    return (lons >= lon_min) | (lons <= lon_max)
+
+
+def in_bbox(lats, lons, bbox):
+    """
+    Whether each point is inside ``bbox``, given as (lat_min, lon_min,
+    lat_max, lon_max). When lon_min is east of lon_max the box crosses the
+    antimeridian.
+    """
+    lat_min, lon_min, lat_max, lon_max = (float(value) for value in bbox)
+    lats = np.asarray(lats, dtype=np.float64)
+    return (lats >= lat_min) & (lats <= lat_max) & in_lon_range(lons, lon_min, lon_max)
+
+
+class SpatialIndex:
+    """
+    An index of points for nearest-neighbour and bounding box queries.
+    Queries return positions in the ``lats``/``lons`` the index was built
+    from. ``points_per_cell`` sets the cell size from the extent of the
+    points.
+    """
+
+    def __init__(self, lats, lons, points_per_cell=8):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = normalise_longitude(lons)
+        if self.lats.shape != self.lons.shape or self.lats.ndim != 1:
+            raise ValueError("Latitudes and longitudes must be 1-d arrays of the same length")
+
+        size = max(len(self.lats), 1)
+        extent = (np.ptp(self.lats) if len(self.lats) else 0.0) * (np.ptp(self.lons) if len(self.lons) else 0.0)
+        cell = np.clip(np.sqrt(max(extent, 1e-8) * points_per_cell / size), 1e-4, 90.0)
+        # A whole number of cells around a meridian and the equator, so that columns wrap exactly
+        self.rows = int(np.ceil(180.0 / cell))
+        self.columns = 2 * self.rows
+        self.cell = 180.0 / self.rows
+
+        cells = self._row(self.lats) * self.columns + self._column(self.lons)
+        self.order = np.argsort(cells, kind="stable")
+        self.cells = cells[self.order]
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _row(self, lats):
+        return np.clip(np.floor((np.asarray(lats) + 90.0) / self.cell), 0, self.rows - 1).astype(np.int64)
+
+    def _column(self, lons):
+        return np.floor((normalise_longitude(lons) + 180.0) / self.cell).astype(np.int64) % self.columns
+
+    def _points(self, rows, columns):
+        """The positions of the points in the cells of every row and column given."""
+        cells = (rows[:, np.newaxis] * self.columns + columns[np.newaxis, :]).ravel()
+        starts = np.searchsorted(self.cells, cells, side="left")
+        counts = np.searchsorted(self.cells, cells, side="right") - starts
+        starts, counts = starts[counts > 0], counts[counts > 0]
+        # Concatenated ranges starts[i]:starts[i] + counts[i]
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.order[offsets + np.arange(counts.sum())]
+
+    def within(self, bbox):
+        """The sorted positions of the points inside ``bbox`` (see in_bbox)."""
+        lat_min, lon_min, lat_max, lon_max = (float(value) for value in bbox)
+        full_circle = lon_max - lon_min >= 360.0
+        lon_min, lon_max = normalise_longitude([lon_min, lon_max])
+
+        rows = np.arange(self._row(lat_min), self._row(lat_max) + 1)
+        first, last = self._column(lon_min), self._column(lon_max)
+        if full_circle:
+            columns = np.arange(self.columns)
+        elif lon_min <= lon_max:
+            columns = np.arange(first, last + 1)
+        else:
+            # Both edges may fall in the same column
+            columns = np.unique(np.r_[np.arange(first, self.columns), np.arange(0, last + 1)])
+
+        if len(rows) * len(columns) > len(self):
+            candidates = np.arange(len(self))
+        else:
+            candidates = np.sort(self._points(rows, columns))
+        return candidates[in_bbox(self.lats[candidates], self.lons[candidates], bbox)]
+
+    def _covered(self, lat, lon, row, column, radius):
+        """
+        A distance in km within which every point lies in the block of cells
+        ``radius`` cells around (row, column), or None if the block is the globe.
+        """
+        bounds = []
+        south = (row - radius) * self.cell - 90.0
+        north = (row + radius + 1) * self.cell - 90.0
+        if south > -90.0:
+            bounds.append(lat - south)
+        if north < 90.0:
+            bounds.append(north - lat)
+        if 2 * radius + 1 < self.columns:
+            west = (column - radius) * self.cell - 180.0
+            east = (column + radius + 1) * self.cell - 180.0
+            # Points beyond a bounding meridian are at least as far as its great circle
+            for delta in (lon - west, east - lon):
+                delta = np.radians(min(delta, 180.0))
+                bounds.append(np.degrees(np.arcsin(np.cos(np.radians(lat)) * abs(np.sin(delta)))))
+        if not bounds:
+            return None
+        return np.radians(max(min(bounds), 0.0)) * EARTH_RADIUS
+
+    def nearest(self, lat, lon, k=1):
+        """
+        The positions of the ``k`` points nearest to (lat, lon), nearest
+        first, and their great-circle distances in km.
+        """
+        k = min(int(k), len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        lat = float(np.clip(lat, -90.0, 90.0))
+        lon = float(normalise_longitude(lon))
+        row, column = int(self._row(lat)), int(self._column(lon))
+
+        radius = 0
+        while True:
+            rows = np.arange(max(row - radius, 0), min(row + radius, self.rows - 1) + 1)
+            if 2 * radius + 1 >= self.columns:
+                columns = np.arange(self.columns)
+            else:
+                columns = np.arange(column - radius, column + radius + 1) % self.columns
+            if len(rows) * len(columns) > len(self):
+                # Far from the points, scanning them all is cheaper than the cells
+                candidates, covered = np.arange(len(self)), None
+            else:
+                candidates = self._points(rows, columns)
+                covered = self._covered(lat, lon, row, column, radius)
+            if len(candidates) >= k:
+                distances = haversine(lat, lon, self.lats[candidates], self.lons[candidates])
+                # Ties are broken by position
+                nearest = np.lexsort((candidates, distances))[:k]
+                if covered is None or distances[nearest[-1]] <= covered:
+                    return candidates[nearest], distances[nearest]
+            radius = 2 * radius + 1
@@ -0,0 +1,353 @@
+"""
+Iterate over the coverages of a CoverageJSON collection without loading it.
+
+The document is memory-mapped (or spooled to a temporary file first, for
+streams that cannot be mapped) and scanned for the extent of each top-level
+value. Only brackets and strings are visited, with regular expressions, and
+arrays of numbers (or of arrays of numbers, as composite coordinates are)
+written compactly are skipped with ``find``, so the scan runs at C speed
+and never builds the coverages themselves. The header (every member of the
+collection but its coverages) is parsed up front; each coverage is parsed
+with orjson when the iteration reaches it.
+
+``decode_lazily`` decodes a whole collection but for the values of its
+ranges, which stay in the buffer as RangeValues and are only parsed, a
+coverage at a time, when they are used.
+"""
+
+import io
+import mmap
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import orjson
+
+# Strings (which may hold brackets) and the brackets that nest values
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_END = re.compile(rb"[\s,\]}]")
+_SPACE = re.compile(rb"\s*")
+
+_OPENING = frozenset(b"[{")
+# Every byte but brackets, braces and quotes
+_UNNESTED = bytes(sorted(set(range(256)) - set(b'[]{}"')))
+
+_HEADER = frozenset(["type", "domainType", "parameters", "referencing"])
+
+
+def _skip_space(buffer, pos):
+    return _SPACE.match(buffer, pos).end()
+
+
+def _array_end(buffer, pos):
+    """
+    The end of the array at ``pos`` if it holds numbers, or arrays of
+    numbers, with no space between its brackets (as orjson writes it), or
+    None. The end is found with ``find`` and checked by the brackets in
+    between, so the numbers themselves are never tokenised.
+    """
+    following = buffer[pos + 1 : pos + 2]
+    if not hasattr(buffer, "find") or following in (b"{", b'"'):
+        return None
+    if following != b"[":
+        end = buffer.find(b"]", pos) + 1
+        if end == 0 or any(buffer.find(char, pos + 1, end) >= 0 for char in (b"[", b"{", b'"')):
+            return None
+        return end
+    # Arrays of arrays hold no objects, so they end before the next brace
+    stop = buffer.find(b"}", pos)
+    end = buffer.find(b"]]", pos, len(buffer) if stop < 0 else stop) + 2
+    if end < 2:
+        return None
+    brackets = buffer[pos + 1 : end - 1].translate(None, _UNNESTED)
+    return end if brackets == b"[]" * (len(brackets) // 2) else None
+
+
+def _value_end(buffer, pos):
+    """The end of the JSON value starting at ``pos``."""
+    first = buffer[pos]
+    if first == ord('"'):
+        match = _STRING.match(buffer, pos)
+        if match is None:
+            raise ValueError(f"Unterminated string at byte {pos}")
+        return match.end()
+    if first not in _OPENING:
+        match = _SCALAR_END.search(buffer, pos)
+        return len(buffer) if match is None else match.start()
+
+    depth = 0
+    match = _TOKEN.search(buffer, pos)
+    while match is not None:
+        start, end = match.span()
+        token = buffer[start]
+        if token == ord("["):
+            array_end = _array_end(buffer, start)
+            if array_end is None:
+                depth += 1
+            elif depth == 0:
+                return array_end
+            else:
+                end = array_end
+        elif token == ord("{"):
+            depth += 1
+        elif token != ord('"'):
+            depth -= 1
+            if depth == 0:
+                return end
+        match = _TOKEN.search(buffer, end)
+    raise ValueError(f"Unterminated value at byte {pos}")
+
+
+def _expect(buffer, pos, char):
+    pos = _skip_space(buffer, pos)
+    if pos >= len(buffer) or buffer[pos] != ord(char):
+        raise ValueError(f"Expected {char!r} at byte {pos}")
+    return pos + 1
+
+
+def _members(buffer, pos=0):
+    """
+    The keys of the members of the object at ``pos`` (the top-level object
+    by default) and where their values start. A value is only skipped once
+    the next member is asked for.
+    """
+    pos = _expect(buffer, pos, "{")
+    pos = _skip_space(buffer, pos)
+    if pos < len(buffer) and buffer[pos] == ord("}"):
+        return
+    while True:
+        pos = _skip_space(buffer, pos)
+        end = _value_end(buffer, pos)
+        key = orjson.loads(buffer[pos:end])
+        start = _skip_space(buffer, _expect(buffer, end, ":"))
+        yield key, start
+        pos = _skip_space(buffer, _value_end(buffer, start))
+        if pos < len(buffer) and buffer[pos] == ord("}"):
+            return
+        pos = _expect(buffer, pos, ",")
+
+
+def _elements(buffer, pos):
+    """The (start, end) extents of the elements of the array at ``pos``."""
+    pos = _expect(buffer, pos, "[")
+    pos = _skip_space(buffer, pos)
+    if pos < len(buffer) and buffer[pos] == ord("]"):
+        return
+    while True:
+        start = _skip_space(buffer, pos)
+        end = _value_end(buffer, start)
+        yield start, end
+        pos = _skip_space(buffer, end)
+        if pos < len(buffer) and buffer[pos] == ord("]"):
+            return
+        pos = _expect(buffer, pos, ",")
+
+
+class RangeValues:
+    """
+    The values of a range, left in the buffer they were read from. They are
+    parsed each time they are used, as an array (NaN where null) or as a
+    list, and never kept.
+    """
+
+    __slots__ = ("buffer", "start", "end")
+
+    def __init__(self, buffer, start, end):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+
+    def load(self):
+        return orjson.loads(self.buffer[self.start : self.end])
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.load(), dtype=np.float64 if dtype is None else dtype)
+
+    def __len__(self):
+        return len(self.load())
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+
+def loaded_range(range):
+    """``range``, or a copy with its values parsed if they are RangeValues, so that it can be serialised."""
+    values = range.get("values")
+    if isinstance(values, RangeValues):
+        return dict(range, values=values.load())
+    return range
+
+
+def _skeleton(buffer, start):
+    """The coverage at ``start``, with the values of its ranges as RangeValues."""
+    coverage = {}
+    for key, value in _members(buffer, start):
+        if key != "ranges":
+            coverage[key] = orjson.loads(buffer[value : _value_end(buffer, value)])
+            continue
+        coverage[key] = ranges = {}
+        for parameter, range_start in _members(buffer, value):
+            ranges[parameter] = range = {}
+            for member, member_start in _members(buffer, range_start):
+                member_end = _value_end(buffer, member_start)
+                if member == "values":
+                    range[member] = RangeValues(buffer, member_start, member_end)
+                else:
+                    range[member] = orjson.loads(buffer[member_start:member_end])
+    return coverage
+
+
+def _map(f):
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _spool(f):
+    """Copy the rest of a stream to a temporary file and map it."""
+    with tempfile.TemporaryFile() as spool:
+        if isinstance(f, io.TextIOBase):
+            for chunk in iter(lambda: f.read(1 << 20), ""):
+                spool.write(chunk.encode())
+        else:
+            shutil.copyfileobj(f, spool, 1 << 20)
+        spool.flush()
+        if spool.tell() == 0:
+            return b""
+        return _map(spool)
+
+
+def _open_buffer(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return _map(f)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if hasattr(source, "read"):
+        try:
+            mappable = os.fstat(source.fileno()).st_size > 0 and source.tell() == 0
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            mappable = False
+        if mappable:
+            return _map(source)
+        if isinstance(source, io.BytesIO):
+            return source.read()
+        return _spool(source)
+    raise TypeError("Covjson must be a covjson file or covjson bytes")
+
+
+class CoverageStream:
+    """
+    A CoverageCollection read one coverage at a time.
+
+    The header is parsed when the stream is opened (members after the
+    coverages are only looked for if it is not complete before them) and is
+    available as ``covjson`` (without its coverages), ``parameters``,
+    ``coordinates`` and ``domainType``. Iterating yields each coverage as a
+    dictionary, with shared domains resolved; only the domains that other
+    coverages may refer to are kept between coverages. ``decode`` turns a
+    batch of coverages into the feature decoder of the collection, with
+    ``decoder`` if given, and ``decode_lazily`` the whole collection, with
+    the values of its ranges left in the buffer.
+    """
+
+    def __init__(self, source, decoder=None):
+        self.decoder = decoder
+        self.buffer = _open_buffer(source)
+        if len(self.buffer) == 0:
+            raise ValueError("Covjson is empty")
+        self.covjson = {}
+        self._coverages = None
+        for key, start in _members(self.buffer):
+            if key == "coverages":
+                self._coverages = start
+                # Written header first (as the encoders stream it), the
+                # coverages need not be scanned before they are iterated
+                if _HEADER.issubset(self.covjson):
+                    break
+            else:
+                self.covjson[key] = orjson.loads(self.buffer[start : _value_end(self.buffer, start)])
+
+        self.type = self.covjson.get("type")
+        if self.type != "CoverageCollection" or self._coverages is None:
+            self.close()
+            raise TypeError("Only a CoverageCollection can be streamed")
+        self.domainType = self.covjson.get("domainType")
+        self.parameters = list(self.covjson.get("parameters", {}))
+        self.coordinates = [coord for coords in self.covjson.get("referencing", []) for coord in coords["coordinates"]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def extents(self):
+        """The (start, end) byte offsets of each coverage in ``buffer``."""
+        return _elements(self.buffer, self._coverages)
+
+    def __iter__(self):
+        return self._resolved(orjson.loads(self.buffer[start:end]) for start, end in self.extents())
+
+    def skeletons(self):
+        """
+        Each coverage as a dictionary, as iterating yields them, but with
+        the values of its ranges as RangeValues.
+        """
+        return self._resolved(_skeleton(self.buffer, start) for start, _ in self.extents())
+
+    def _resolved(self, coverages):
+        domains = {}
+        for coverage in coverages:
+            domain = coverage.get("domain")
+            if isinstance(domain, str):
+                if domain not in domains:
+                    raise ValueError(f"Unresolved domain reference: {domain}")
+                coverage["domain"] = domains[domain]
+            elif isinstance(domain, dict) and "id" in domain:
+                domains[domain["id"]] = domain
+            yield coverage
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def get_parameter_metadata(self, parameter):
+        return self.covjson["parameters"][parameter]
+
+    def batches(self, size):
+        """Lists of up to ``size`` coverages."""
+        batch = []
+        for coverage in self:
+            batch.append(coverage)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def decode(self, coverages):
+        """The feature decoder of a collection of the header and ``coverages``."""
+        if self.decoder is None:
+            from covjsonkit.api import Covjsonkit
+
+            self.decoder = Covjsonkit().decode
+        collection = dict(self.covjson)
+        collection["coverages"] = list(coverages)
+        return self.decoder(collection)
+
+    def decode_lazily(self):
+        """
+        The feature decoder of the whole collection, built from ``skeletons``:
+        the values of each range are only parsed from the buffer when they
+        are used, e.g. by the chunks of ``to_xarray(lazy=True)``, which then
+        parse their own coverages only. The stream must stay open until the
+        values have been used.
+        """
+        return self.decode(self.skeletons())
@@ -1,5 +1,7 @@
 import logging
 
+import numpy as np
+
 from .encoder import Encoder
 
 
@@ -18,6 +20,7 @@ class Path(Encoder):
         self.add_mars_metadata(new_coverage, mars_metadata)
         self.add_domain(new_coverage, coords)
         self.add_range(new_coverage, values)
+        self.share_domain(new_coverage, coords)
         self.covjson["coverages"].append(new_coverage)
         # cov = Coverage.model_validate_json(json.dumps(new_coverage))
         # self.pydantic_coverage.coverages.append(cov)
@@ -48,7 +51,7 @@ class Path(Encoder):
 
         for data_var in dataset.data_vars:
             self.add_parameter(data_var)
-            range_dicts[data_var] = dataset[data_var].values.tolist()
+            range_dicts[data_var] = np.ascontiguousarray(dataset[data_var].values)
 
         self.add_reference(
             {
@@ -75,28 +78,11 @@ class Path(Encoder):
         self.add_coverage(mars_metadata, coords, range_dicts)
         return self.covjson
 
-    def from_polytope(self, result):
+    def iter_polytope(self, result):
+        table = self.flatten(result, path=True)
+        fields = table.fields
 
-        coords = {}
-        mars_metadata = {}
-        range_dict = {}
-        fields = {}
-        fields["lat"] = 0
-        fields["param"] = 0
-        fields["number"] = [0]
-        fields["step"] = 0
-        fields["dates"] = []
-        fields["levels"] = [0]
-        fields["s"] = []
-        fields["l"] = []
-
-        self.walk_tree(result, fields, coords, mars_metadata, range_dict)
-
-        if len(fields["l"]) == 0:
-            fields["l"] = [0]
-
-        logging.debug("The values returned from walking tree: %s", range_dict)  # noqa: E501
-        logging.debug("The coordinates returned from walking tree: %s", coords)  # noqa: E501
+        logging.debug("The table returned from walking tree: %s", table)  # noqa: E501
         logging.debug("The fields: %s", fields)
 
         self.add_reference(
@@ -109,79 +95,27 @@ class Path(Encoder):
             }
         )
 
-        combined_dict = {}
-
-        for date in fields["dates"]:
-            if date not in combined_dict:
-                combined_dict[date] = {}
-            for level in fields["l"]:
-                for num in fields["number"]:
-                    if num not in combined_dict[date]:
-                        combined_dict[date][num] = {}
-                    for para in fields["param"]:
-                        if para not in combined_dict[date][num]:
-                            combined_dict[date][num][para] = {}
-                        # for s, value in range_dict[date][level][num][para].items():
-                        for s in fields["s"]:
-                            key = (date, level, num, para, s)
-                            # for k, v in range_dict.items():
-                            # if k == key:
-                            if s not in combined_dict[date][num][para]:
-                                if key in range_dict:
-                                    combined_dict[date][num][para][s] = range_dict[key]
-                                # combined_dict[date][num][para][s] = range_dict[key]
-                            else:
-                                # Cocatenate arrays
-                                if key in range_dict:
-                                    combined_dict[date][num][para][s] += range_dict[key]
-                        # for s in fields["s"]:
-
-        logging.debug("The values returned from combined dicts: %s", combined_dict)  # noqa: E501
-
-        levels = fields["levels"]
-        if fields["param"] == 0:
-            raise ValueError("No parameters were returned, date requested may be out of range")
-        for para in fields["param"]:
-            self.add_parameter(para)
+        self.add_parameters(table.params)
 
         logging.debug("The parameters added were: %s", self.parameters)  # noqa: E501
 
-        for date in coords.keys():
-            coord = coords[date]["composite"]
-            coords[date]["composite"] = []
-            for level in levels:
+        coords = {}
+        for date, coord in table.points.items():
+            # Steps and levels are written as they were requested, e.g. as integers
+            points = coord.tolist()
+            composite = []
+            for level in fields["levels"]:
                 start = 0
                 for i, s in enumerate(fields["s"]):
-                    end = start + len(coord) / len(fields["s"])
-                    for cor in coord[int(start) : int(end)]:
-                        if len(fields["l"]) == 1:
-                            coords[date]["composite"].append([s, cor[0], cor[1], fields["l"][0]])
-                        elif len(fields["l"]) == 0:
-                            coords[date]["composite"].append([s, cor[0], cor[1], level])
-                        else:
-                            coords[date]["composite"].append([s, cor[0], cor[1], fields["l"][i]])
+                    end = start + len(points) / len(fields["s"])
+                    z = fields["l"][0] if len(fields["l"]) == 1 else fields["l"][i]
+                    composite.extend([s, lat, lon, z] for lat, lon in points[int(start) : int(end)])
                     start = end
+            coords[date] = {"composite": composite}
         logging.debug("The coordinates returned from walking tree: %s", coords)  # noqa: E501
 
-        for date in combined_dict.keys():
-            for num in combined_dict[date].keys():
-                val_dict = {}
-                # for step in combined_dict[date][num][self.parameters[0]].keys():
-                #    val_dict[step] = {}
-                for para in combined_dict[date][num].keys():
-                    if para not in val_dict:
-                        val_dict[para] = []
-                    for step in combined_dict[date][num][para].keys():
-                        val_dict[para].extend(combined_dict[date][num][para][step])
-                # for step in val_dict.keys():
-                mm = mars_metadata.copy()
-                mm["number"] = num
-                # mm["step"] = step
-                # temp = []
-                # for coord in coords[date]["composite"]:
-                #    temp.append([step] + coord)
-                # coords[date]["composite"] = temp
-                mm["Forecast date"] = date
-                self.add_coverage(mm, coords[date], val_dict)
-
-        return self.covjson
+        # One coverage per date and number holding the whole path, step by step
+        for group, values in table.groups(("date", "number"), ("step", "level"), skip_missing=True):
+            values = {para: values.get(para, []) for para in table.params}
+            self.add_coverage(table.metadata(group), coords[group["date"]], values)
+            yield
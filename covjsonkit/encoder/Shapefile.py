@@ -1,6 +1,9 @@
 import logging
 
+import numpy as np
+
 from .encoder import Encoder
+from .polygon import clip_points
 
 
 class Shapefile(Encoder):
@@ -18,6 +21,7 @@ class Shapefile(Encoder):
         self.add_mars_metadata(new_coverage, mars_metadata)
         self.add_domain(new_coverage, coords)
         self.add_range(new_coverage, values)
+        self.share_domain(new_coverage, coords)
         self.covjson["coverages"].append(new_coverage)
         # cov = Coverage.model_validate_json(json.dumps(new_coverage))
         # self.pydantic_coverage.coverages.append(cov)
@@ -47,12 +51,19 @@ class Shapefile(Encoder):
     def add_mars_metadata(self, coverage, metadata):
         coverage["mars:metadata"] = metadata
 
-    def from_xarray(self, dataset):
+    def from_xarray(self, dataset, polygon=None):
+        """
+        Encode a dataset of points. With ``polygon`` (WKT or shapefile
+        geometries, see polygon.polygons) only the points inside it are encoded.
+        """
+        if polygon is not None:
+            dataset = clip_points(dataset, polygon)
+
         range_dicts = {}
 
         for data_var in dataset.data_vars:
             self.add_parameter(data_var)
-            range_dicts[data_var] = dataset[data_var].values.tolist()
+            range_dicts[data_var] = np.ascontiguousarray(dataset[data_var].values)
 
         self.add_reference(
             {
@@ -70,33 +81,16 @@ class Shapefile(Encoder):
             mars_metadata[metadata] = dataset.attrs[metadata]
 
         coords = {}
-        coords["composite"] = []
+        coords["composite"] = np.column_stack((dataset.x.values, dataset.y.values))
         coords["t"] = dataset.attrs["date"]
 
-        xy = zip(dataset.x.values, dataset.y.values)
-        for x, y in xy:
-            coords["composite"].append([x, y])
-
         self.add_coverage(mars_metadata, coords, range_dicts)
         return self.covjson
 
-    def from_polytope(self, result):
+    def iter_polytope(self, result):
+        table = self.flatten(result)
 
-        coords = {}
-        mars_metadata = {}
-        range_dict = {}
-        fields = {}
-        fields["lat"] = 0
-        fields["param"] = 0
-        fields["number"] = [0]
-        fields["step"] = 0
-        fields["dates"] = []
-        fields["levels"] = [0]
-
-        self.walk_tree(result, fields, coords, mars_metadata, range_dict)
-
-        logging.debug("The values returned from walking tree: %s", range_dict)  # noqa: E501
-        logging.debug("The coordinates returned from walking tree: %s", coords)  # noqa: E501
+        logging.debug("The table returned from walking tree: %s", table)  # noqa: E501
 
         self.add_reference(
             {
@@ -108,59 +102,15 @@ class Shapefile(Encoder):
             }
         )
 
-        combined_dict = {}
-
-        for date in fields["dates"]:
-            if date not in combined_dict:
-                combined_dict[date] = {}
-            for level in fields["levels"]:
-                for num in fields["number"]:
-                    if num not in combined_dict[date]:
-                        combined_dict[date][num] = {}
-                    for para in fields["param"]:
-                        if para not in combined_dict[date][num]:
-                            combined_dict[date][num][para] = {}
-                        # for s, value in range_dict[date][level][num][para].items():
-                        for s in fields["step"]:
-                            key = (date, level, num, para, s)
-                            for k, v in range_dict.items():
-                                if k == key:
-                                    if s not in combined_dict[date][num][para]:
-                                        combined_dict[date][num][para][s] = v
-                                    else:
-                                        # Cocatenate arrays
-                                        combined_dict[date][num][para][s] += v
-
-        levels = fields["levels"]
-        for para in fields["param"]:
-            self.add_parameter(para)
+        self.add_parameters(table.params)
 
         logging.debug("The parameters added were: %s", self.parameters)  # noqa: E501
 
-        for date in coords.keys():
-            coord = coords[date]["composite"]
-            coords[date]["composite"] = []
-            for level in levels:
-                for cor in coord:
-                    coords[date]["composite"].append([cor[0], cor[1], level])
-
-        for date in combined_dict.keys():
-            for num in combined_dict[date].keys():
-                val_dict = {}
-                for step in combined_dict[date][num][self.parameters[0]].keys():
-                    val_dict[step] = {}
-                for para in combined_dict[date][num].keys():
-                    for step in combined_dict[date][num][para].keys():
-                        val_dict[step][para] = combined_dict[date][num][para][step]
-                for step in val_dict.keys():
-                    mm = mars_metadata.copy()
-                    mm["number"] = num
-                    mm["step"] = step
-                    mm["Forecast date"] = date
-                    self.add_coverage(mm, coords[date], val_dict[step])
-
-        # self.add_coverage(mars_metadata, coords, range_dict)
-        # return self.covjson
-        # with open('data.json', 'w') as f:
-        #    json.dump(self.covjson, f)
-        return self.covjson
+        coords = {date: {"composite": table.composite(date), "t": [date]} for date in table.points}
+
+        # One coverage per date, number and step holding the levels with data
+        for group, values in table.groups(("date", "number", "step"), ("level",), skip_missing=True):
+            if len(values) == 0:
+                continue
+            self.add_coverage(table.metadata(group), coords[group["date"]], values)
+            yield
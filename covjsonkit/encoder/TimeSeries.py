@@ -2,9 +2,8 @@ import logging
 import time
 from datetime import datetime, timedelta
 
-import pandas as pd
-
 from .encoder import Encoder
+from .table import time_axis
 
 
 class TimeSeries(Encoder):
@@ -22,6 +21,7 @@ class TimeSeries(Encoder):
         self.add_mars_metadata(new_coverage, mars_metadata)
         self.add_domain(new_coverage, coords)
         self.add_range(new_coverage, values)
+        self.share_domain(new_coverage, coords)
         self.covjson["coverages"].append(new_coverage)
         # cov = Coverage.model_validate_json(json.dumps(new_coverage))
         # self.pydantic_coverage.coverages.append(cov)
@@ -32,11 +32,15 @@ class TimeSeries(Encoder):
         coverage["domain"]["axes"]["x"] = {}
         coverage["domain"]["axes"]["y"] = {}
         coverage["domain"]["axes"]["z"] = {}
-        coverage["domain"]["axes"]["t"] = {}
         coverage["domain"]["axes"]["x"]["values"] = coords["x"]
         coverage["domain"]["axes"]["y"]["values"] = coords["y"]
         coverage["domain"]["axes"]["z"]["values"] = coords["z"]
-        coverage["domain"]["axes"]["t"]["values"] = coords["t"]
+        if isinstance(coords["t"], dict):
+            # A start/stop/num axis
+            coverage["domain"]["axes"]["t"] = coords["t"]
+        else:
+            coverage["domain"]["axes"]["t"] = {}
+            coverage["domain"]["axes"]["t"]["values"] = coords["t"]
 
     def add_range(self, coverage, values):
         for parameter in values.keys():
@@ -86,21 +90,10 @@ class TimeSeries(Encoder):
             )
         return self.covjson
 
-    def from_polytope(self, result):
-        coords = {}
-        mars_metadata = {}
-        range_dict = {}
-        fields = {}
-        fields["lat"] = 0
-        fields["param"] = 0
-        fields["number"] = [0]
-        fields["step"] = 0
-        fields["dates"] = []
-        fields["levels"] = [0]
-
+    def iter_polytope(self, result):
         start = time.time()
         logging.debug("Tree walking starts at: %s", start)  # noqa: E501
-        self.walk_tree(result, fields, coords, mars_metadata, range_dict)
+        table = self.flatten(result)
         end = time.time()
         delta = end - start
         logging.debug("Tree walking ends at: %s", end)  # noqa: E501
@@ -119,74 +112,44 @@ class TimeSeries(Encoder):
             }
         )
 
-        coordinates = {}
-
-        levels = fields["levels"]
-        if fields["param"] == 0:
-            raise ValueError("No parameters were returned, date requested may be out of range")
-        for para in fields["param"]:
-            self.add_parameter(para)
+        self.add_parameters(table.params)
 
         logging.debug("The parameters added were: %s", self.parameters)  # noqa: E501
 
-        for date in fields["dates"]:
+        coordinates = {}
+        for date in table.dates:
+            lat, lon = table.points[date][0].tolist()
             coordinates[date] = {
-                "x": [coords[date]["composite"][0][0]],
-                "y": [coords[date]["composite"][0][1]],
-                "z": [levels[0]],
+                "x": [lat],
+                "y": [lon],
+                "z": [table.levels[0]],
             }
-            coordinates[date]["t"] = []
-            for level in fields["levels"]:
-                for num in fields["number"]:
-                    for para in fields["param"]:
-                        for step in fields["step"]:
-                            date_format = "%Y%m%dT%H%M%S"
-                            new_date = pd.Timestamp(date).strftime(date_format)
-                            start_time = datetime.strptime(new_date, date_format)
-                            # add current date to list by converting it to iso format
-                            stamp = start_time + timedelta(hours=int(step))
-                            coordinates[date]["t"].append(stamp.isoformat() + "Z")
-                        break
-                    break
-                break
+            t = time_axis(date, table.steps, compact=self.compact_time)
+            coordinates[date]["t"] = t["values"] if "values" in t else t
 
         end = time.time()
         delta = end - start
         logging.debug("Coords creation: %s", end)  # noqa: E501
         logging.debug("Coords creation: %s", delta)  # noqa: E501
 
-        # logging.debug("The values returned from walking tree: %s", range_dict)  # noqa: E501
-        # logging.debug("The coordinates returned from walking tree: %s", coordinates)  # noqa: E501
-
         start = time.time()
         logging.debug("Coverage creation: %s", start)  # noqa: E501
 
-        for date in fields["dates"]:
-            for level in fields["levels"]:
-                for num in fields["number"]:
-                    val_dict = {}
-                    for para in fields["param"]:
-                        val_dict[para] = []
-                        for step in fields["step"]:
-                            key = (date, level, num, para, step)
-                            # for k, v in range_dict.items():
-                            #    if k == key:
-                            # val_dict[para].append(v[0])
-                            val_dict[para].append(range_dict[key][0])
-                    mm = mars_metadata.copy()
-                    mm["number"] = num
-                    mm["Forecast date"] = date
-                    del mm["step"]
-                    self.add_coverage(mm, coordinates[date], val_dict)
+        # One coverage per date, level and number holding the series over steps
+        for group, values in table.groups(("date", "level", "number"), ("step",), point=0):
+            mm = table.metadata(group)
+            del mm["step"]
+            self.add_coverage(mm, coordinates[group["date"]], values)
+            yield
 
         end = time.time()
         delta = end - start
         logging.debug("Coverage creation: %s", end)  # noqa: E501
         logging.debug("Coverage creation: %s", delta)  # noqa: E501
 
-        return self.covjson
-
     def from_polytope_step(self, result):
+        import pandas as pd
+
         coords = {}
         mars_metadata = {}
         range_dict = {}
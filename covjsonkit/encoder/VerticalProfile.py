@@ -1,10 +1,8 @@
 import logging
 import time
-from datetime import datetime, timedelta
-
-import pandas as pd
 
 from .encoder import Encoder
+from .valid_time import iso_format, valid_time_grid
 
 
 class VerticalProfile(Encoder):
@@ -22,6 +20,7 @@ class VerticalProfile(Encoder):
         self.add_mars_metadata(new_coverage, mars_metadata)
         self.add_domain(new_coverage, coords)
         self.add_range(new_coverage, values)
+        self.share_domain(new_coverage, coords)
         self.covjson["coverages"].append(new_coverage)
 
     def add_domain(self, coverage, coords):
@@ -85,21 +84,10 @@ class VerticalProfile(Encoder):
             )
         return self.covjson
 
-    def from_polytope(self, result):
-        coords = {}
-        mars_metadata = {}
-        range_dict = {}
-        fields = {}
-        fields["lat"] = 0
-        fields["param"] = 0
-        fields["number"] = [0]
-        fields["step"] = 0
-        fields["dates"] = []
-        fields["levels"] = [0]
-
+    def iter_polytope(self, result):
         start = time.time()
         logging.debug("Tree walking starts at: %s", start)  # noqa: E501
-        self.walk_tree(result, fields, coords, mars_metadata, range_dict)
+        table = self.flatten(result)
         end = time.time()
         delta = end - start
         logging.debug("Tree walking ends at: %s", end)  # noqa: E501
@@ -118,72 +106,37 @@ class VerticalProfile(Encoder):
             }
         )
 
-        coordinates = {}
-
-        levels = fields["levels"]
-        if fields["param"] == 0:
-            raise ValueError("No parameters were returned, date requested may be out of range")
-        for para in fields["param"]:
-            self.add_parameter(para)
+        self.add_parameters(table.params)
 
         logging.debug("The parameters added were: %s", self.parameters)  # noqa: E501
 
-        for date in fields["dates"]:
+        coordinates = {}
+        times = valid_time_grid(table.dates, table.steps)
+        for date, date_times in zip(table.dates, times):
+            lat, lon = table.points[date][0].tolist()
             coordinates[date] = {}
-            for level in fields["levels"]:
-                for num in fields["number"]:
-                    for para in fields["param"]:
-                        for step in fields["step"]:
-                            date_format = "%Y%m%dT%H%M%S"
-                            new_date = pd.Timestamp(date).strftime(date_format)
-                            start_time = datetime.strptime(new_date, date_format)
-                            # add current date to list by converting it to iso format
-                            stamp = start_time + timedelta(hours=int(step))
-                            coordinates[date][step] = {
-                                "x": [coords[date]["composite"][0][0]],
-                                "y": [coords[date]["composite"][0][1]],
-                                "z": list(levels),
-                            }
-                            coordinates[date][step]["t"] = [stamp.isoformat() + "Z"]
-                            # coordinates[date]["t"].append(stamp.isoformat() + "Z")
-                        break
-                    break
-                break
+            for step, t in zip(table.steps, iso_format(date_times)):
+                coordinates[date][step] = {
+                    "x": [lat],
+                    "y": [lon],
+                    "z": list(table.levels),
+                    "t": [t],
+                }
 
         end = time.time()
         delta = end - start
         logging.debug("Coords creation: %s", end)  # noqa: E501
         logging.debug("Coords creation: %s", delta)  # noqa: E501
 
-        # logging.debug("The values returned from walking tree: %s", range_dict)  # noqa: E501
-        # logging.debug("The coordinates returned from walking tree: %s", coordinates)  # noqa: E501
-
         start = time.time()
         logging.debug("Coverage creation: %s", start)  # noqa: E501
 
-        for date in fields["dates"]:
-            for num in fields["number"]:
-                val_dict = {}
-                for step in fields["step"]:
-                    val_dict[step] = {}
-                    for para in fields["param"]:
-                        val_dict[step][para] = []
-                        for level in fields["levels"]:
-                            key = (date, level, num, para, step)
-                            # for k, v in range_dict.items():
-                            #    if k == key:
-                            # val_dict[para].append(v[0])
-                            val_dict[step][para].append(range_dict[key][0])
-                    mm = mars_metadata.copy()
-                    mm["number"] = num
-                    mm["Forecast date"] = date
-                    mm["step"] = step
-                    # del mm["step"]
-                    self.add_coverage(mm, coordinates[date][step], val_dict[step])
+        # One coverage per date, number and step holding the profile over levels
+        for group, values in table.groups(("date", "number", "step"), ("level",), point=0):
+            self.add_coverage(table.metadata(group), coordinates[group["date"]][group["step"]], values)
+            yield
 
         end = time.time()
         delta = end - start
         logging.debug("Coverage creation: %s", end)  # noqa: E501
         logging.debug("Coverage creation: %s", delta)  # noqa: E501
-
-        return self.covjson
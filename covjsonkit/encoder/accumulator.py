@@ -0,0 +1,318 @@
+import itertools
+
+import numpy as np
+
+DIMS = ("date", "level", "number", "param", "step")
+
+
+def field_labels(fields, levels="levels", steps="step"):
+    """Labels of each dimension, in output order, from the fields filled by walk_tree."""
+    return {
+        "date": fields["dates"],
+        "level": fields[levels],
+        "number": fields["number"],
+        "param": fields["param"],
+        "step": fields[steps],
+    }
+
+
+class RangeAccumulator:
+    """
+    Columnar store for the leaf results of a polytope tree.
+
+    Each (date, level, number, param, step) combination that a leaf writes
+    to is a row of a single float array, with its own fill count, so a row
+    holds exactly the values the leaves appended to it, in order. Only the
+    combinations seen get a row: a path whose waypoints each have their own
+    step and level has a row per waypoint, not per level and step. Rows and
+    their length grow in amortized chunks.
+    """
+
+    def __init__(self, capacity=64):
+        self.labels = {dim: {} for dim in DIMS}
+        # Row of each combination of label indices
+        self.rows = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.data = np.full((0, capacity), np.nan)
+        # Rows of the labels of each leaf seen, and whether they are distinct
+        self._blocks = {}
+
+    def __repr__(self):
+        shape = ", ".join(f"{dim}={len(self.labels[dim])}" for dim in DIMS)
+        return f"RangeAccumulator({shape}, rows={len(self.rows)}, points={int(self.counts.max(initial=0))})"
+
+    def _index(self, dim, label):
+        index = self.labels[dim]
+        if label not in index:
+            index[label] = len(index)
+        return index[label]
+
+    def _reserve(self, rows, capacity):
+        old_rows, old_capacity = self.data.shape
+        if rows <= old_rows and capacity <= old_capacity:
+            return
+
+        # Grow the rows or their length, whichever is too small, to at least double
+        new_rows = old_rows if rows <= old_rows else max(rows, 2 * old_rows)
+        new_capacity = old_capacity if capacity <= old_capacity else max(capacity, 2 * old_capacity)
+
+        counts = np.zeros(new_rows, dtype=np.int64)
+        data = np.full((new_rows, new_capacity), np.nan)
+        counts[:old_rows] = self.counts
+        data[:old_rows, :old_capacity] = self.data
+        self.counts = counts
+        self.data = data
+
+    def _block(self, date, levels, numbers, params, steps):
+        key = (date, tuple(levels), tuple(numbers), tuple(params), tuple(steps))
+        block = self._blocks.get(key)
+        if block is None:
+            indices = [[self._index(dim, label) for label in labels] for dim, labels in zip(DIMS, ([date],) + key[1:])]
+            rows = []
+            for combination in itertools.product(*indices):
+                if combination not in self.rows:
+                    self.rows[combination] = len(self.rows)
+                rows.append(self.rows[combination])
+            self._reserve(len(self.rows), self.data.shape[1])
+            block = (np.array(rows, dtype=np.intp), len(set(rows)) == len(rows))
+            self._blocks[key] = block
+        return block
+
+    def add(self, date, levels, numbers, params, steps, values):
+        """
+        Append the results of one leaf. ``values`` is ordered level, number,
+        param, step and then points, as returned by polytope.
+        """
+        rows, distinct = self._block(date, levels, numbers, params, steps)
+        block = np.asarray(values, dtype=np.float64).reshape(rows.shape + (-1,))
+        width = block.shape[-1]
+
+        offsets = self.counts[rows]
+        self._reserve(len(self.rows), int(offsets.max(initial=0)) + width)
+
+        if distinct and (offsets == offsets[0]).all():
+            start = int(offsets[0])
+            self.data[rows, start : start + width] = block
+            self.counts[rows] += width
+        else:
+            # Rows filled to different lengths, or repeated labels
+            for row, values in zip(rows.tolist(), block):
+                start = int(self.counts[row])
+                self.data[row, start : start + width] = values
+                self.counts[row] += width
+
+    def remove(self, key):
+        """Drop the values of a row, as if it had never been written."""
+        row = self._row(key)
+        if row is not None:
+            self.counts[row] = 0
+
+    def _row(self, key):
+        combination = []
+        for dim, label in zip(DIMS, key):
+            index = self.labels[dim].get(label)
+            if index is None:
+                return None
+            combination.append(index)
+        row = self.rows.get(tuple(combination))
+        if row is None or self.counts[row] == 0:
+            return None
+        return row
+
+    def keys(self):
+        labels = [list(self.labels[dim]) for dim in DIMS]
+        for combination, row in self.rows.items():
+            if self.counts[row] > 0:
+                yield tuple(labels[axis][i] for axis, i in enumerate(combination))
+
+    def __contains__(self, key):
+        return self._row(key) is not None
+
+    def __getitem__(self, key):
+        row = self._row(key)
+        if row is None:
+            raise KeyError(key)
+        return self.data[row, : int(self.counts[row])]
+
+    def _join(self, rows):
+        counts = self.counts[rows]
+        if (counts == counts[0]).all():
+            return self.data[rows, : int(counts[0])].ravel()
+        return np.concatenate([self.data[row, :count] for row, count in zip(rows.tolist(), counts.tolist())])
+
+    def concat(self, keys, skip_missing=False):
+        """
+        Values of several rows joined end to end. Missing rows raise a
+        KeyError unless ``skip_missing`` is set; returns None if no row exists.
+        """
+        rows = []
+        for key in keys:
+            row = self._row(key)
+            if row is None:
+                if skip_missing:
+                    continue
+                raise KeyError(key)
+            rows.append(row)
+        if len(rows) == 0:
+            return None
+        return self._join(np.array(rows, dtype=np.intp))
+
+    def take(self, keys, point=0):
+        """The value at ``point`` of each row, e.g. a time series over steps."""
+        rows = []
+        for key in keys:
+            row = self._row(key)
+            if row is None or self.counts[row] <= point:
+                raise KeyError(key)
+            rows.append(row)
+        if len(rows) == 0:
+            return np.empty(0)
+        return self.data[np.array(rows, dtype=np.intp), point]
+
+    def groups(self, labels, group_by, join, skip_missing=False, point=None):
+        """
+        Split the accumulated rows into coverages.
+
+        ``labels`` maps each dimension to its labels in output order. One
+        group is yielded per combination of the ``group_by`` labels, as a
+        (group, values) pair where group maps those dimensions to labels and
+        values maps each param to the rows of the ``join`` dimensions joined
+        in order (or, with ``point``, to the value at that point of each row).
+        Every key is looked up once, so this is linear in the number of keys.
+        With ``skip_missing``, only the rows written are visited, so it is
+        linear in the number of rows however sparse they are.
+        """
+        labels = {dim: list(dict.fromkeys(labels[dim])) for dim in DIMS}
+        group_products = itertools.product(*(labels[dim] for dim in group_by))
+        order = [DIMS.index(dim) for dim in group_by] + [DIMS.index("param")] + [DIMS.index(dim) for dim in join]
+        if sorted(order) != list(range(len(DIMS))):
+            order = None
+
+        dense = None if order is None else self._dense_groups(labels, order, point)
+        if dense is not None:
+            # Every row exists and has the same length: each range is a view
+            for group_labels, index in zip(group_products, np.ndindex(*dense.shape[: len(group_by)])):
+                values = {para: dense[index + (p,)] for p, para in enumerate(labels["param"])}
+                yield dict(zip(group_by, group_labels)), values
+            return
+
+        if skip_missing and point is None and order is not None:
+            spans, rows = self._sparse_groups(labels, order, len(group_by))
+            for group_labels, index in zip(group_products, np.ndindex(*(len(labels[dim]) for dim in group_by))):
+                values = {}
+                for p, para in enumerate(labels["param"]):
+                    span = spans.get(index + (p,))
+                    if span is not None:
+                        values[para] = self._join(rows[span[0] : span[1]])
+                yield dict(zip(group_by, group_labels)), values
+            return
+
+        join_labels = list(itertools.product(*(labels[dim] for dim in join)))
+        group_axes = [DIMS.index(dim) for dim in group_by]
+        join_axes = [DIMS.index(dim) for dim in join]
+        param_axis = DIMS.index("param")
+
+        key = [None] * len(DIMS)
+        for group_labels in group_products:
+            for axis, label in zip(group_axes, group_labels):
+                key[axis] = label
+            values = {}
+            for para in labels["param"]:
+                key[param_axis] = para
+                keys = []
+                for joined in join_labels:
+                    for axis, label in zip(join_axes, joined):
+                        key[axis] = label
+                    keys.append(tuple(key))
+                if point is not None:
+                    values[para] = self.take(keys, point)
+                    continue
+                row = self.concat(keys, skip_missing=skip_missing)
+                if row is not None:
+                    values[para] = row
+            yield dict(zip(group_by, group_labels)), values
+
+    def _sparse_groups(self, labels, order, size):
+        """
+        The rows written under ``labels``, sorted by the positions of their
+        labels along the axes in ``order``, and the (start, stop) span of
+        these rows of each combination of positions of the first ``size``
+        axes and the param axis.
+        """
+        ranks = []
+        for dim in DIMS:
+            index = self.labels[dim]
+            rank = np.full(len(index), -1, dtype=np.intp)
+            for position, label in enumerate(labels[dim]):
+                if label in index:
+                    rank[index[label]] = position
+            ranks.append(rank)
+
+        combinations = np.array(list(self.rows), dtype=np.intp).reshape(-1, len(DIMS))
+        rows = np.fromiter(self.rows.values(), dtype=np.intp, count=len(self.rows))
+        positions = np.column_stack([ranks[axis][combinations[:, axis]] for axis in order])
+        keep = (positions >= 0).all(axis=1) & (self.counts[rows] > 0)
+        positions, rows = positions[keep], rows[keep]
+        sort = np.lexsort(positions.T[::-1])
+        positions, rows = positions[sort], rows[sort]
+
+        heads = positions[:, : size + 1]
+        starts = np.flatnonzero(np.r_[True, (heads[1:] != heads[:-1]).any(axis=1)]) if len(rows) else []
+        stops = np.r_[starts[1:], len(rows)] if len(rows) else []
+        spans = {tuple(heads[start].tolist()): (start, stop) for start, stop in zip(starts, stops)}
+        return spans, rows
+
+    def _dense_rows(self, labels):
+        """
+        The rows of every combination of labels, as an array with an axis
+        per dimension, and their common length, or None when rows are
+        missing or differ in length.
+        """
+        indices = []
+        for dim in DIMS:
+            index = self.labels[dim]
+            if len(labels[dim]) == 0 or any(label not in index for label in labels[dim]):
+                return None
+            indices.append([index[label] for label in labels[dim]])
+
+        shape = tuple(len(index) for index in indices)
+        if np.prod(shape) > len(self.rows):
+            return None
+        rows = []
+        for combination in itertools.product(*indices):
+            row = self.rows.get(combination)
+            if row is None:
+                return None
+            rows.append(row)
+        rows = np.array(rows, dtype=np.intp).reshape(shape)
+
+        counts = self.counts[rows]
+        count = int(counts.flat[0])
+        if count == 0 or (counts != count).any():
+            return None
+        return rows, count
+
+    def is_dense(self, labels):
+        """Whether every combination of labels has a row, all of the same length."""
+        return self._dense_rows({dim: list(dict.fromkeys(labels[dim])) for dim in DIMS}) is not None
+
+    def _dense_groups(self, labels, order, point):
+        """
+        The selected rows as one array with the axes in ``order`` (group_by,
+        param, join) and then the joined values, or None when rows are
+        missing or differ in length.
+        """
+        dense = self._dense_rows(labels)
+        if dense is None:
+            return None
+        rows, count = dense
+        if point is not None and count <= point:
+            return None
+
+        if point is None:
+            selected = self.data[rows, :count].transpose(order + [len(DIMS)])
+        else:
+            selected = self.data[rows, point].transpose(order)
+        # The group_by axes come before the param axis
+        shape = selected.shape[: order.index(DIMS.index("param")) + 1] + (-1,)
+        return np.ascontiguousarray(selected).reshape(shape)
@@ -1,11 +1,62 @@
 from abc import ABC, abstractmethod
 
 import orjson
-from covjson_pydantic.coverage import CoverageCollection
-from covjson_pydantic.domain import DomainType
 
 from covjsonkit.param_db import get_param_ids, get_params, get_units
 
+from .grid import axis_size, detect_grid
+from .table import PolytopeTable
+from .writer import JSON_OPTIONS, CoverageCollectionWriter
+
+NON_LEAF_AXES = ("latitude", "longitude", "param", "date")
+
+
+def _enter_node(node, fields, coords, mars_metadata):
+    name = node.axis.name
+    values = node.values
+
+    if name not in NON_LEAF_AXES:
+        mars_metadata[name] = values[0]
+
+    if name == "latitude":
+        if values[0] is not None:
+            fields["lat"] = values[0]
+    elif name == "levelist":
+        fields["levels"] = values
+        if "l" in fields:
+            fields["l"].extend(values)
+    elif name == "param":
+        fields["param"] = values
+    elif name in ("date", "time"):
+        dates = [f"{date}Z" for date in values]
+        mars_metadata["Forecast date"] = str(values[0])
+        for date in dates:
+            coords[date] = []
+        fields["dates"].extend(dates)
+    elif name == "number":
+        fields["number"] = values
+    elif name == "step":
+        fields["step"] = values
+        if "s" in fields:
+            fields["s"].extend(values)
+
+
+def _visit_leaf(node, fields, coords, accumulator):
+    if all(val is None for val in node.result):
+        fields["dates"] = fields["dates"][:-1]
+        for date in fields["dates"]:
+            for level in fields["levels"]:
+                for num in fields["number"]:
+                    for para in fields["param"]:
+                        for s in fields["step"]:
+                            accumulator.remove((date, level, num, para, s))
+        return
+
+    date = fields["dates"][-1]
+    # Points are kept per leaf, as a latitude and its longitudes
+    coords[date].append((fields["lat"], node.values))
+    accumulator.add(date, fields["levels"], fields["number"], fields["param"], fields["step"], node.result)
+
 
 class Encoder(ABC):
     def __init__(self, type, domaintype):
@@ -22,29 +73,50 @@ class Encoder(ABC):
 
         domaintype = domaintype.lower()
 
+        # Plain strings matching covjson_pydantic's DomainType values so that
+        # pydantic is only imported when pydantic_coverage is used
         if domaintype == "pointseries":
-            self.domaintype = DomainType.point_series
+            self.domaintype = "PointSeries"
         elif domaintype == "multipoint":
-            self.domaintype = DomainType.multi_point
+            self.domaintype = "MultiPoint"
         elif domaintype == "polygon":
-            self.domaintype = DomainType.multi_point
+            self.domaintype = "MultiPoint"
         elif domaintype == "boundingbox":
-            self.domaintype = DomainType.multi_point
+            self.domaintype = "MultiPoint"
         elif domaintype == "shapefile":
-            self.domaintype = DomainType.multi_point
+            self.domaintype = "MultiPoint"
         elif domaintype == "frame":
-            self.domaintype = DomainType.multi_point
+            self.domaintype = "MultiPoint"
         elif domaintype == "verticalprofile":
-            self.domaintype = DomainType.vertical_profile
+            self.domaintype = "VerticalProfile"
         elif domaintype == "path":
             self.domaintype = "Trajectory"
 
+        self._pydantic_coverage = None
+        self.parameters = []
+
+        self.shared_domain = self.type.shared_domain
+        self.grid_domain = self.type.grid_domain
+        self.compact_time = self.type.compact_time
+        self._shared_domains = {}
+
+    @property
+    def pydantic_coverage(self):
         # Trajectory not yet implemented in covjson-pydantic
-        if self.domaintype != "Trajectory":
-            self.pydantic_coverage = CoverageCollection(
-                type="CoverageCollection", coverages=[], domainType=self.domaintype, parameters={}, referencing=[]
+        if self.domaintype == "Trajectory":
+            raise AttributeError("pydantic_coverage is not available for Trajectory coverages")
+        if self._pydantic_coverage is None:
+            from covjson_pydantic.coverage import CoverageCollection
+            from covjson_pydantic.domain import DomainType
+
+            self._pydantic_coverage = CoverageCollection(
+                type="CoverageCollection",
+                coverages=[],
+                domainType=DomainType(self.domaintype),
+                parameters={},
+                referencing=[],
             )
-        self.parameters = []
+        return self._pydantic_coverage
 
     def add_parameter(self, param):
         # param_dict = get_param_from_db(param)
@@ -70,6 +142,12 @@ class Encoder(ABC):
             self.covjson["parameters"][param_dict["shortname"]] = parameter
         self.parameters.append(param)
 
+    def add_parameters(self, params):
+        if len(params) == 0:
+            raise ValueError("No parameters were returned, date requested may be out of range")
+        for para in params:
+            self.add_parameter(para)
+
     def add_reference(self, reference):
         # self.pydantic_coverage.referencing.append(
         #    ReferenceSystemConnectionObject.model_validate_json(json.dumps(reference))
@@ -80,6 +158,59 @@ class Encoder(ABC):
         # self.referencing.append(ref)
         self.covjson["referencing"] = [reference]
 
+    def grid_coords(self, table):
+        """
+        With grid_domain, the coords of a Grid domain for each date of a
+        table, if the points of every date form a grid and every range is
+        complete. Returns None otherwise.
+        """
+        if not self.grid_domain or not table.is_dense():
+            return None
+        coords = {}
+        for date, points in table.points.items():
+            axes = detect_grid(points)
+            if axes is None:
+                return None
+            coords[date] = {"grid": {"x": axes["x"], "y": axes["y"], "z": {"values": list(table.levels)}}, "t": [date]}
+        self.covjson["domainType"] = "Grid"
+        return coords
+
+    def add_grid_domain(self, coverage, coords):
+        coverage["domain"]["type"] = "Domain"
+        coverage["domain"]["domainType"] = "Grid"
+        coverage["domain"]["axes"] = dict(coords["grid"])
+        coverage["domain"]["axes"]["t"] = {"values": coords["t"]}
+
+    def add_grid_range(self, coverage, values):
+        # Values run level by level, then latitude (x) by latitude
+        axes = coverage["domain"]["axes"]
+        shape = [axis_size(axes[axis]) for axis in ("z", "x", "y")]
+        for parameter in values.keys():
+            param = self.convert_param_id_to_param(parameter)
+            coverage["ranges"][param] = {}
+            coverage["ranges"][param]["type"] = "NdArray"
+            coverage["ranges"][param]["dataType"] = "float"
+            coverage["ranges"][param]["shape"] = shape
+            coverage["ranges"][param]["axisNames"] = ["z", "x", "y"]
+            coverage["ranges"][param]["values"] = values[parameter]
+
+    def share_domain(self, coverage, coords):
+        """
+        With shared_domain, only the first coverage built from a coords object
+        carries the domain, with an id. Later coverages built from the same
+        coords refer to it by that id instead of repeating it.
+        """
+        if not self.shared_domain:
+            return
+        shared = self._shared_domains.get(id(coords))
+        if shared is not None:
+            coverage["domain"] = shared[1]
+            return
+        domain_id = f"#domain-{len(self._shared_domains)}"
+        coverage["domain"]["id"] = domain_id
+        # Keep coords alive so that its id is not reused by another object
+        self._shared_domains[id(coords)] = (coords, domain_id)
+
     def convert_param_id_to_param(self, paramid):
         try:
             param = int(paramid)
@@ -91,103 +222,28 @@ class Encoder(ABC):
 
     def get_json(self):
         # self.covjson = self.pydantic_coverage.model_dump_json(exclude_none=True, indent=4)
-        return orjson.dumps(self.covjson)
-
-    def walk_tree(self, tree, fields, coords, mars_metadata, range_dict):
-        def create_composite_key(date, level, num, para, s):
-            return (date, level, num, para, s)
-
-        def handle_non_leaf_node(child):
-            non_leaf_axes = ["latitude", "longitude", "param", "date"]
-            if child.axis.name not in non_leaf_axes:
-                mars_metadata[child.axis.name] = child.values[0]
-
-        def handle_specific_axes(child):
-            if child.axis.name == "latitude":
-                return child.values[0]
-            if child.axis.name == "levelist":
-                return child.values
-            if child.axis.name == "param":
-                return child.values
-            if child.axis.name in ["date", "time"]:
-                dates = [f"{date}Z" for date in child.values]
-                mars_metadata["Forecast date"] = str(child.values[0])
-                for date in dates:
-                    coords[date] = {}
-                    coords[date]["composite"] = []
-                    coords[date]["t"] = [date]
-                return dates
-            if child.axis.name == "number":
-                return child.values
-            if child.axis.name == "step":
-                return child.values
-            return None
+        return orjson.dumps(self.covjson, option=JSON_OPTIONS)
 
-        def calculate_index_bounds(level_len, num_len, para_len, step_len, l, i, j, k):  # noqa: E741
-            start_index = int(l * level_len) + int(i * num_len) + int(j * para_len) + int(k * step_len)
-            end_index = start_index + int(step_len)
-            return start_index, end_index
-
-        def append_composite_coords(dates, tree_values, lat, coords):
-            # for date in dates:
-            for value in tree_values:
-                coords[dates]["composite"].append([lat, value])
-
-        if len(tree.children) != 0:
-            for child in tree.children:
-                handle_non_leaf_node(child)
-                result = handle_specific_axes(child)
-                if result is not None:
-                    if child.axis.name == "latitude":
-                        fields["lat"] = result
-                    elif child.axis.name == "levelist":
-                        fields["levels"] = result
-                        if "l" in fields:
-                            fields["l"].extend(result)
-                    elif child.axis.name == "param":
-                        fields["param"] = result
-                    elif child.axis.name in ["date", "time"]:
-                        fields["dates"].extend(result)
-                    elif child.axis.name == "number":
-                        fields["number"] = result
-                    elif child.axis.name == "step":
-                        fields["step"] = result
-                        if "s" in fields:
-                            fields["s"].extend(result)
-
-                self.walk_tree(child, fields, coords, mars_metadata, range_dict)
-        else:
-            tree.values = [float(val) for val in tree.values]
-            if all(val is None for val in tree.result):
-                fields["dates"] = fields["dates"][:-1]
-                for date in fields["dates"]:
-                    for level in fields["levels"]:
-                        for num in fields["number"]:
-                            for para in fields["param"]:
-                                for s in fields["step"]:
-                                    key = create_composite_key(date, level, num, para, s)
-                                    if key in range_dict:
-                                        del range_dict[key]
+    def walk_tree(self, tree, fields, coords, mars_metadata, accumulator):
+        # Iterative pre-order traversal: each node is entered (updating
+        # fields, coords and mars_metadata) right before its subtree is walked.
+        # Leaf results are written into the RangeAccumulator
+        if len(tree.children) == 0:
+            _visit_leaf(tree, fields, coords, accumulator)
+            return
+
+        stack = list(reversed(tree.children))
+        while stack:
+            node = stack.pop()
+            _enter_node(node, fields, coords, mars_metadata)
+            if len(node.children) != 0:
+                stack.extend(reversed(node.children))
             else:
-                tree.result = [float(val) if val is not None else val for val in tree.result]
-                level_len = len(tree.result) / len(fields["levels"])
-                num_len = level_len / len(fields["number"])
-                para_len = num_len / len(fields["param"])
-                step_len = para_len / len(fields["step"])
-
-                append_composite_coords(fields["dates"][-1], tree.values, fields["lat"], coords)
-
-                for l, level in enumerate(fields["levels"]):  # noqa: E741
-                    for i, num in enumerate(fields["number"]):
-                        for j, para in enumerate(fields["param"]):
-                            for k, s in enumerate(fields["step"]):
-                                start_index, end_index = calculate_index_bounds(
-                                    level_len, num_len, para_len, step_len, l, i, j, k
-                                )
-                                key = create_composite_key(fields["dates"][-1], level, num, para, s)
-                                if key not in range_dict:
-                                    range_dict[key] = []
-                                range_dict[key].extend(tree.result[start_index:end_index])
+                _visit_leaf(node, fields, coords, accumulator)
+
+    def flatten(self, result, path=False):
+        """Walk a polytope tree into the PolytopeTable the encoders project."""
+        return PolytopeTable.from_polytope(self.walk_tree, result, path=path)
 
     @abstractmethod
     def add_coverage(self, mars_metadata, coords, values):
@@ -209,6 +265,40 @@ class Encoder(ABC):
     def from_xarray(self, dataset):
         pass
 
-    @abstractmethod
     def from_polytope(self, result):
-        pass
+        for _ in self.iter_polytope(result):
+            pass
+        return self.covjson
+
+    def iter_json(self, result):
+        """
+        Encode a polytope result as JSON byte chunks: the collection header,
+        then each coverage as soon as it is made. The coverages are not kept,
+        so memory stays bounded by a single coverage.
+        """
+        chunks = []
+        writer = CoverageCollectionWriter(self.covjson, chunks.append)
+        self.covjson["coverages"] = writer
+        try:
+            for _ in self.iter_polytope(result):
+                yield from chunks
+                chunks.clear()
+            writer.close()
+            yield from chunks
+        finally:
+            self.covjson["coverages"] = []
+
+    def write_json(self, result, out):
+        """
+        Stream a polytope result to a file object opened in binary mode or to
+        a socket.
+        """
+        write = out.sendall if hasattr(out, "sendall") else out.write
+        for chunk in self.iter_json(result):
+            write(chunk)
+
+    @abstractmethod
+    def iter_polytope(self, result):
+        """
+        Encode a polytope result, yielding each time a coverage was added.
+        """
@@ -0,0 +1,45 @@
+import numpy as np
+
+# Largest difference, in degrees, between a coordinate and its place on a
+# regular axis for the axis to still be written as start/stop/num
+TOLERANCE = 1e-9
+
+
+def regular_axis(values):
+    """
+    A CoverageJSON axis for coordinate values: start/stop/num when they are
+    evenly spaced, their explicit values otherwise.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if len(values) > 1:
+        regular = np.linspace(values[0], values[-1], len(values))
+        if np.abs(values - regular).max() <= TOLERANCE:
+            return {"start": float(values[0]), "stop": float(values[-1]), "num": len(values)}
+    return {"values": values}
+
+
+def axis_size(axis):
+    if "num" in axis:
+        return axis["num"]
+    return len(axis["values"])
+
+
+def detect_grid(points):
+    """
+    The x (latitude) and y (longitude) axes of (lat, lon) points that form a
+    grid row by row: one row per latitude, each row with the same
+    longitudes. Returns None for any other set of points.
+    """
+    if len(points) == 0:
+        return None
+    lats = points[:, 0]
+    starts = np.flatnonzero(np.r_[True, lats[1:] != lats[:-1]])
+    rows = len(starts)
+    columns = len(points) // rows
+    if rows * columns != len(points) or (np.diff(np.r_[starts, len(points)]) != columns).any():
+        return None
+
+    grid = points.reshape(rows, columns, 2)
+    if len(np.unique(grid[:, 0, 0])) != rows or (grid[:, :, 1] != grid[0, :, 1]).any():
+        return None
+    return {"x": regular_axis(grid[:, 0, 0]), "y": regular_axis(grid[0, :, 1])}
@@ -0,0 +1,147 @@
+"""
+Point-in-polygon tests for clipping points to WKT or shapefile geometries.
+
+Geometries are read into polygons, each a list of (lon, lat) rings: the
+exterior first, then its holes. A point is in a polygon if a ray from it
+crosses the polygon's rings an odd number of times, which leaves the holes
+out. Points are first filtered by the bounding box of each polygon, and the
+crossings are counted for every remaining point and edge at once, in
+chunks of points.
+"""
+
+import re
+
+import numpy as np
+
+# Points by edges compared at once
+CHUNK = 1 << 22
+
+_WKT = re.compile(r"^\s*(MULTIPOLYGON|POLYGON)\s*(?:ZM|Z|M)?\s*(.*?)\s*$", re.IGNORECASE | re.DOTALL)
+_WKT_TOKEN = re.compile(r"\(|\)|,|[^(),]+")
+
+
+def _parse_wkt(text):
+    match = _WKT.match(text)
+    if match is None:
+        raise ValueError("Only POLYGON and MULTIPOLYGON WKT geometries are supported")
+    kind, body = match.group(1).upper(), match.group(2)
+    if body.upper() == "EMPTY":
+        return []
+
+    tokens = [token.strip() for token in _WKT_TOKEN.findall(body) if token.strip()]
+    pos = 0
+
+    def parse():
+        nonlocal pos
+        if tokens[pos] != "(":
+            coordinates = tokens[pos].split()
+            pos += 1
+            return [float(value) for value in coordinates]
+        pos += 1
+        items = [parse()]
+        while tokens[pos] == ",":
+            pos += 1
+            items.append(parse())
+        if tokens[pos] != ")":
+            raise ValueError(f"Malformed WKT near {tokens[pos]!r}")
+        pos += 1
+        return items
+
+    try:
+        coordinates = parse()
+    except IndexError:
+        raise ValueError("Malformed WKT: unbalanced parentheses") from None
+    return [coordinates] if kind == "POLYGON" else coordinates
+
+
+def _geometry_polygons(geometry):
+    """The polygons of a GeoJSON-like geometry, feature or collection, as nested coordinate lists."""
+    kind = geometry.get("type")
+    if kind == "Polygon":
+        return [geometry["coordinates"]]
+    if kind == "MultiPolygon":
+        return list(geometry["coordinates"])
+    if kind == "GeometryCollection":
+        return [polygon for part in geometry["geometries"] for polygon in _geometry_polygons(part)]
+    if kind == "Feature":
+        return _geometry_polygons(geometry["geometry"])
+    if kind == "FeatureCollection":
+        return [polygon for feature in geometry["features"] for polygon in _geometry_polygons(feature)]
+    raise ValueError(f"Geometries of type {kind} cannot be used to clip points")
+
+
+def polygons(geometry):
+    """
+    The polygons of ``geometry`` as lists of closed (n, 2) arrays of (lon,
+    lat) rings. ``geometry`` is WKT, a GeoJSON-like mapping, an object with a
+    ``__geo_interface__`` (shapely geometries, or pyshp shapes and readers),
+    or a list of these.
+    """
+    if isinstance(geometry, str):
+        parts = _parse_wkt(geometry)
+    elif hasattr(geometry, "__geo_interface__"):
+        parts = _geometry_polygons(geometry.__geo_interface__)
+    elif isinstance(geometry, dict):
+        parts = _geometry_polygons(geometry)
+    elif isinstance(geometry, (list, tuple)):
+        return [polygon for part in geometry for polygon in polygons(part)]
+    else:
+        raise TypeError("Polygon must be WKT, a GeoJSON-like mapping or an object with __geo_interface__")
+
+    result = []
+    for rings in parts:
+        closed = []
+        for ring in rings:
+            ring = np.asarray(ring, dtype=np.float64)[:, :2]
+            if len(ring) and not np.array_equal(ring[0], ring[-1]):
+                ring = np.vstack((ring, ring[:1]))
+            if len(ring) >= 4:
+                closed.append(ring)
+        if closed:
+            result.append(closed)
+    return result
+
+
+def _odd_crossings(rings, lons, lats):
+    """Whether a ray east from each point crosses the edges of ``rings`` an odd number of times."""
+    edges = np.concatenate([np.stack((ring[:-1], ring[1:]), axis=1) for ring in rings])
+    (x1, y1), (x2, y2) = edges[:, 0].T, edges[:, 1].T
+    # Horizontal edges never straddle a point, so their slope is never used
+    slope = np.divide(x2 - x1, y2 - y1, out=np.zeros_like(x1), where=y2 != y1)
+
+    odd = np.zeros(len(lons), dtype=bool)
+    step = max(1, CHUNK // len(edges))
+    for start in range(0, len(lons), step):
+        x = lons[start : start + step, np.newaxis]
+        y = lats[start : start + step, np.newaxis]
+        crossings = ((y1 > y) != (y2 > y)) & (x < x1 + (y - y1) * slope)
+        odd[start : start + step] = np.count_nonzero(crossings, axis=1) % 2 == 1
+    return odd
+
+
+def contains(geometry, lons, lats):
+    """
+    Whether each (lon, lat) point is inside ``geometry`` (see ``polygons``).
+    Longitudes are compared modulo 360 so that points and polygons need not
+    use the same longitude range.
+    """
+    lons = np.asarray(lons, dtype=np.float64).ravel()
+    lats = np.asarray(lats, dtype=np.float64).ravel()
+    inside = np.zeros(len(lons), dtype=bool)
+    for rings in polygons(geometry):
+        (west, south), (east, north) = rings[0].min(axis=0), rings[0].max(axis=0)
+        # Longitudes of the points from the west edge of the polygon
+        shifted = west + (lons - west) % 360.0
+        candidates = np.flatnonzero(~inside & (lats >= south) & (lats <= north) & (shifted <= east))
+        if len(candidates):
+            inside[candidates] = _odd_crossings(rings, shifted[candidates], lats[candidates])
+    return inside
+
+
+def clip_points(dataset, geometry):
+    """
+    The points of a dataset with x (latitude) and y (longitude) coordinates
+    along one dimension that are inside ``geometry``.
+    """
+    inside = contains(geometry, dataset.y.values, dataset.x.values)
+    return dataset.isel({dataset.x.dims[0]: np.flatnonzero(inside)})
@@ -0,0 +1,133 @@
+import numpy as np
+
+from .accumulator import DIMS, RangeAccumulator, field_labels
+from .valid_time import iso_format, step_offsets, valid_times
+
+
+def time_axis(date, steps, compact=False):
+    """
+    The t axis of a forecast date over its steps. With ``compact``,
+    evenly spaced steps are written as start/stop/num and only the first
+    and last valid times are formatted.
+    """
+    if compact and len(steps) > 1:
+        spacing = np.diff(step_offsets(steps))
+        if spacing[0] > np.timedelta64(0) and (spacing == spacing[0]).all():
+            start, stop = iso_format(valid_times(date, [steps[0], steps[-1]]))
+            return {"start": start, "stop": stop, "num": len(steps)}
+    return {"values": iso_format(valid_times(date, steps))}
+
+
+def leaf_points(leaves):
+    """The (lat, lon) points of (lat, longitudes) leaves as an (n, 2) array."""
+    if len(leaves) == 0:
+        return np.empty((0, 2))
+    lons = [np.asarray(values, dtype=np.float64) for _, values in leaves]
+    lats = np.repeat(np.array([lat for lat, _ in leaves], dtype=np.float64), [len(values) for values in lons])
+    return np.column_stack((lats, np.concatenate(lons)))
+
+
+class PolytopeTable:
+    """
+    Intermediate representation of a polytope result shared by the encoders.
+
+    A table holds the labels of each dimension in DIMS in output order, the
+    (lat, lon) points of each date, the mars metadata of the request and the
+    accumulated range values, which are split into coverages with
+    ``groups``; each feature encoder only projects these into its
+    CoverageJSON layout.
+    """
+
+    def __init__(self, labels, points, mars_metadata, accumulator, fields):
+        self.labels = labels
+        self.points = points
+        self.mars_metadata = mars_metadata
+        self.accumulator = accumulator
+        self.fields = fields
+
+    @classmethod
+    def from_polytope(cls, walk_tree, result, path=False):
+        """
+        Flatten a polytope tree with ``walk_tree``. For paths the step and
+        level labels are those of every leaf along the path.
+        """
+        coords = {}
+        mars_metadata = {}
+        accumulator = RangeAccumulator()
+        fields = {}
+        fields["lat"] = 0
+        fields["param"] = 0
+        fields["number"] = [0]
+        fields["step"] = 0
+        fields["dates"] = []
+        fields["levels"] = [0]
+        if path:
+            fields["s"] = []
+            fields["l"] = []
+
+        walk_tree(result, fields, coords, mars_metadata, accumulator)
+
+        if fields["param"] == 0:
+            fields["param"] = []
+        if path:
+            if len(fields["l"]) == 0:
+                fields["l"] = [0]
+            labels = field_labels(fields, levels="l", steps="s")
+        else:
+            labels = field_labels(fields)
+        points = {date: leaf_points(leaves) for date, leaves in coords.items()}
+        return cls(labels, points, mars_metadata, accumulator, fields)
+
+    def __repr__(self):
+        shape = ", ".join(f"{dim}={len(self.labels[dim])}" for dim in DIMS)
+        return f"PolytopeTable({shape})"
+
+    @property
+    def dates(self):
+        return self.labels["date"]
+
+    @property
+    def levels(self):
+        return self.labels["level"]
+
+    @property
+    def numbers(self):
+        return self.labels["number"]
+
+    @property
+    def params(self):
+        return self.labels["param"]
+
+    @property
+    def steps(self):
+        return self.labels["step"]
+
+    def composite(self, date, levels=None):
+        """
+        The [lat, lon, level] of each point of a date, level by level. Levels
+        keep the type of their labels, so integer levels are written as
+        integers.
+        """
+        if levels is None:
+            levels = self.levels
+        points = self.points[date].tolist()
+        return [[lat, lon, level] for level in levels for lat, lon in points]
+
+    def metadata(self, group):
+        """The mars metadata of the coverage of a group yielded by ``groups``."""
+        mm = self.mars_metadata.copy()
+        if "number" in group:
+            mm["number"] = group["number"]
+        if "step" in group:
+            mm["step"] = group["step"]
+        if "date" in group:
+            mm["Forecast date"] = group["date"]
+        return mm
+
+    def groups(self, group_by, join, skip_missing=False, point=None):
+        """See RangeAccumulator.groups."""
+        return self.accumulator.groups(self.labels, group_by, join, skip_missing=skip_missing, point=point)
+
+    def is_dense(self):
+        """Whether every combination of labels has values, all of the same length."""
+        return self.accumulator.is_dense(self.labels)
@@ -0,0 +1,68 @@
+"""
+Valid times of forecast steps, computed with numpy.datetime64 arithmetic.
+
+A forecast date is parsed once, the steps of a request are converted to
+timedelta64 offsets in one go, and valid times are formatted as ISO 8601
+strings through a per-process memo, so that each distinct time is only ever
+formatted once.
+"""
+
+import functools
+from datetime import timedelta
+
+import numpy as np
+
+# Formatted valid times by seconds since the epoch; cleared when full
+_iso_strings = {}
+_ISO_STRINGS_MAX = 1 << 16
+
+
+@functools.lru_cache(maxsize=1024)
+def forecast_date(date):
+    """A forecast date as datetime64[s], dropping any time zone and fraction of a second."""
+    import pandas as pd
+
+    timestamp = pd.Timestamp(date)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp.to_datetime64().astype("datetime64[s]")
+
+
+def step_offsets(steps):
+    """
+    Forecast steps as timedelta64[s]. Numbers (or numeric strings) are hours
+    and may be fractional; timedeltas are taken as they are.
+    """
+    values = np.asarray(steps)
+    if values.dtype.kind == "m":
+        return values.astype("timedelta64[s]")
+    if values.dtype.kind == "O" and values.size > 0 and isinstance(values.flat[0], timedelta):
+        return np.array(steps, dtype="timedelta64[us]").astype("timedelta64[s]")
+    seconds = np.rint(values.astype(np.float64) * 3600).astype(np.int64)
+    return seconds.astype("timedelta64[s]")
+
+
+def valid_times(date, steps):
+    """The valid times of a forecast date at each step, as datetime64[s]."""
+    return forecast_date(date) + step_offsets(steps)
+
+
+def valid_time_grid(dates, steps):
+    """The valid times of every date (rows) at every step (columns)."""
+    base = np.array([forecast_date(date) for date in dates], dtype="datetime64[s]")
+    return base[:, np.newaxis] + step_offsets(steps)[np.newaxis, :]
+
+
+def iso_format(times):
+    """ISO 8601 strings, ending in Z, of datetime64 values."""
+    seconds = np.asarray(times, dtype="datetime64[s]").astype(np.int64).ravel().tolist()
+    formatted = {second: _iso_strings.get(second) for second in set(seconds)}
+    missing = [second for second, string in formatted.items() if string is None]
+    if missing:
+        strings = np.datetime_as_string(np.array(missing, dtype="datetime64[s]"), unit="s")
+        new = {second: string + "Z" for second, string in zip(missing, strings.tolist())}
+        formatted.update(new)
+        if len(_iso_strings) + len(new) > _ISO_STRINGS_MAX:
+            _iso_strings.clear()
+        _iso_strings.update(new)
+    return [formatted[second] for second in seconds]
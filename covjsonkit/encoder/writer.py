@@ -0,0 +1,43 @@
+import orjson
+
+# Range values and coordinates may be NumPy arrays
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+class CoverageCollectionWriter:
+    """
+    Stands in for the coverages list of an encoder and streams the collection
+    instead of keeping it: the header (every key of the collection but its
+    coverages) is written before the first coverage, then each appended
+    coverage is serialised and written straight away. ``close`` ends the
+    document. ``write`` is called with each chunk of bytes.
+    """
+
+    def __init__(self, covjson, write, option=JSON_OPTIONS):
+        self.covjson = covjson
+        self.write = write
+        self.option = option
+        self.count = 0
+        self.started = False
+
+    def __len__(self):
+        return self.count
+
+    def _start(self):
+        header = {key: value for key, value in self.covjson.items() if key != "coverages"}
+        prefix = orjson.dumps(header, option=self.option)[:-1]
+        self.write(prefix + (b',"coverages":[' if header else b'"coverages":['))
+        self.started = True
+
+    def append(self, coverage):
+        if not self.started:
+            self._start()
+        if self.count > 0:
+            self.write(b",")
+        self.write(orjson.dumps(coverage, option=self.option))
+        self.count += 1
+
+    def close(self):
+        if not self.started:
+            self._start()
+        self.write(b"]}")
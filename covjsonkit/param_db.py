@@ -1,17 +1,94 @@
 import json
 import os
-from os.path import dirname
+import threading
+
+from .param_store import (
+    PARAM_DB_TABLES,
+    CompiledParamTable,
+    SqliteParamTable,
+    compiled_table_path,
+    is_sqlite_param_db,
+    json_table_path,
+)
+
+# Process-wide cache of parsed parameter database tables, keyed by
+# (param_db, table). Shared by every encoder so the JSON files are only
+# parsed once per process.
+_param_db_cache = {}
+_param_db_lock = threading.Lock()
+
+
+def _load_table(param_db, table):
+    # A param_db pointing at a SQLite catalogue is queried instead of loaded
+    if is_sqlite_param_db(param_db):
+        return SqliteParamTable(param_db, table)
+    # Prefer the memory-mapped compiled table, built with
+    # `python -m covjsonkit.param_store`, and fall back to the JSON source
+    # when there is none, or it is from another version or an older source
+    path = json_table_path(param_db, table)
+    compiled_path = compiled_table_path(param_db, table)
+    if os.path.exists(compiled_path):
+        try:
+            compiled = CompiledParamTable(compiled_path)
+        except ValueError:
+            pass
+        else:
+            if compiled.is_current(path):
+                return compiled
+            compiled.close()
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_param_db_table(param_db, table):
+    """
+    Return a parameter database table ("param", "param_id" or "unit"),
+    loading it on first use and caching it for the rest of the process.
+    The returned mapping is shared and must not be modified.
+    """
+    key = (param_db, table)
+    try:
+        return _param_db_cache[key]
+    except KeyError:
+        pass
+    with _param_db_lock:
+        # Another thread may have loaded the table while we waited
+        if key not in _param_db_cache:
+            _param_db_cache[key] = _load_table(param_db, table)
+        return _param_db_cache[key]
+
+
+def clear_param_db_cache(param_db=None):
+    """
+    Drop cached parameter database tables, either for a single param_db
+    or for all of them. Tables are reloaded lazily on next use.
+    """
+    with _param_db_lock:
+        if param_db is None:
+            _param_db_cache.clear()
+        else:
+            for table in PARAM_DB_TABLES:
+                _param_db_cache.pop((param_db, table), None)
+
+
+def reload_param_db(param_db):
+    """
+    Eagerly re-read all tables of a parameter database from disk,
+    replacing any cached copies.
+    """
+    tables = {table: _load_table(param_db, table) for table in PARAM_DB_TABLES}
+    with _param_db_lock:
+        for table, values in tables.items():
+            _param_db_cache[(param_db, table)] = values
 
-from conflator import Conflator
 
-from .config import CovjsonKitConfig
+def _default_param_db():
+    from .config import default_config
 
-param_dir = os.getenv("PARAM_DIR", "ecmwf")
-conf = Conflator(app_name="covjsonkit", model=CovjsonKitConfig).load()
-param_dir = conf.param_db
+    return default_config().param_db
 
 
-def get_param_from_db(param_id):
+def get_param_from_db(param_id, param_db=None):
     """
     import requests
     url = f"https://codes.ecmwf.int/parameter-database/api/v1/param/?format=json&search={param_id}"
@@ -26,47 +103,29 @@ def get_param_from_db(param_id):
     try:
         param_id = int(param_id)
     except BaseException:
-        param_id = get_param_id_from_db(param_id)
+        param_id = get_param_id_from_db(param_id, param_db)
 
-    param_path = os.path.join(dirname(__file__), f"data/{param_dir}/param.json")
-    with open(param_path) as f:
-        params = json.load(f)
+    params = get_param_db_table(param_db or _default_param_db(), "param")
     return params[str(param_id)]
 
 
-def get_param_id_from_db(param_id):
-    param_id_path = os.path.join(dirname(__file__), f"data/{param_dir}/param_id.json")
-    with open(param_id_path) as f:
-        param_ids = json.load(f)
+def get_param_id_from_db(param_id, param_db=None):
+    param_ids = get_param_db_table(param_db or _default_param_db(), "param_id")
     return param_ids[str(param_id)]
 
 
-def get_unit_from_db(unit_id):
-    unit_path = os.path.join(dirname(__file__), f"data/{param_dir}/unit.json")
-    with open(unit_path) as f:
-        units = json.load(f)
+def get_unit_from_db(unit_id, param_db=None):
+    units = get_param_db_table(param_db or _default_param_db(), "unit")
     return units[str(unit_id)]
 
 
 def get_param_ids(conf):
-    param_dir = conf.param_db
-    param_id_path = os.path.join(dirname(__file__), f"data/{param_dir}/param_id.json")
-    with open(param_id_path) as f:
-        param_ids = json.load(f)
-    return param_ids
+    return get_param_db_table(conf.param_db, "param_id")
 
 
 def get_params(conf):
-    param_dir = conf.param_db
-    param_path = os.path.join(dirname(__file__), f"data/{param_dir}/param.json")
-    with open(param_path) as f:
-        params = json.load(f)
-    return params
+    return get_param_db_table(conf.param_db, "param")
 
 
 def get_units(conf):
-    param_dir = conf.param_db
-    unit_path = os.path.join(dirname(__file__), f"data/{param_dir}/unit.json")
-    with open(unit_path) as f:
-        units = json.load(f)
-    return units
+    return get_param_db_table(conf.param_db, "unit")
@@ -0,0 +1,260 @@
+"""
+Alternative storage backends for the parameter database tables.
+
+Compiled tables: each JSON table in ``data/<param_db>`` can be compiled into
+a ``<table>.bin`` file made of a sorted key table followed by packed records:
+
+    header:  magic (4s) | version (I) | count (I) | source_size (Q) | source_digest (16s)
+    index:   count x (key_offset (I), key_length (I), record_offset (I), record_length (I))
+    blob:    utf-8 keys and orjson encoded records
+
+Lookups binary search the index in the memory-mapped file and only decode
+the record that was asked for. The size and a BLAKE2b digest of the JSON
+source are stored in the header, so that a table compiled from another
+version of the source is ignored rather than served. Unlike a modification
+time, the digest survives installing or copying the package.
+
+SQLite catalogue: all tables of a parameter database in one SQLite file,
+one keyed table per JSON table. Select it by setting ``param_db`` in the
+config to the path of the ``.sqlite`` file.
+
+Compile the bundled databases with ``python -m covjsonkit.param_store``, or
+convert one to SQLite with ``python -m covjsonkit.param_store --sqlite PATH DB``.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from collections.abc import Mapping
+from os.path import dirname
+
+import orjson
+
+MAGIC = b"CJKP"
+VERSION = 3
+
+PARAM_DB_TABLES = ("param", "param_id", "unit")
+
+_header = struct.Struct("<4sIIQ16s")
+_entry = struct.Struct("<IIII")
+
+
+def is_sqlite_param_db(param_db):
+    return str(param_db).endswith(".sqlite")
+
+
+def json_table_path(param_db, table):
+    return os.path.join(dirname(__file__), f"data/{param_db}/{table}.json")
+
+
+def _load_json_table(param_db, table):
+    with open(json_table_path(param_db, table)) as f:
+        return json.load(f)
+
+
+def _source_stamp(source):
+    """The size and BLAKE2b digest of the contents of ``source``, or zeros if there is none."""
+    if source is None:
+        return 0, bytes(16)
+    with open(source, "rb") as f:
+        data = f.read()
+    return len(data), hashlib.blake2b(data, digest_size=16).digest()
+
+
+def compiled_table_path(param_db, table):
+    return os.path.join(dirname(__file__), f"data/{param_db}/{table}.bin")
+
+
+def compile_table(values, path, source=None):
+    """
+    Write a dictionary of JSON-serialisable records to ``path`` in the
+    compiled table format, stamped with the size and digest of the
+    ``source`` file they were read from.
+    """
+    items = sorted((str(key).encode("utf-8"), orjson.dumps(value)) for key, value in values.items())
+
+    offset = _header.size + _entry.size * len(items)
+    index = bytearray()
+    blob = bytearray()
+    for key, record in items:
+        key_offset = offset + len(blob)
+        blob += key
+        record_offset = offset + len(blob)
+        blob += record
+        index += _entry.pack(key_offset, len(key), record_offset, len(record))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_header.pack(MAGIC, VERSION, len(items), *_source_stamp(source)))
+        f.write(index)
+        f.write(blob)
+    # Atomic so that concurrently starting processes never map a partial file
+    os.replace(tmp_path, path)
+
+
+def compile_param_db(param_db, tables=PARAM_DB_TABLES):
+    """
+    Compile the JSON tables of a bundled parameter database next to their
+    sources.
+    """
+    for table in tables:
+        source = json_table_path(param_db, table)
+        compile_table(_load_json_table(param_db, table), compiled_table_path(param_db, table), source)
+
+
+class CompiledParamTable(Mapping):
+    """
+    Read-only mapping over a compiled table file. Records are decoded on
+    access and memoised, everything else stays in the page cache.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _header.size:
+            magic = version = None
+        else:
+            magic, version, count, *source_stamp = _header.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a compiled parameter table (version {VERSION})")
+
+        self.path = path
+        self.source_stamp = tuple(source_stamp)
+        self._count = count
+        self._records = {}
+
+    def is_current(self, source):
+        """Whether the table was compiled from ``source`` as it is now."""
+        if not os.path.exists(source) or os.path.getsize(source) != self.source_stamp[0]:
+            return False
+        return _source_stamp(source) == self.source_stamp
+
+    def close(self):
+        self._mmap.close()
+
+    def _key(self, i):
+        key_offset, key_length, _, _ = _entry.unpack_from(self._mmap, _header.size + i * _entry.size)
+        return self._mmap[key_offset : key_offset + key_length]
+
+    def _find(self, key):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == key:
+            return lo
+        return None
+
+    def __getitem__(self, key):
+        key = str(key)
+        try:
+            return self._records[key]
+        except KeyError:
+            pass
+        i = self._find(key.encode("utf-8"))
+        if i is None:
+            raise KeyError(key)
+        _, _, record_offset, record_length = _entry.unpack_from(self._mmap, _header.size + i * _entry.size)
+        value = orjson.loads(self._mmap[record_offset : record_offset + record_length])
+        self._records[key] = value
+        return value
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._key(i).decode("utf-8")
+
+    def __len__(self):
+        return self._count
+
+
+def build_sqlite_param_db(param_db, path):
+    """
+    Convert the JSON tables of a bundled parameter database ("ecmwf", "dwd")
+    into a single SQLite catalogue at ``path``.
+    """
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        for table in PARAM_DB_TABLES:
+            connection.execute(f"CREATE TABLE {table} (key TEXT PRIMARY KEY, record TEXT NOT NULL) WITHOUT ROWID")
+            connection.executemany(
+                f"INSERT INTO {table} VALUES (?, ?)",
+                ((key, orjson.dumps(value).decode()) for key, value in _load_json_table(param_db, table).items()),
+            )
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+
+class SqliteParamTable(Mapping):
+    """
+    Read-only mapping over one table of a SQLite parameter catalogue. The
+    file is opened read-only, once per thread, so worker processes share it
+    through the OS page cache.
+    """
+
+    def __init__(self, path, table):
+        if table not in PARAM_DB_TABLES:
+            raise ValueError(f"Unknown parameter database table: {table}")
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        self._records = {}
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
+
+    def __getitem__(self, key):
+        key = str(key)
+        try:
+            return self._records[key]
+        except KeyError:
+            pass
+        row = self._connection().execute(f"SELECT record FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        value = orjson.loads(row[0])
+        self._records[key] = value
+        return value
+
+    def __iter__(self):
+        for (key,) in self._connection().execute(f"SELECT key FROM {self.table} ORDER BY key"):
+            yield key
+
+    def __len__(self):
+        return self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m covjsonkit.param_store")
+    parser.add_argument("param_db", nargs="*", default=["ecmwf", "dwd"])
+    parser.add_argument("--sqlite", metavar="PATH", help="convert a single param_db to a SQLite catalogue")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        if len(args.param_db) != 1:
+            parser.error("--sqlite converts exactly one param_db")
+        build_sqlite_param_db(args.param_db[0], args.sqlite)
+    else:
+        for param_db in args.param_db:
+            compile_param_db(param_db)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The benchmarks build their polytope trees with the tests' builder, tests/trees.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "tests"))
@@ -0,0 +1,74 @@
+import time
+
+import xarray  # noqa: F401 (imported here so that to_xarray is timed without it)
+
+from covjsonkit.decoder.VerticalProfile import VerticalProfile
+
+NUMBERS = range(50)
+DATES = [f"2024-01-{day:02d}T00:00:00Z" for day in range(1, 3)]
+STEPS = range(0, 120, 6)
+
+
+def ensemble():
+    coverages = []
+    for date in DATES:
+        for number in NUMBERS:
+            for step in STEPS:
+                coverages.append(
+                    {
+                        "mars:metadata": {"number": number, "Forecast date": date, "step": step},
+                        "type": "Coverage",
+                        "domain": {
+                            "type": "Domain",
+                            "axes": {
+                                "x": {"values": [10.0]},
+                                "y": {"values": [20.0]},
+                                "z": {"values": [500, 850, 1000]},
+                                "t": {"values": [date]},
+                            },
+                        },
+                        "ranges": {"u": {"shape": [3], "values": [number, step, 0.0]}},
+                    }
+                )
+    return {
+        "type": "CoverageCollection",
+        "domainType": "VerticalProfile",
+        "coverages": coverages,
+        "referencing": [],
+        "parameters": {"u": {"type": "Parameter", "unit": {"symbol": "m s**-1"}, "observedProperty": {"id": "u"}}},
+    }
+
+
+def legacy_values(coverages, nums, dates, steps):
+    values = []
+    for i, num in enumerate(nums):
+        values.append([])
+        for j, date in enumerate(dates):
+            values[i].append([])
+            for k, step in enumerate(steps):
+                values[i][j].append([])
+                for coverage in coverages:
+                    if (
+                        coverage["mars:metadata"]["number"] == num
+                        and coverage["mars:metadata"]["Forecast date"] == date
+                        and coverage["mars:metadata"]["step"] == step
+                    ):
+                        values[i][j][k] = coverage["ranges"]["u"]["values"]
+    return values
+
+
+class TestDecoderIndexPerformance:
+    def test_vertical_profile_to_xarray(self):
+        decoder = VerticalProfile(ensemble())
+
+        start = time.perf_counter()
+        expected = legacy_values(decoder.coverages, list(NUMBERS), DATES, list(STEPS))
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ds = decoder.to_xarray()
+        after = time.perf_counter() - start
+
+        print(f"\n{len(decoder.coverages)} coverages: scan {before:.3f}s, index {after:.3f}s")
+        assert ds["u"].values[0, 0].tolist() == expected
+        assert after < before
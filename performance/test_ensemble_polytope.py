@@ -0,0 +1,77 @@
+import gc
+import time
+
+from trees import make_tree
+
+from covjsonkit.api import Covjsonkit
+
+PARAMS = ("167", "168", "164", "165", "166")
+NUMBERS = tuple(range(51))
+
+
+def grid(lats=(10.0,), lons=(20.0,)):
+    return [(lat, lons) for lat in lats]
+
+
+def time_from_polytope(feature, steps, lons_by_lat=grid(), **tree_kwargs):
+    tree = make_tree(lons_by_lat, params=PARAMS, numbers=NUMBERS, steps=steps, **tree_kwargs)
+    encoder = Covjsonkit().encode("CoverageCollection", feature)
+    # As timeit does, so that a collection of other tests' garbage is not timed
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        encoder.from_polytope(tree)
+        return time.perf_counter() - start, len(encoder.covjson["coverages"])
+    finally:
+        gc.enable()
+
+
+class TestEnsemblePerformance:
+    """
+    51 members x 100 steps x 5 params. Grouping the ranges into coverages
+    must stay linear in the number of keys, so ten times the steps should
+    take about ten times as long, not a hundred.
+    """
+
+    def check_linear(self, feature, **tree_kwargs):
+        small, _ = time_from_polytope(feature, tuple(range(0, 10)), **tree_kwargs)
+        large, coverages = time_from_polytope(feature, tuple(range(0, 100)), **tree_kwargs)
+        keys = len(NUMBERS) * 100 * len(PARAMS)
+        print(f"\n{feature}: {keys} keys, {coverages} coverages in {large:.3f}s ({large / small:.1f}x 10 steps)")
+        assert large / small < 30
+
+    def test_polygon(self):
+        self.check_linear("polygon", lons_by_lat=grid((10.0, 10.5, 11.0), (20.0, 20.5, 21.0)))
+
+    def test_shapefile(self):
+        self.check_linear("shapefile", lons_by_lat=grid((10.0, 10.5, 11.0), (20.0, 20.5, 21.0)))
+
+    def test_vertical_profile(self):
+        self.check_linear("verticalprofile", levels=(500, 850, 1000))
+
+
+class TestProjectionPerformance:
+    """
+    Every feature flattens the tree into the same PolytopeTable, so
+    encoding one ensemble tree should cost about the same whichever
+    multipoint feature projects it.
+    """
+
+    def test_features(self):
+        tree = make_tree(
+            grid((10.0, 10.5, 11.0), (20.0, 20.5)), params=PARAMS, numbers=NUMBERS, steps=tuple(range(0, 100))
+        )
+        start = time.perf_counter()
+        Covjsonkit().encode("CoverageCollection", "boundingbox").flatten(tree)
+        flatten = time.perf_counter() - start
+
+        timings = {}
+        for feature in ("boundingbox", "polygon", "frame", "shapefile"):
+            encoder = Covjsonkit().encode("CoverageCollection", feature)
+            start = time.perf_counter()
+            encoder.from_polytope(tree)
+            timings[feature] = time.perf_counter() - start
+
+        print(f"\nflatten: {flatten:.3f}s, " + ", ".join(f"{key}: {val:.3f}s" for key, val in timings.items()))
+        assert max(timings.values()) / min(timings.values()) < 3
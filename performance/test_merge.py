@@ -0,0 +1,66 @@
+import gc
+import time
+
+import numpy as np
+import orjson
+
+from covjsonkit.api import Covjsonkit
+
+MEMBERS = range(20)
+STEPS = range(0, 120, 6)
+POINTS = 2_000
+DATE = "2024-01-01T00:00:00Z"
+
+
+def member(number):
+    """The collection of one ensemble member, with a shared domain."""
+    rng = np.random.default_rng(number)
+    composite = np.column_stack((rng.uniform(-90, 90, POINTS), rng.uniform(-180, 180, POINTS), np.zeros(POINTS)))
+    coverages = []
+    for step in STEPS:
+        coverages.append(
+            {
+                "mars:metadata": {"number": number, "step": step, "Forecast date": DATE},
+                "type": "Coverage",
+                "domain": "#domain-0",
+                "ranges": {"u": {"type": "NdArray", "shape": [POINTS], "values": rng.random(POINTS)}},
+            }
+        )
+    coverages[0]["domain"] = {
+        "type": "Domain",
+        "id": "#domain-0",
+        "axes": {"t": {"values": [DATE]}, "composite": {"values": composite}},
+    }
+    collection = {
+        "type": "CoverageCollection",
+        "domainType": "MultiPoint",
+        "coverages": coverages,
+        "referencing": [],
+        "parameters": {"u": {"type": "Parameter", "unit": {"symbol": "m s**-1"}, "observedProperty": {"id": "u"}}},
+    }
+    return orjson.dumps(collection, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def timed(f, *args):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = f(*args)
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+
+def round_trip(members):
+    return orjson.dumps(Covjsonkit().merge(members), option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+class TestMergePerformance:
+    def test_concat_against_round_trip(self):
+        members = [member(number) for number in MEMBERS]
+        parsing, expected = timed(round_trip, members)
+        splicing, spliced = timed(Covjsonkit().concat, members)
+        print(f"\n{len(spliced) >> 20} MiB from {len(members)} members: parsed {parsing:.3f}s, spliced {splicing:.3f}s")
+        assert orjson.loads(spliced) == orjson.loads(expected)
+        assert splicing < parsing
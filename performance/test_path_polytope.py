@@ -0,0 +1,60 @@
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+from trees import Node
+
+from covjsonkit.api import Covjsonkit
+
+
+def path_tree(waypoints):
+    """A trajectory as polytope returns it, with a step and a level of its own at each waypoint."""
+    branches = [
+        Node(
+            "step",
+            [i],
+            [
+                Node(
+                    "levelist",
+                    [1000 - i],
+                    [Node("latitude", [10.0 + 0.01 * i], [Node("longitude", [20.0 + 0.01 * i], result=[i, i + 0.5])])],
+                )
+            ],
+        )
+        for i in range(waypoints)
+    ]
+    date = Node("date", [pd.Timestamp("20240101")], [Node("number", [0], [Node("param", ["167", "168"], branches)])])
+    return Node("root", [None], [Node("class", ["od"], [date])])
+
+
+def time_from_polytope(waypoints):
+    tree = path_tree(waypoints)
+    encoder = Covjsonkit().encode("CoverageCollection", "path")
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        encoder.from_polytope(tree)
+        elapsed = time.perf_counter() - start
+        return elapsed, tracemalloc.get_traced_memory()[1], encoder.covjson["coverages"]
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+
+class TestPathPerformance:
+    """
+    A trajectory has one range row per waypoint and parameter, not one per
+    level and step, so ten times the waypoints should take about ten times
+    as long and memory should stay in proportion.
+    """
+
+    def test_level_per_waypoint(self):
+        small, _, _ = time_from_polytope(200)
+        large, peak, coverages = time_from_polytope(2000)
+        print(f"\npath: 2000 waypoints in {large:.3f}s ({large / small:.1f}x 200), peak {peak / 2**20:.1f} MiB")
+        assert len(coverages[0]["ranges"]["2t"]["values"]) == 2000
+        assert large / small < 30
+        assert peak < 64 * 2**20
@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+
+from covjsonkit.decoder.spatial import SpatialIndex, haversine
+
+POINTS = 200_000
+QUERIES = 50
+
+
+class TestSpatialIndexPerformance:
+    def test_nearest_against_scan(self):
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(30, 60, POINTS)
+        lons = rng.uniform(-20, 40, POINTS)
+        queries = rng.uniform([30, -20], [60, 40], (QUERIES, 2))
+
+        start = time.perf_counter()
+        expected = [np.argsort(haversine(lat, lon, lats, lons), kind="stable")[:5] for lat, lon in queries]
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SpatialIndex(lats, lons)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [index.nearest(lat, lon, k=5)[0] for lat, lon in queries]
+        indexed = time.perf_counter() - start
+
+        print(f"\n{QUERIES} queries on {POINTS} points: scan {scan:.3f}s, build {build:.3f}s, index {indexed:.3f}s")
+        for points, scanned in zip(found, expected):
+            np.testing.assert_allclose(lats[points], lats[scanned])
+        assert build + indexed < scan / 5
+
+    def test_within_against_scan(self):
+        rng = np.random.default_rng(1)
+        lats = rng.uniform(-90, 90, POINTS)
+        lons = rng.uniform(-180, 180, POINTS)
+        index = SpatialIndex(lats, lons)
+        boxes = [(lat, lon, lat + 2, lon + 2) for lat, lon in rng.uniform([-80, -180], [80, 170], (QUERIES, 2))]
+
+        start = time.perf_counter()
+        expected = [
+            np.flatnonzero((lats >= south) & (lats <= north) & (lons >= west) & (lons <= east))
+            for south, west, north, east in boxes
+        ]
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [index.within(box) for box in boxes]
+        indexed = time.perf_counter() - start
+
+        print(f"\n{QUERIES} boxes on {POINTS} points: scan {scan:.3f}s, index {indexed:.3f}s")
+        for points, scanned in zip(found, expected):
+            assert np.array_equal(points, scanned)
+        assert indexed < scan
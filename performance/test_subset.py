@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import xarray  # noqa: F401 (imported here so that to_xarray is timed without it)
+
+from covjsonkit.decoder.BoundingBox import BoundingBox
+
+POINTS = 20_000
+NUMBERS = range(10)
+STEPS = range(0, 60, 6)
+DATE = "2024-01-01T00:00:00Z"
+BBOX = (40.0, 0.0, 45.0, 10.0)
+
+
+def ensemble():
+    rng = np.random.default_rng(0)
+    composite = np.column_stack((rng.uniform(-90, 90, POINTS), rng.uniform(-180, 180, POINTS), np.zeros(POINTS)))
+    domain = {"type": "Domain", "axes": {"t": {"values": [DATE]}, "composite": {"values": composite.tolist()}}}
+    coverages = []
+    for number in NUMBERS:
+        for step in STEPS:
+            coverages.append(
+                {
+                    "mars:metadata": {"number": number, "step": step, "Forecast date": DATE},
+                    "type": "Coverage",
+                    "domain": domain,
+                    "ranges": {"u": {"shape": [POINTS], "values": rng.random(POINTS).tolist()}},
+                }
+            )
+    return {
+        "type": "CoverageCollection",
+        "domainType": "MultiPoint",
+        "coverages": coverages,
+        "referencing": [],
+        "parameters": {"u": {"type": "Parameter", "unit": {"symbol": "m s**-1"}, "observedProperty": {"id": "u"}}},
+    }
+
+
+class TestSubsetPerformance:
+    def test_bbox_against_xarray(self):
+        decoder = BoundingBox(ensemble())
+
+        start = time.perf_counter()
+        ds = decoder.to_xarray()
+        inside = (ds["x"] >= BBOX[0]) & (ds["x"] <= BBOX[2]) & (ds["y"] >= BBOX[1]) & (ds["y"] <= BBOX[3])
+        expected = ds.isel(points=np.flatnonzero(inside.values))
+        through_xarray = time.perf_counter() - start
+
+        start = time.perf_counter()
+        subset = decoder.subset(numbers=list(NUMBERS), bbox=BBOX)
+        subsetting = time.perf_counter() - start
+
+        print(f"\n{len(subset['coverages'])} coverages: through xarray {through_xarray:.3f}s, subset {subsetting:.3f}s")
+        values = np.array([coverage["ranges"]["u"]["values"] for coverage in subset["coverages"]])
+        assert np.array_equal(values, expected["u"].values.reshape(values.shape))
+        assert subsetting < through_xarray
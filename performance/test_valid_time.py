@@ -0,0 +1,37 @@
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from covjsonkit.encoder.valid_time import iso_format, valid_time_grid
+
+DATES = [f"2024-01-{day:02d} 00:00:00Z" for day in range(1, 31)]
+# Sub-hourly steps over ten days
+STEPS = [minutes / 60 for minutes in range(0, 10 * 24 * 60, 15)]
+
+
+def legacy_valid_times(dates, steps):
+    times = []
+    for date in dates:
+        for step in steps:
+            date_format = "%Y%m%dT%H%M%S"
+            new_date = pd.Timestamp(date).strftime(date_format)
+            start_time = datetime.strptime(new_date, date_format)
+            stamp = start_time + timedelta(hours=step)
+            times.append(stamp.isoformat() + "Z")
+    return times
+
+
+class TestValidTimePerformance:
+    def test_valid_time_grid(self):
+        start = time.perf_counter()
+        expected = legacy_valid_times(DATES, STEPS)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        times = iso_format(valid_time_grid(DATES, STEPS))
+        after = time.perf_counter() - start
+
+        print(f"\n{len(times)} valid times: loop {before:.3f}s, datetime64 {after:.3f}s")
+        assert times == expected
+        assert after < before
@@ -0,0 +1,141 @@
+import time
+
+from trees import make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.encoder.accumulator import RangeAccumulator
+from covjsonkit.encoder.table import leaf_points
+
+
+def recursive_walk_tree(tree, fields, coords, mars_metadata, range_dict):
+    # The previous recursive Encoder.walk_tree, kept as the baseline
+    def create_composite_key(date, level, num, para, s):
+        return (date, level, num, para, s)
+
+    def handle_non_leaf_node(child):
+        non_leaf_axes = ["latitude", "longitude", "param", "date"]
+        if child.axis.name not in non_leaf_axes:
+            mars_metadata[child.axis.name] = child.values[0]
+
+    def handle_specific_axes(child):
+        if child.axis.name == "latitude":
+            return child.values[0]
+        if child.axis.name == "levelist":
+            return child.values
+        if child.axis.name == "param":
+            return child.values
+        if child.axis.name in ["date", "time"]:
+            dates = [f"{date}Z" for date in child.values]
+            mars_metadata["Forecast date"] = str(child.values[0])
+            for date in dates:
+                coords[date] = {}
+                coords[date]["composite"] = []
+                coords[date]["t"] = [date]
+            return dates
+        if child.axis.name == "number":
+            return child.values
+        if child.axis.name == "step":
+            return child.values
+        return None
+
+    def calculate_index_bounds(level_len, num_len, para_len, step_len, l, i, j, k):  # noqa: E741
+        start_index = int(l * level_len) + int(i * num_len) + int(j * para_len) + int(k * step_len)
+        end_index = start_index + int(step_len)
+        return start_index, end_index
+
+    def append_composite_coords(dates, tree_values, lat, coords):
+        for value in tree_values:
+            coords[dates]["composite"].append([lat, value])
+
+    if len(tree.children) != 0:
+        for child in tree.children:
+            handle_non_leaf_node(child)
+            result = handle_specific_axes(child)
+            if result is not None:
+                if child.axis.name == "latitude":
+                    fields["lat"] = result
+                elif child.axis.name == "levelist":
+                    fields["levels"] = result
+                    if "l" in fields:
+                        fields["l"].extend(result)
+                elif child.axis.name == "param":
+                    fields["param"] = result
+                elif child.axis.name in ["date", "time"]:
+                    fields["dates"].extend(result)
+                elif child.axis.name == "number":
+                    fields["number"] = result
+                elif child.axis.name == "step":
+                    fields["step"] = result
+                    if "s" in fields:
+                        fields["s"].extend(result)
+
+            recursive_walk_tree(child, fields, coords, mars_metadata, range_dict)
+    else:
+        tree.values = [float(val) for val in tree.values]
+        tree.result = [float(val) if val is not None else val for val in tree.result]
+        level_len = len(tree.result) / len(fields["levels"])
+        num_len = level_len / len(fields["number"])
+        para_len = num_len / len(fields["param"])
+        step_len = para_len / len(fields["step"])
+
+        append_composite_coords(fields["dates"][-1], tree.values, fields["lat"], coords)
+
+        for l, level in enumerate(fields["levels"]):  # noqa: E741
+            for i, num in enumerate(fields["number"]):
+                for j, para in enumerate(fields["param"]):
+                    for k, s in enumerate(fields["step"]):
+                        start_index, end_index = calculate_index_bounds(
+                            level_len, num_len, para_len, step_len, l, i, j, k
+                        )
+                        key = create_composite_key(fields["dates"][-1], level, num, para, s)
+                        if key not in range_dict:
+                            range_dict[key] = []
+                        range_dict[key].extend(tree.result[start_index:end_index])
+
+
+def count_nodes(tree):
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def new_fields():
+    return {"lat": 0, "param": 0, "number": [0], "step": 0, "dates": [], "levels": [0]}
+
+
+def time_walk(walk, new_ranges, tree_kwargs, repeat=3):
+    best = None
+    for _ in range(repeat):
+        tree = make_tree(**tree_kwargs)
+        fields, coords, mars_metadata, ranges = new_fields(), {}, {}, new_ranges()
+        start = time.perf_counter()
+        walk(tree, fields, coords, mars_metadata, ranges)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    range_dict = {key: list(ranges[key]) for key in ranges.keys()}
+    return best, count_nodes(tree), (fields, coords, mars_metadata, range_dict)
+
+
+class TestWalkTreePerformance:
+    def test_bounding_box_walk_tree(self):
+        tree_kwargs = dict(
+            lons_by_lat=[(10.0 + 0.1 * i, [20.0 + 0.1 * j for j in range(50)]) for i in range(400)],
+            numbers=(0, 1, 2, 3, 4),
+            steps=(0, 6, 12),
+        )
+        encoder = Covjsonkit().encode("CoverageCollection", "BoundingBox")
+
+        before, nodes, expected = time_walk(recursive_walk_tree, dict, tree_kwargs)
+        after, _, result = time_walk(encoder.walk_tree, RangeAccumulator, tree_kwargs)
+
+        print(f"\nwalk_tree over {nodes} nodes")
+        print(f"recursive, range_dict:        {before:.4f}s ({nodes / before:,.0f} nodes/s)")
+        print(f"iterative, RangeAccumulator: {after:.4f}s ({nodes / after:,.0f} nodes/s)")
+        fields, coords, mars_metadata, range_dict = result
+        points = {date: leaf_points(leaves).tolist() for date, leaves in coords.items()}
+        assert (fields, mars_metadata, range_dict) == (expected[0], expected[2], expected[3])
+        assert points == {date: coords["composite"] for date, coords in expected[1].items()}
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from covjsonkit.api import Covjsonkit, features_decoder, features_encoder
+from covjsonkit.decoder.TimeSeries import TimeSeries
+
+
+class TestApi:
+    def test_import_is_lazy(self):
+        code = (
+            "import sys\n"
+            "import covjsonkit\n"
+            "from covjsonkit.api import Covjsonkit\n"
+            "for module in ['xarray', 'pandas', 'covjson_pydantic', 'conflator', 'covjsonkit.encoder.Wkt']:\n"
+            "    assert module not in sys.modules, module\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_feature_module_imported_on_first_use(self):
+        code = (
+            "import sys\n"
+            "from covjsonkit.api import Covjsonkit\n"
+            "Covjsonkit({'param_db': 'ecmwf'}).encode('CoverageCollection', 'PointSeries')\n"
+            "assert 'covjsonkit.encoder.TimeSeries' in sys.modules\n"
+            "assert 'covjsonkit.encoder.BoundingBox' not in sys.modules\n"
+            "assert 'pandas' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_feature_registry(self):
+        assert features_decoder["pointseries"] is TimeSeries
+        assert Covjsonkit()._feature_factory("pointseries", "decoder") is TimeSeries
+        # Grid domains are written by the BoundingBox and Frame encoders
+        assert set(features_decoder) - set(features_encoder) == {"grid"}
+        assert set(features_encoder) < set(features_decoder)
+        assert len(features_encoder) == 7
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.config import default_config
+
+
+class TestConfig:
+    def test_no_config_loaded_on_import(self):
+        code = (
+            "import covjsonkit.param_db, covjsonkit.api\n"
+            "from covjsonkit.config import default_config\n"
+            "assert default_config.cache_info().currsize == 0\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_default_config_loaded_once(self):
+        assert Covjsonkit().conf is Covjsonkit().conf
+        assert Covjsonkit().conf is default_config()
+
+    def test_config_override_per_instance(self):
+        default_param_db = default_config().param_db
+        kit = Covjsonkit({"param_db": "dwd"})
+        assert kit.conf.param_db == "dwd"
+        assert Covjsonkit().conf.param_db == default_param_db
+        assert default_config().param_db == default_param_db
@@ -0,0 +1,48 @@
+import numpy as np
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.Grid import Grid
+
+
+def grid(lons_by_lat, feature="BoundingBox"):
+    # 2 levels x 2 numbers x 2 steps, one leaf per latitude
+    tree = make_tree(lons_by_lat, params=["167"], levels=[500, 850])
+    return encode(tree, feature, grid_domain=True)
+
+
+class TestDecoderGrid:
+    def setup_method(self, method):
+        self.covjson = grid([(10.0, [20, 21, 22]), (10.5, [20, 21, 22])])
+
+    def test_encode(self):
+        assert self.covjson["domainType"] == "Grid"
+        domain = self.covjson["coverages"][0]["domain"]
+        assert domain["domainType"] == "Grid"
+        assert domain["axes"]["x"] == {"start": 10.0, "stop": 10.5, "num": 2}
+        assert domain["axes"]["y"] == {"start": 20.0, "stop": 22.0, "num": 3}
+        assert domain["axes"]["z"] == {"values": [500, 850]}
+        assert self.covjson["coverages"][0]["ranges"]["2t"]["shape"] == [2, 2, 3]
+
+    def test_not_a_grid(self):
+        assert grid([(10.0, [20, 21, 22]), (10.5, [20, 21, 23])])["domainType"] == "MultiPoint"
+        assert grid([(10.0, [20, 21, 22]), (10.5, [20, 21])])["domainType"] == "MultiPoint"
+        x = grid([(10.0, [20, 21]), (10.1, [20, 21]), (10.5, [20, 21])])["coverages"][0]["domain"]
+        assert x["axes"]["x"] == {"values": [10.0, 10.1, 10.5]}
+
+    def test_frame(self):
+        assert grid([(10.0, [20, 21]), (10.5, [20, 21])], "Frame")["domainType"] == "Grid"
+
+    def test_to_xarray(self):
+        decoder = Covjsonkit().decode(self.covjson)
+        assert isinstance(decoder, Grid)
+        ds = decoder.to_xarray()
+        assert ds["2t"].dims == ("datetimes", "number", "steps", "z", "x", "y")
+        assert ds["x"].values.tolist() == [10.0, 10.5]
+        assert ds["z"].values.tolist() == [500, 850]
+
+        # Leaf values run level, number, step, then longitude
+        expected = np.empty((2, 2, 2, 2, 3))
+        for n, s, z, x, y in np.ndindex(expected.shape):
+            expected[n, s, z, x, y] = 100 * x + ((z * 2 + n) * 2 + s) * 3 + y
+        assert (ds["2t"].values[0] == expected).all()
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from covjsonkit.decoder.index import CoverageIndex
+from covjsonkit.decoder.VerticalProfile import VerticalProfile
+
+
+def coverage(number, date, step, value):
+    return {
+        "mars:metadata": {"class": "od", "number": number, "Forecast date": date, "step": step},
+        "type": "Coverage",
+        "domain": {
+            "type": "Domain",
+            "axes": {
+                "x": {"values": [10.0]},
+                "y": {"values": [20.0]},
+                "z": {"values": [500, 850]},
+                "t": {"values": [date]},
+            },
+        },
+        "ranges": {"u": {"type": "NdArray", "dataType": "float", "shape": [2], "values": [value, value + 1]}},
+    }
+
+
+DATES = ["2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z"]
+
+
+def covjson():
+    coverages = []
+    for date in DATES:
+        for number in (2, 0, 1):
+            for step in (0, 6):
+                coverages.append(coverage(number, date, step, 100 * number + step))
+    return {
+        "type": "CoverageCollection",
+        "domainType": "VerticalProfile",
+        "coverages": coverages,
+        "referencing": [{"coordinates": ["x", "y", "z"], "system": {"type": "GeographicCRS"}}],
+        "parameters": {"u": {"type": "Parameter", "unit": {"symbol": "m s**-1"}, "observedProperty": {"id": "u"}}},
+    }
+
+
+class TestCoverageIndex:
+    def setup_method(self, method):
+        self.index = CoverageIndex(
+            [
+                {"number": 0, "step": 0},
+                {"number": 1, "step": 0},
+                {"number": 0, "step": 6, "expver": "0001"},
+                {"number": 1, "step": 6, "levelist": [500, 850]},
+            ]
+        )
+
+    def test_values(self):
+        assert len(self.index) == 4
+        assert self.index.values("number") == [0, 1]
+        assert self.index.values("step") == [0, 6]
+        assert self.index.values("expver") == ["0001"]
+        assert self.index.values("missing") == []
+        assert "levelist" in self.index and "missing" not in self.index
+
+    def test_positions(self):
+        assert self.index.positions() == [0, 1, 2, 3]
+        assert self.index.positions(number=1) == [1, 3]
+        assert self.index.positions(number=1, step=6) == [3]
+        assert self.index.positions(number=[0, 1], step=(6,)) == [2, 3]
+        assert self.index.positions(number=2) == []
+        assert self.index.positions(expver="0001") == [2]
+        assert self.index.positions(levelist=[[500, 850]]) == [3]
+        with pytest.raises(KeyError):
+            self.index.positions(missing=1)
+
+    def test_from_coverages(self):
+        index = CoverageIndex.from_coverages(
+            [
+                coverage(1, DATES[0], 6, 0),
+                {"mars:metadata": {}, "domain": {"axes": {"t": {"start": DATES[1], "num": 2}}}},
+            ]
+        )
+        assert index.values("number") == [1, 0]
+        assert index.values("step") == [6, 0]
+        assert index.values("class") == ["od"]
+        assert index.values("datetime") == DATES
+        assert index.positions(forecast_date=DATES[0]) == [0]
+
+
+class TestDecoderSelect:
+    def setup_method(self, method):
+        self.decoder = VerticalProfile(covjson())
+
+    def test_select(self):
+        selected = self.decoder.select(number=1, step=6)
+        assert [c["mars:metadata"]["Forecast date"] for c in selected] == DATES
+        assert all(c["ranges"]["u"]["values"] == [106, 107] for c in selected)
+        assert len(self.decoder.select(forecast_date=DATES[1])) == 6
+        assert len(self.decoder.select(number=[0, 2], forecast_date=DATES[0])) == 4
+        assert self.decoder.select(number=7) == []
+        assert len(self.decoder.select()) == 12
+
+    def test_to_xarray(self):
+        ds = self.decoder.to_xarray()
+        assert list(ds["number"].values) == [0, 1, 2]
+        assert ds["u"].sel(number=1, datetime=DATES[1], t=6).values.ravel().tolist() == [106, 107]
+        assert ds["u"].sel(number=0, datetime=DATES[0], t=0).values.ravel().tolist() == [0, 1]
+
+    def test_to_xarray_dtype(self):
+        assert self.decoder.to_xarray()["u"].dtype == np.float64
+        assert self.decoder.to_xarray(dtype=np.float32)["u"].dtype == np.float32
+
+    def test_to_xarray_missing(self):
+        data = covjson()
+        # Drop number 1 at step 6 of the second date, and a value of another coverage
+        del data["coverages"][11]
+        data["coverages"][0]["ranges"]["u"]["values"][1] = None
+        ds = VerticalProfile(data).to_xarray()
+        assert np.isnan(ds["u"].sel(number=1, datetime=DATES[1], t=6).values).all()
+        assert np.isnan(ds["u"].sel(number=2, datetime=DATES[0], t=0).values.ravel()).tolist() == [False, True]
+
+    def test_cube(self):
+        index = CoverageIndex([{"step": "12"}, {"step": "6"}, {"step": "0"}, {"step": "6"}])
+        (steps,), positions = index.cube("step")
+        assert steps == ["0", "6", "12"]
+        assert positions.tolist() == [2, 3, 0]
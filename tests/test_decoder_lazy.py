@@ -0,0 +1,140 @@
+import numpy as np
+import orjson
+import pytest
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.BoundingBox import BoundingBox
+from covjsonkit.decoder.Frame import Frame
+from covjsonkit.decoder.lazy import LazyRanges
+from covjsonkit.decoder.stream import CoverageStream, RangeValues
+
+# 2 levels x 3 numbers x 2 steps, one leaf per latitude
+TREE = dict(numbers=[0, 1, 2], params=["167"], levels=[500, 850])
+
+
+class CountingBoundingBox(BoundingBox):
+    """Counts the coverages whose ranges are decoded."""
+
+    decoded = 0
+
+    def stack_ranges(self, parameter, positions, dtype=np.float64):
+        self.decoded += int((positions >= 0).sum())
+        return super().stack_ranges(parameter, positions, dtype=dtype)
+
+
+class TestLazyRanges:
+    def setup_method(self, method):
+        self.decoder = CountingBoundingBox(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21])], **TREE)))
+        (_, _, _), self.positions = self.decoder.index.cube("datetime", "number", "step")
+        self.expected = self.decoder.stack_ranges("2t", self.positions)
+
+    def test_shape(self):
+        self.decoder.decoded = 0
+        ranges = LazyRanges(self.decoder, "2t", self.positions, dtype=np.float32)
+        assert ranges.shape == self.expected.shape == (1, 3, 2, 10)
+        assert ranges.dtype == np.float32 and ranges.ndim == 4
+        assert self.decoder.decoded == 1
+
+    def test_indexing(self):
+        ranges = LazyRanges(self.decoder, "2t", self.positions)
+        self.decoder.decoded = 0
+        assert np.array_equal(ranges[0, 1], self.expected[0, 1])
+        assert self.decoder.decoded == 2
+        assert np.array_equal(ranges[:, 1:, :1, 2:5], self.expected[:, 1:, :1, 2:5])
+        assert np.array_equal(ranges[..., 3], self.expected[..., 3])
+        assert np.array_equal(ranges[0], self.expected[0])
+        assert np.array_equal(np.asarray(ranges), self.expected)
+
+    def test_missing(self):
+        positions = self.positions.copy()
+        positions[0, 2, 1] = -1
+        ranges = LazyRanges(self.decoder, "2t", positions)
+        assert np.isnan(ranges[0, 2, 1]).all()
+        assert np.array_equal(ranges[0, 2, 0], self.expected[0, 2, 0])
+
+
+class TestLazyToXarray:
+    def setup_method(self, method):
+        pytest.importorskip("dask")
+
+    def check(self, decoder, **kwargs):
+        eager = decoder.to_xarray(**kwargs)
+        lazy = decoder.to_xarray(lazy=True, **kwargs)
+        import dask.array as da
+
+        assert all(isinstance(lazy[name].data, da.Array) for name in lazy.data_vars)
+        assert lazy.compute().identical(eager)
+        return lazy
+
+    def test_bounding_box(self):
+        decoder = CountingBoundingBox(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21])], **TREE)))
+        lazy = self.check(decoder)
+        assert lazy["2t"].data.chunks == ((1,), (1, 1, 1), (1, 1), (10,))
+        decoder.decoded = 0
+        lazy["2t"].sel(number=1).mean("steps").compute()
+        assert decoder.decoded == 2
+
+    def test_chunks_and_dtype(self):
+        decoder = BoundingBox(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21])], **TREE)))
+        lazy = self.check(decoder, dtype=np.float32)
+        assert lazy["2t"].dtype == np.float32
+        lazy = decoder.to_xarray(lazy=True, chunks=(1, 2, 2))
+        assert lazy["2t"].data.chunks == ((1,), (2, 1), (2,), (10,))
+
+    def test_grid(self):
+        self.check(
+            Covjsonkit().decode(
+                encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21, 22])], **TREE), grid_domain=True)
+            )
+        )
+
+    def test_frame(self):
+        self.check(Frame(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21])], **TREE))))
+
+    @pytest.mark.parametrize("grid_domain", [False, True])
+    def test_stream(self, grid_domain, monkeypatch):
+        data = orjson.dumps(
+            encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21, 22])], **TREE), grid_domain=grid_domain)
+        )
+        parsed = []
+        load = RangeValues.load
+        monkeypatch.setattr(RangeValues, "load", lambda values: parsed.append(values.start) or load(values))
+
+        with CoverageStream(data) as stream:
+            decoder = stream.decode_lazily()
+            assert parsed == []
+            lazy = decoder.to_xarray(lazy=True)
+            parsed.clear()
+            # Only the coverages of the chunks computed are parsed, each once
+            lazy["2t"].sel(number=1).mean("steps").compute()
+            assert len(parsed) == len(set(parsed)) == 2
+            assert lazy.compute().identical(Covjsonkit().decode(data).to_xarray())
+
+
+class TestLazyOutput:
+    """Collections decoded lazily are subset and merged as if decoded eagerly."""
+
+    @pytest.mark.parametrize("grid_domain", [False, True])
+    def test_subset(self, grid_domain):
+        data = orjson.dumps(
+            encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21, 22])], **TREE), grid_domain=grid_domain)
+        )
+        eager = Covjsonkit().decode(data)
+        with CoverageStream(data) as stream:
+            decoder = stream.decode_lazily()
+            for query in [dict(numbers=[1]), dict(numbers=[1], bbox=(10.2, 19.0, 11.0, 21.5))]:
+                expected = eager.subset(**query, as_bytes=True)
+                assert decoder.subset(**query, as_bytes=True) == expected
+                assert orjson.dumps(decoder.subset(**query), option=orjson.OPT_SERIALIZE_NUMPY) == expected
+
+    def test_merge(self):
+        members = [orjson.dumps(encode(make_tree([(10.0, [20, 21])], numbers=[number]))) for number in (0, 1)]
+        expected = orjson.dumps(Covjsonkit().merge([Covjsonkit().decode(data).covjson for data in members]))
+        streams = [CoverageStream(data) for data in members]
+        try:
+            merged = Covjsonkit().merge([stream.decode_lazily().covjson for stream in streams])
+            assert orjson.dumps(merged) == expected
+        finally:
+            for stream in streams:
+                stream.close()
@@ -0,0 +1,63 @@
+import io
+
+import orjson
+import pytest
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.decoder import load_covjson
+
+COVJSON = {
+    "type": "CoverageCollection",
+    "domainType": "MultiPoint",
+    "coverages": [
+        {
+            "mars:metadata": {"number": 0, "step": 0},
+            "type": "Coverage",
+            "domain": {
+                "type": "Domain",
+                "axes": {
+                    "t": {"values": ["2017-01-01 00:00:00"]},
+                    "composite": {"dataType": "tuple", "coordinates": ["x", "y", "z"], "values": [[1, 20, 1]]},
+                },
+            },
+            "ranges": {"t": {"type": "NdArray", "dataType": "float", "shape": [1], "values": [264.93]}},
+        }
+    ],
+    "referencing": [{"coordinates": ["x", "y", "z"], "system": {"type": "GeographicCRS"}}],
+    "parameters": {"t": {"type": "Parameter", "unit": {"symbol": "K"}, "observedProperty": {"id": "t"}}},
+}
+
+
+class TestLoadCovjson:
+    def setup_method(self, method):
+        self.data = orjson.dumps(COVJSON)
+
+    def test_dict(self):
+        assert load_covjson(COVJSON) is COVJSON
+
+    def test_bytes(self):
+        assert load_covjson(self.data) == COVJSON
+        assert load_covjson(bytearray(self.data)) == COVJSON
+        assert load_covjson(memoryview(self.data)) == COVJSON
+
+    def test_files(self, tmp_path):
+        path = tmp_path / "covjson.json"
+        path.write_bytes(self.data)
+        assert load_covjson(path) == COVJSON
+        assert load_covjson(str(path)) == COVJSON
+        with open(path, "rb") as f:
+            assert load_covjson(f) == COVJSON
+        with open(path) as f:
+            assert load_covjson(f) == COVJSON
+        assert load_covjson(io.BytesIO(self.data)) == COVJSON
+        assert load_covjson(io.StringIO(self.data.decode())) == COVJSON
+
+    def test_parse_hook(self):
+        calls = []
+        decoder = Covjsonkit().decode(self.data, parse_hook=lambda seconds, size: calls.append((seconds, size)))
+        assert decoder.parameters == ["t"]
+        assert len(calls) == 1 and calls[0][0] >= 0 and calls[0][1] == len(self.data)
+
+    def test_invalid(self):
+        with pytest.raises(TypeError):
+            load_covjson(42)
@@ -0,0 +1,134 @@
+import copy
+import io
+
+import orjson
+import pytest
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+
+
+def member(number, lons):
+    # 1 level x 2 steps x 1 param of one member, at one latitude
+    return make_tree([(10.0, lons)], numbers=[number], params=["167"])
+
+
+T = {"values": ["2024-01-01T00:00:00Z"]}
+
+DOMAINS = {
+    "MultiPoint": {"composite": {"dataType": "tuple", "coordinates": ["x", "y", "z"], "values": [[1, 20, 0]]}, "t": T},
+    "Trajectory": {
+        "composite": {"dataType": "tuple", "coordinates": ["t", "x", "y", "z"], "values": [[T["values"][0], 1, 2, 0]]}
+    },
+    "PointSeries": {"x": {"values": [1]}, "y": {"values": [20]}, "z": {"values": [0]}, "t": T},
+    "VerticalProfile": {"x": {"values": [1]}, "y": {"values": [20]}, "z": {"values": [500]}, "t": T},
+    "Grid": {"x": {"values": [1]}, "y": {"values": [20]}, "z": {"values": [0]}, "t": T},
+}
+
+PARAMETER = {"type": "Parameter", "unit": {"symbol": "K"}, "observedProperty": {"id": "t"}}
+
+
+def collection(domain_type, number, parameters=("t",)):
+    return {
+        "type": "CoverageCollection",
+        "domainType": domain_type,
+        "coverages": [
+            {
+                "mars:metadata": {"number": number, "step": 0, "Forecast date": "2024-01-01T00:00:00Z"},
+                "type": "Coverage",
+                "domain": {"type": "Domain", "axes": copy.deepcopy(DOMAINS[domain_type])},
+                "ranges": {
+                    parameter: {"type": "NdArray", "shape": [1], "axisNames": ["x"], "values": [number]}
+                    for parameter in parameters
+                },
+            }
+        ],
+        "referencing": [{"coordinates": ["x", "y", "z"], "system": {"type": "GeographicCRS"}}],
+        "parameters": {parameter: PARAMETER for parameter in parameters},
+    }
+
+
+class TestMerge:
+    @pytest.mark.parametrize("domain_type", list(DOMAINS))
+    def test_domain_types(self, domain_type):
+        collections = [collection(domain_type, number) for number in range(3)]
+        merged = Covjsonkit().merge(collections)
+        assert merged["domainType"] == domain_type
+        assert merged["coverages"] == [c["coverages"][0] for c in collections]
+        assert orjson.loads(Covjsonkit().concat(collections)) == merged
+        assert len(Covjsonkit().decode(merged).coverages) == 3
+
+    def test_parameters(self):
+        merged = Covjsonkit().merge([collection("MultiPoint", 0, ("t",)), collection("MultiPoint", 1, ("u", "t"))])
+        assert list(merged["parameters"]) == ["t", "u"]
+
+    def test_incompatible(self):
+        with pytest.raises(ValueError):
+            Covjsonkit().merge([collection("MultiPoint", 0), collection("PointSeries", 1)])
+        other = collection("MultiPoint", 1)
+        other["referencing"][0]["coordinates"] = ["y", "x", "z"]
+        with pytest.raises(ValueError):
+            Covjsonkit().concat([collection("MultiPoint", 0), other])
+        other = collection("MultiPoint", 1)
+        other["parameters"]["t"] = dict(PARAMETER, unit={"symbol": "C"})
+        with pytest.raises(ValueError):
+            Covjsonkit().merge([collection("MultiPoint", 0), other])
+        with pytest.raises(TypeError):
+            Covjsonkit().merge([collection("MultiPoint", 0), collection("MultiPoint", 1)["coverages"][0]])
+        with pytest.raises(ValueError):
+            Covjsonkit().merge([])
+
+    def test_sources(self, tmp_path):
+        path = tmp_path / "member.covjson"
+        path.write_bytes(orjson.dumps(collection("MultiPoint", 1)))
+        sources = [collection("MultiPoint", 0), path, io.BytesIO(orjson.dumps(collection("MultiPoint", 2)))]
+        merged = Covjsonkit().merge(sources[:2] + [orjson.dumps(collection("MultiPoint", 2))])
+        assert [c["mars:metadata"]["number"] for c in merged["coverages"]] == [0, 1, 2]
+
+        out = io.BytesIO()
+        assert Covjsonkit().concat(sources, out=out) is None
+        assert orjson.loads(out.getvalue()) == merged
+
+
+class TestMergeSharedDomains:
+    def test_same_domain(self):
+        # Every member is encoded with the same shared domain, #domain-0
+        collections = [encode(member(number, [20, 21]), shared_domain=True) for number in range(3)]
+        merged = Covjsonkit().merge(collections)
+        domains = [coverage["domain"] for coverage in merged["coverages"]]
+        assert domains[0]["id"] == "#domain-0"
+        assert domains[1:] == ["#domain-0"] * 5
+        assert orjson.loads(Covjsonkit().concat(collections)) == orjson.loads(orjson.dumps(merged))
+
+        ds = Covjsonkit().decode(merged).to_xarray()
+        assert ds["2t"].shape == (1, 3, 2, 2)
+
+    def test_different_domains(self):
+        collections = [
+            encode(member(0, [20, 21]), shared_domain=True),
+            encode(member(1, [22]), shared_domain=True),
+        ]
+        merged = Covjsonkit().merge(collections)
+        domains = [coverage["domain"] for coverage in merged["coverages"]]
+        assert domains[0]["id"] == "#domain-0" and domains[1] == "#domain-0"
+        # The second member's #domain-0 is another domain, so it is renamed along with its references
+        assert domains[2]["id"] == "#domain-1" and domains[3] == "#domain-1"
+        assert collections[1]["coverages"][0]["domain"]["id"] == "#domain-0"
+        assert orjson.loads(Covjsonkit().concat(collections)) == orjson.loads(orjson.dumps(merged))
+
+        decoder = Covjsonkit().decode(merged)
+        assert [len(c["domain"]["axes"]["composite"]["values"]) for c in decoder.coverages] == [2, 2, 1, 1]
+
+    def test_decoded_collections(self):
+        # Decoding resolves references, repeating the domain object
+        decoders = [Covjsonkit().decode(encode(member(n, [20, 21]), shared_domain=True)) for n in range(2)]
+        merged = Covjsonkit().merge([decoder.covjson for decoder in decoders])
+        assert [isinstance(coverage["domain"], str) for coverage in merged["coverages"]] == [False, True, True, True]
+
+    def test_unresolved_reference(self):
+        broken = collection("MultiPoint", 0)
+        broken["coverages"][0]["domain"] = "#domain-7"
+        with pytest.raises(ValueError):
+            Covjsonkit().merge([broken])
+        with pytest.raises(ValueError):
+            Covjsonkit().concat([broken])
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.TimeSeries import TimeSeries
+from covjsonkit.decoder.VerticalProfile import VerticalProfile
+
+PARAMETERS = {
+    "u": {"type": "Parameter", "unit": {"symbol": "m s**-1"}, "observedProperty": {"id": "u"}},
+    "v": {"type": "Parameter", "unit": {"symbol": "m s**-1"}, "observedProperty": {"id": "v"}},
+}
+
+
+def profile(number, step):
+    return {
+        "mars:metadata": {"number": number, "step": step, "Forecast date": "2024-01-01T00:00:00Z"},
+        "type": "Coverage",
+        "domain": {
+            "type": "Domain",
+            "axes": {
+                "x": {"values": [10.0]},
+                "y": {"values": [20.0]},
+                "z": {"values": [500, 850]},
+                "t": {"values": [f"2024-01-01T{step:02d}:00:00Z"]},
+            },
+        },
+        "ranges": {
+            "u": {"type": "NdArray", "shape": [2], "axisNames": ["z"], "values": [number, step]},
+            "v": {"type": "NdArray", "shape": [2], "axisNames": ["z"], "values": [None, 1.5]},
+        },
+    }
+
+
+def series(number):
+    return {
+        "mars:metadata": {"number": number, "Forecast date": "2024-01-01T00:00:00Z"},
+        "type": "Coverage",
+        "domain": {
+            "type": "Domain",
+            "axes": {
+                "x": {"values": [10.0]},
+                "y": {"values": [20.0]},
+                "z": {"values": [0]},
+                "t": {"start": "2024-01-01T00:00:00Z", "stop": "2024-01-01T12:00:00Z", "num": 3},
+            },
+        },
+        "ranges": {"u": {"type": "NdArray", "shape": [3], "axisNames": ["u"], "values": [number, number + 1, None]}},
+    }
+
+
+def collection(domain_type, coverages, parameters):
+    return {
+        "type": "CoverageCollection",
+        "domainType": domain_type,
+        "coverages": coverages,
+        "referencing": [],
+        "parameters": parameters,
+    }
+
+
+class TestToPandas:
+    def test_bounding_box(self):
+        decoder = Covjsonkit().decode(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21])])))
+        df = decoder.to_pandas()
+        assert list(df.columns) == ["x", "y", "z", "number", "step", "forecast_date", "2t", "2d"]
+        assert len(df) == 4 * 5
+        assert df["forecast_date"].dtype == "datetime64[ns]"
+        assert (df["forecast_date"] == pd.Timestamp("2024-01-01")).all()
+
+        ds = decoder.to_xarray()
+        for (number, step), rows in df.groupby(["number", "step"]):
+            expected = ds["2t"].sel(number=number, steps=step).values.ravel()
+            assert np.array_equal(rows["2t"].values, expected)
+            assert np.array_equal(rows["y"].values, ds["y"].values)
+
+    def test_dtype(self):
+        decoder = Covjsonkit().decode(encode(make_tree([(10.0, [20, 21])])))
+        assert decoder.to_pandas(dtype=np.float32)["2t"].dtype == np.float32
+
+    def test_grid(self):
+        decoder = Covjsonkit().decode(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21, 22])]), grid_domain=True))
+        df = decoder.to_pandas()
+        assert list(df.columns[:3]) == ["z", "x", "y"]
+        ds = decoder.to_xarray()
+        rows = df[(df["number"] == 1) & (df["step"] == 6)]
+        assert np.array_equal(rows["2d"].values, ds["2d"].sel(number=1, steps=6).values.ravel())
+        assert np.array_equal(rows["x"].values, np.repeat(ds["x"].values, 3))
+
+    def test_vertical_profile(self):
+        data = collection("VerticalProfile", [profile(n, s) for n in (0, 1) for s in (0, 6)], PARAMETERS)
+        df = VerticalProfile(data).to_pandas()
+        assert len(df) == 8
+        assert df["z"].tolist() == [500, 850] * 4
+        assert df["u"].tolist() == [0, 0, 0, 6, 1, 0, 1, 6]
+        assert np.isnan(df["v"].values[::2]).all()
+        assert df["t"].iloc[2] == pd.Timestamp("2024-01-01T06:00:00")
+
+    def test_time_series(self):
+        data = collection("PointSeries", [series(0), series(1)], {"u": PARAMETERS["u"]})
+        df = TimeSeries(data).to_pandas()
+        assert list(df["t"]) == list(pd.to_datetime(["2024-01-01T00", "2024-01-01T06", "2024-01-01T12"] * 2))
+        assert df["number"].tolist() == [0, 0, 0, 1, 1, 1]
+        assert df["u"].tolist()[:2] == [0, 1] and np.isnan(df["u"].iloc[2])
+
+    def test_missing_parameter(self):
+        coverages = [profile(0, 0), profile(1, 0)]
+        del coverages[1]["ranges"]["v"]
+        df = VerticalProfile(collection("VerticalProfile", coverages, PARAMETERS)).to_pandas()
+        assert np.isnan(df["v"].values[2:]).all()
+
+    def test_geopandas(self):
+        gpd = pytest.importorskip("geopandas")
+        decoder = Covjsonkit().decode(encode(make_tree([(10.0, [20, 21])])))
+        gdf = decoder.to_geopandas()
+        assert isinstance(gdf, gpd.GeoDataFrame)
+        assert gdf.crs == "EPSG:4326"
+        assert (gdf.geometry.x == gdf["y"]).all() and (gdf.geometry.y == gdf["x"]).all()
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.spatial import SpatialIndex, haversine
+
+
+def brute_nearest(lats, lons, lat, lon, k):
+    distances = haversine(lat, lon, lats, lons)
+    return np.lexsort((np.arange(len(lats)), distances))[:k]
+
+
+class TestSpatialIndex:
+    def setup_method(self, method):
+        rng = np.random.default_rng(0)
+        self.lats = rng.uniform(-90, 90, 2000)
+        self.lons = rng.uniform(-180, 180, 2000)
+        self.index = SpatialIndex(self.lats, self.lons)
+
+    def test_nearest(self):
+        rng = np.random.default_rng(1)
+        for lat, lon in zip(rng.uniform(-90, 90, 50), rng.uniform(-180, 180, 50)):
+            points, distances = self.index.nearest(lat, lon, k=5)
+            expected = brute_nearest(self.lats, self.lons, lat, lon, 5)
+            np.testing.assert_allclose(distances, haversine(lat, lon, self.lats[expected], self.lons[expected]))
+            assert (np.diff(distances) >= 0).all()
+            assert len(points) == 5
+
+    def test_nearest_exact_point(self):
+        points, distances = self.index.nearest(self.lats[42], self.lons[42])
+        assert points.tolist() == [42]
+        assert distances[0] == pytest.approx(0.0)
+
+    def test_nearest_across_antimeridian(self):
+        index = SpatialIndex([0.0, 0.0, 0.0], [179.5, -179.0, 170.0])
+        points, distances = index.nearest(0.0, -179.9, k=2)
+        assert points.tolist() == [0, 1]
+        assert distances[0] == pytest.approx(haversine(0.0, 180.1, 0.0, 179.5))
+
+    def test_nearest_near_pole(self):
+        # Across the pole, the nearest point is on the other side of the globe
+        index = SpatialIndex([87.0, 89.0, 80.0], [179.0, 0.0, 1.0])
+        points, _ = index.nearest(89.5, 179.0, k=2)
+        assert points.tolist() == [1, 0]
+
+    def test_nearest_far_from_points(self):
+        index = SpatialIndex(np.linspace(40, 41, 100), np.linspace(0, 1, 100))
+        points, _ = index.nearest(-60.0, -120.0, k=3)
+        assert points.tolist() == brute_nearest(index.lats, index.lons, -60.0, -120.0, 3).tolist()
+
+    def test_nearest_more_than_points(self):
+        index = SpatialIndex([1.0, 2.0], [3.0, 4.0])
+        assert index.nearest(0.0, 0.0, k=5)[0].tolist() == [0, 1]
+        assert SpatialIndex([], []).nearest(0.0, 0.0)[0].tolist() == []
+
+    def test_within(self):
+        points = self.index.within((-10.0, 20.0, 30.0, 60.0))
+        inside = (self.lats >= -10) & (self.lats <= 30) & (self.lons >= 20) & (self.lons <= 60)
+        assert points.tolist() == np.flatnonzero(inside).tolist()
+
+    def test_within_across_antimeridian(self):
+        points = self.index.within((-20.0, 170.0, 20.0, -170.0))
+        inside = (np.abs(self.lats) <= 20) & (np.abs(self.lons) >= 170)
+        assert points.tolist() == np.flatnonzero(inside).tolist()
+
+    def test_within_longitudes_over_180(self):
+        points = self.index.within((-20.0, 170.0, 20.0, 190.0))
+        assert points.tolist() == self.index.within((-20.0, 170.0, 20.0, -170.0)).tolist()
+
+    def test_within_globe(self):
+        assert self.index.within((-90.0, -180.0, 90.0, 180.0)).tolist() == list(range(2000))
+
+
+class TestDecoderSpatial:
+    def setup_method(self, method):
+        tree = make_tree([(0.5, [179.0, -179.5]), (1.0, [179.5, 0.0, 10.0])])
+        self.decoder = Covjsonkit().decode(encode(tree))
+
+    def test_spatial_index(self):
+        index = self.decoder.spatial_index
+        assert index is self.decoder.spatial_index
+        assert index.lats.tolist() == [0.5, 0.5, 1.0, 1.0, 1.0]
+        assert index.lons.tolist() == [179.0, -179.5, 179.5, 0.0, 10.0]
+
+    def test_nearest(self):
+        points, values = self.decoder.nearest(1.0, -180.0, k=2)
+        assert points.tolist() == [2, 1]
+        assert set(values) == set(self.decoder.parameters)
+        for parameter, block in values.items():
+            assert block.shape == (len(self.decoder.coverages), 2)
+            for coverage, row in zip(self.decoder.coverages, block):
+                assert row.tolist() == [coverage["ranges"][parameter]["values"][point] for point in points]
+
+    def test_within(self):
+        points, values = self.decoder.within((0.0, 178.0, 2.0, -178.0))
+        assert points.tolist() == [0, 1, 2]
+        for parameter, block in values.items():
+            expected = [
+                [coverage["ranges"][parameter]["values"][point] for point in points]
+                for coverage in self.decoder.coverages
+            ]
+            assert block.tolist() == expected
+
+    def test_different_points(self):
+        self.decoder.coverages[1]["domain"] = {
+            "type": "Domain",
+            "axes": {"composite": {"values": [[0.0, 0.0, 0.0]] * 5}},
+        }
+        with pytest.raises(ValueError):
+            self.decoder.spatial_index
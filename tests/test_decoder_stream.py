@@ -0,0 +1,132 @@
+import copy
+import io
+
+import orjson
+import pytest
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.stream import CoverageStream
+from covjsonkit.encoder.writer import CoverageCollectionWriter
+
+
+def coverage(number, domain):
+    return {
+        "mars:metadata": {"number": number, "step": 0, "note": 'a "quoted" ] } string'},
+        "type": "Coverage",
+        "domain": domain,
+        "ranges": {"t": {"type": "NdArray", "dataType": "float", "shape": [1], "values": [264.93 + number]}},
+    }
+
+
+DOMAIN = {
+    "type": "Domain",
+    "axes": {
+        "t": {"values": ["2017-01-01T00:00:00Z"]},
+        "composite": {"dataType": "tuple", "coordinates": ["x", "y", "z"], "values": [[1, 20, 1]]},
+    },
+}
+
+COVJSON = {
+    "type": "CoverageCollection",
+    "domainType": "MultiPoint",
+    "coverages": [coverage(number, copy.deepcopy(DOMAIN)) for number in range(3)],
+    "referencing": [{"coordinates": ["x", "y", "z"], "system": {"type": "GeographicCRS"}}],
+    "parameters": {"t": {"type": "Parameter", "unit": {"symbol": "K"}, "observedProperty": {"id": "t"}}},
+}
+
+
+class TestCoverageStream:
+    def setup_method(self, method):
+        self.data = orjson.dumps(COVJSON)
+
+    def test_header(self):
+        stream = CoverageStream(self.data)
+        assert stream.type == "CoverageCollection"
+        assert stream.domainType == "MultiPoint"
+        assert stream.parameters == ["t"]
+        assert stream.coordinates == ["x", "y", "z"]
+        assert "coverages" not in stream.covjson
+        assert stream.get_parameter_metadata("t")["unit"]["symbol"] == "K"
+
+    def test_coverages(self):
+        assert list(CoverageStream(self.data)) == COVJSON["coverages"]
+        # Iterating again starts over
+        stream = CoverageStream(bytearray(self.data))
+        assert list(stream) == list(stream)
+
+    def test_whitespace(self):
+        data = orjson.dumps(COVJSON, option=orjson.OPT_INDENT_2)
+        stream = CoverageStream(memoryview(data))
+        assert stream.parameters == ["t"]
+        assert list(stream) == COVJSON["coverages"]
+
+    def test_nested_arrays(self):
+        # Only arrays of numbers, or of arrays of numbers, are skipped whole
+        covjson = copy.deepcopy(COVJSON)
+        nested = [[1, [2]], [[3]], [], [[]], [[4, 5], [6]], [["a]]"], [7]], [1, "]"], [{"b": [8]}]]
+        for number, value in enumerate(nested):
+            covjson["coverages"][0]["mars:metadata"][f"nested{number}"] = value
+        covjson["coverages"][1]["ranges"]["t"]["values"] = []
+        assert list(CoverageStream(orjson.dumps(covjson))) == covjson["coverages"]
+
+    def test_sources(self, tmp_path):
+        path = tmp_path / "covjson.json"
+        path.write_bytes(self.data)
+        with CoverageStream(path) as stream:
+            assert list(stream) == COVJSON["coverages"]
+        with open(path, "rb") as f, CoverageStream(f) as stream:
+            assert list(stream) == COVJSON["coverages"]
+        with open(path) as f, CoverageStream(f) as stream:
+            assert list(stream) == COVJSON["coverages"]
+        assert list(CoverageStream(io.BytesIO(self.data))) == COVJSON["coverages"]
+        assert list(CoverageStream(io.StringIO(self.data.decode()))) == COVJSON["coverages"]
+
+    def test_empty_collection(self):
+        covjson = dict(COVJSON, coverages=[])
+        assert list(CoverageStream(orjson.dumps(covjson))) == []
+
+    def test_not_a_collection(self):
+        with pytest.raises(TypeError):
+            CoverageStream(orjson.dumps({"type": "Coverage", "domain": DOMAIN}))
+        with pytest.raises(TypeError):
+            CoverageStream(42)
+        with pytest.raises(ValueError):
+            CoverageStream(b"")
+
+    def test_truncated(self):
+        with pytest.raises(ValueError):
+            list(CoverageStream(self.data[: len(self.data) // 2]))
+
+    def test_shared_domains(self):
+        covjson = copy.deepcopy(COVJSON)
+        covjson["coverages"][0]["domain"]["id"] = "#domain-0"
+        for shared in covjson["coverages"][1:]:
+            shared["domain"] = "#domain-0"
+        domains = [coverage["domain"] for coverage in CoverageStream(orjson.dumps(covjson))]
+        assert domains[0]["axes"] == DOMAIN["axes"]
+        assert domains[1] is domains[0] and domains[2] is domains[0]
+
+        covjson["coverages"][0]["domain"] = copy.deepcopy(DOMAIN)
+        with pytest.raises(ValueError):
+            list(CoverageStream(orjson.dumps(covjson)))
+
+    def test_batches(self):
+        stream = Covjsonkit().stream(self.data)
+        batches = list(stream.batches(2))
+        assert [len(batch) for batch in batches] == [2, 1]
+        decoder = stream.decode(batches[0])
+        assert decoder.parameters == ["t"]
+        assert [metadata["number"] for metadata in decoder.mars_metadata] == [0, 1]
+
+    def test_encoder_stream(self):
+        # The streaming writer puts the header before the coverages
+        chunks = []
+        writer = CoverageCollectionWriter(
+            {key: value for key, value in COVJSON.items() if key != "coverages"}, chunks.append
+        )
+        for item in COVJSON["coverages"]:
+            writer.append(item)
+        writer.close()
+        stream = CoverageStream(b"".join(chunks))
+        assert stream.parameters == ["t"]
+        assert list(stream) == COVJSON["coverages"]
@@ -0,0 +1,183 @@
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.decoder.Path import Path
+from covjsonkit.decoder.TimeSeries import TimeSeries
+
+
+def series(number):
+    return {
+        "mars:metadata": {"number": number, "Forecast date": "2024-01-01T00:00:00Z"},
+        "type": "Coverage",
+        "domain": {
+            "type": "Domain",
+            "axes": {
+                "x": {"values": [10.0]},
+                "y": {"values": [20.0]},
+                "z": {"values": [0]},
+                "t": {"start": "2024-01-01T00:00:00Z", "stop": "2024-01-01T12:00:00Z", "num": 3},
+            },
+        },
+        "ranges": {"u": {"type": "NdArray", "shape": [3], "axisNames": ["u"], "values": [number, number + 1, None]}},
+    }
+
+
+def trajectory(number, date="2024-01-01T00:00:00Z"):
+    return {
+        "mars:metadata": {"number": number, "Forecast date": date},
+        "type": "Coverage",
+        "domain": {
+            "type": "Domain",
+            "axes": {
+                "composite": {
+                    "dataType": "tuple",
+                    "coordinates": ["t", "x", "y", "z"],
+                    "values": [[0, 10.0, 20.0, 0], [6, 10.5, 21.0, 0], [12, 11.0, 22.0, 0]],
+                }
+            },
+        },
+        "ranges": {
+            "u": {"type": "NdArray", "shape": [3], "axisNames": ["u"], "values": [number, number + 1, number + 2]}
+        },
+    }
+
+
+POINTS = [(10.0, [20, 21, 22]), (10.5, [179.5, -179.5])]
+
+
+class TestSubset:
+    def setup_method(self, method):
+        self.decoder = Covjsonkit().decode(encode(make_tree(POINTS)))
+
+    def test_coverages(self):
+        subset = self.decoder.subset(numbers=1, steps=[6])
+        assert [coverage["mars:metadata"]["number"] for coverage in subset["coverages"]] == [1]
+        assert subset["coverages"][0]["mars:metadata"]["step"] == 6
+        assert subset["coverages"][0]["ranges"] is not self.decoder.coverages[3]["ranges"]
+        # Ranges that are not cut are shared
+        assert subset["coverages"][0]["ranges"]["2t"] is self.decoder.coverages[3]["ranges"]["2t"]
+
+    def test_parameters(self):
+        subset = self.decoder.subset(parameters="2t")
+        assert list(subset["parameters"]) == ["2t"]
+        assert all(list(coverage["ranges"]) == ["2t"] for coverage in subset["coverages"])
+        with pytest.raises(KeyError):
+            self.decoder.subset(parameters=["tp"])
+
+    def test_bbox(self):
+        subset = self.decoder.subset(bbox=(10.0, 20.5, 11.0, 22.0))
+        assert len(subset["coverages"]) == 4
+        for coverage, original in zip(subset["coverages"], self.decoder.coverages):
+            assert coverage["domain"]["axes"]["composite"]["values"] == [[10.0, 21, 0], [10.0, 22, 0]]
+            for parameter, range in coverage["ranges"].items():
+                assert range["shape"] == [2]
+                assert range["values"] == original["ranges"][parameter]["values"][1:3]
+
+    def test_arrays(self):
+        # Encoded collections keep ranges as arrays
+        encoder = Covjsonkit({"param_db": "ecmwf"}).encode("CoverageCollection", "BoundingBox")
+        decoder = Covjsonkit().decode(encoder.from_polytope(make_tree(POINTS)))
+        subset = decoder.subset(bbox=(10.0, 20.5, 11.0, 22.0))
+        coverage = subset["coverages"][0]
+        assert coverage["domain"]["axes"]["composite"]["values"] == [[10.0, 21, 0], [10.0, 22, 0]]
+        expected = decoder.coverages[0]["ranges"]["2t"]["values"][1:3]
+        assert coverage["ranges"]["2t"]["values"].tolist() == expected.tolist()
+
+    def test_bbox_across_antimeridian(self):
+        subset = self.decoder.subset(bbox=(0, 179, 20, -179))
+        composite = subset["coverages"][0]["domain"]["axes"]["composite"]["values"]
+        assert [point[1] for point in composite] == [179.5, -179.5]
+
+    def test_no_points(self):
+        subset = self.decoder.subset(bbox=(-50, 0, -40, 10))
+        assert subset["coverages"] == []
+        assert Covjsonkit().decode(subset).coverages == []
+
+    def test_decode(self):
+        subset = self.decoder.subset(numbers=0, bbox=(10.0, 20.5, 11.0, 22.0))
+        ds = Covjsonkit().decode(subset).to_xarray()
+        expected = self.decoder.to_xarray().sel(number=[0]).isel(points=[1, 2])
+        assert np.array_equal(ds["2t"].values, expected["2t"].values)
+
+    def test_as_bytes(self):
+        data = self.decoder.subset(steps=0, bbox=(10.0, 20.5, 11.0, 22.0), as_bytes=True)
+        assert isinstance(data, bytes)
+        subset = orjson.loads(data)
+        assert len(subset["coverages"]) == 2
+        assert subset["coverages"][0]["domain"]["axes"]["composite"]["values"] == [[10.0, 21, 0], [10.0, 22, 0]]
+
+    def test_shared_domains(self):
+        decoder = Covjsonkit().decode(encode(make_tree(POINTS), shared_domain=True))
+        subset = decoder.subset(steps=6, bbox=(10.0, 20.5, 11.0, 22.0))
+        first, second = subset["coverages"]
+        assert len(first["domain"]["axes"]["composite"]["values"]) == 2
+        assert second["domain"] == first["domain"]["id"]
+        data = decoder.subset(steps=6, bbox=(10.0, 20.5, 11.0, 22.0), as_bytes=True)
+        assert len(Covjsonkit().decode(data).coverages) == 2
+
+
+class TestSubsetFeatures:
+    def test_time_series(self):
+        decoder = TimeSeries(
+            {
+                "type": "CoverageCollection",
+                "domainType": "PointSeries",
+                "coverages": [series(0), series(1)],
+                "referencing": [],
+                "parameters": {"u": {"type": "Parameter", "observedProperty": {"id": "u"}}},
+            }
+        )
+        subset = decoder.subset(numbers=[1], time_range=("2024-01-01T06:00:00Z", None))
+        (coverage,) = subset["coverages"]
+        assert coverage["domain"]["axes"]["t"] == {"values": ["2024-01-01T06:00:00Z", "2024-01-01T12:00:00Z"]}
+        assert coverage["ranges"]["u"]["values"] == [2, None]
+        assert coverage["ranges"]["u"]["shape"] == [2]
+        assert decoder.subset(time_range=(None, "2023-12-31"))["coverages"] == []
+        assert decoder.subset(bbox=(0, 0, 5, 5))["coverages"] == []
+
+    def test_path(self):
+        decoder = Path(
+            {
+                "type": "CoverageCollection",
+                "domainType": "Trajectory",
+                "coverages": [trajectory(0), trajectory(1, date="2024-01-02T00:00:00Z")],
+                "referencing": [],
+                "parameters": {"u": {"type": "Parameter", "observedProperty": {"id": "u"}}},
+            }
+        )
+        # The t of a point is its step, so it is matched as forecast date plus t hours
+        subset = decoder.subset(time_range=("2024-01-01T06:00:00Z", "2024-01-02T00:00:00Z"))
+        first, second = subset["coverages"]
+        assert [point[0] for point in first["domain"]["axes"]["composite"]["values"]] == [6, 12]
+        assert first["ranges"]["u"]["values"] == [1, 2]
+        assert [point[0] for point in second["domain"]["axes"]["composite"]["values"]] == [0]
+        assert second["ranges"]["u"]["values"] == [1]
+        subset = decoder.subset(time_range=("2024-01-01T03:00:00Z", None), bbox=(10.8, 0, 12, 30))
+        assert [len(coverage["domain"]["axes"]["composite"]["values"]) for coverage in subset["coverages"]] == [1, 1]
+
+    def test_time_range_per_coverage(self):
+        decoder = Covjsonkit().decode(encode(make_tree(POINTS)))
+        assert len(decoder.subset(time_range=("2024-01-01", "2024-01-01T12:00:00"))["coverages"]) == 4
+        assert decoder.subset(time_range=(pd.Timestamp("2024-01-02"), None))["coverages"] == []
+        # Coverages are matched on their valid time, forecast date plus step
+        subset = decoder.subset(time_range=("2024-01-01T03:00:00Z", None))
+        assert [coverage["mars:metadata"]["step"] for coverage in subset["coverages"]] == [6, 6]
+        assert decoder.subset(time_range=(None, "2024-01-01T05:00:00Z"), steps=6)["coverages"] == []
+
+    def test_grid(self):
+        decoder = Covjsonkit().decode(encode(make_tree([(10.0, [20, 21, 22]), (10.5, [20, 21, 22])]), grid_domain=True))
+        subset = decoder.subset(numbers=1, bbox=(10.2, 20.5, 11.0, 22.0))
+        axes = subset["coverages"][0]["domain"]["axes"]
+        assert axes["x"]["values"].tolist() == [10.5]
+        assert axes["y"]["values"].tolist() == [21, 22]
+
+        ds = Covjsonkit().decode(subset).to_xarray()
+        expected = decoder.to_xarray().sel(number=[1], x=[10.5], y=[21, 22])
+        assert np.array_equal(ds["2d"].values, expected["2d"].values)
+
+        later = decoder.subset(time_range=("2024-01-01T06:00:00Z", None))
+        assert [coverage["mars:metadata"]["step"] for coverage in later["coverages"]] == [6, 6]
@@ -1,5 +1,8 @@
 # from earthkit import data
 
+import numpy as np
+import pandas as pd
+
 from covjsonkit.api import Covjsonkit
 
 
@@ -298,3 +301,21 @@ class TestDecoder:
         # print(type(ekds))
         # print(ekds.ls())
         pass
+
+    def test_timeseries_compact_time(self):
+        for coverage in self.covjson["coverages"]:
+            values = coverage["domain"]["axes"]["t"]["values"]
+            coverage["domain"]["axes"]["t"] = {"start": values[0], "stop": values[-1], "num": len(values)}
+            coverage["mars:metadata"]["Forecast date"] = values[0]
+        decoder = Covjsonkit().decode(self.covjson)
+
+        coordinates = decoder.get_coordinates()["t"][1]
+        assert [coord[4] for coord in coordinates] == [
+            np.datetime64("2017-01-02T00:00:00"),
+            np.datetime64("2017-01-02T06:00:00"),
+            np.datetime64("2017-01-02T12:00:00"),
+        ]
+
+        ds = decoder.to_xarray()
+        steps = pd.to_datetime(["2017-01-01 00:00:00", "2017-01-01 06:00:00", "2017-01-01 12:00:00"])
+        assert list(pd.DatetimeIndex(ds["t"].values)) == list(steps)
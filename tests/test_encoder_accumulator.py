@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from covjsonkit.encoder.accumulator import RangeAccumulator
+
+
+class TestRangeAccumulator:
+    def setup_method(self, method):
+        # Small initial capacity so that adding leaves grows the arrays
+        self.accumulator = RangeAccumulator(capacity=1)
+        # 2 numbers x 2 steps x 2 points, twice
+        self.accumulator.add("d1", [0], [0, 1], ["167"], [0, 6], list(range(8)))
+        self.accumulator.add("d1", [0], [0, 1], ["167"], [0, 6], list(range(10, 18)))
+
+    def test_rows(self):
+        assert self.accumulator["d1", 0, 0, "167", 0].tolist() == [0, 1, 10, 11]
+        assert self.accumulator["d1", 0, 1, "167", 6].tolist() == [6, 7, 16, 17]
+        assert ("d1", 0, 0, "167", 0) in self.accumulator
+        assert ("d2", 0, 0, "167", 0) not in self.accumulator
+        with pytest.raises(KeyError):
+            self.accumulator["d1", 0, 0, "168", 0]
+
+    def test_keys(self):
+        assert sorted(self.accumulator.keys()) == [
+            ("d1", 0, 0, "167", 0),
+            ("d1", 0, 0, "167", 6),
+            ("d1", 0, 1, "167", 0),
+            ("d1", 0, 1, "167", 6),
+        ]
+
+    def test_new_labels(self):
+        self.accumulator.add("d2", [500, 850], [0], ["168"], [0], [1.0, 2.0])
+        assert self.accumulator["d2", 850, 0, "168", 0].tolist() == [2.0]
+        assert self.accumulator["d1", 0, 1, "167", 6].tolist() == [6, 7, 16, 17]
+
+    def test_uneven_rows(self):
+        self.accumulator.add("d1", [0], [0], ["167"], [0], [99])
+        keys = [("d1", 0, 0, "167", 0), ("d1", 0, 1, "167", 0)]
+        assert self.accumulator.concat(keys).tolist() == [0, 1, 10, 11, 99, 4, 5, 14, 15]
+
+    def test_concat(self):
+        keys = [("d1", 0, 1, "167", 0), ("d1", 0, 0, "167", 0)]
+        assert self.accumulator.concat(keys).tolist() == [4, 5, 14, 15, 0, 1, 10, 11]
+        with pytest.raises(KeyError):
+            self.accumulator.concat(keys + [("d2", 0, 0, "167", 0)])
+        assert self.accumulator.concat([("d2", 0, 0, "167", 0)], skip_missing=True) is None
+
+    def test_take(self):
+        keys = [("d1", 0, 0, "167", 0), ("d1", 0, 0, "167", 6)]
+        assert self.accumulator.take(keys).tolist() == [0, 2]
+        assert self.accumulator.take(keys, point=3).tolist() == [11, 13]
+
+    def test_remove(self):
+        self.accumulator.remove(("d1", 0, 0, "167", 0))
+        assert ("d1", 0, 0, "167", 0) not in self.accumulator
+        assert ("d1", 0, 0, "167", 6) in self.accumulator
+
+    def test_missing_values(self):
+        self.accumulator.add("d2", [0], [0], ["167"], [0], [1.0, None])
+        values = self.accumulator["d2", 0, 0, "167", 0]
+        assert values[0] == 1.0 and np.isnan(values[1])
+
+    def test_groups(self):
+        labels = {"date": ["d1"], "level": [0], "number": [1, 0], "param": ["167"], "step": [0, 6]}
+        groups = list(self.accumulator.groups(labels, ("date", "number"), ("step", "level")))
+        assert [group for group, _ in groups] == [{"date": "d1", "number": 1}, {"date": "d1", "number": 0}]
+        assert groups[0][1]["167"].tolist() == [4, 5, 14, 15, 6, 7, 16, 17]
+
+        series = list(self.accumulator.groups(labels, ("date", "level", "number"), ("step",), point=1))
+        assert series[1][1]["167"].tolist() == [1, 3]
+
+    def test_sparse_rows(self):
+        # A path: each waypoint has its own step and level, so only their rows are stored
+        accumulator = RangeAccumulator()
+        for i in range(3):
+            accumulator.add("d1", [1000 - i], [0], ["167", "168"], [i], [i, 10 + i])
+        assert len(accumulator.rows) == 6
+        assert accumulator.data.shape[0] < 3 * 3 * 2
+
+        labels = {"date": ["d1"], "level": [1000, 999, 998], "number": [0], "param": ["167", "168"], "step": [0, 1, 2]}
+        assert not accumulator.is_dense(labels)
+        ((group, values),) = accumulator.groups(labels, ("date", "number"), ("step", "level"), skip_missing=True)
+        assert group == {"date": "d1", "number": 0}
+        assert values["167"].tolist() == [0, 1, 2]
+        assert values["168"].tolist() == [10, 11, 12]
+
+    def test_groups_missing_rows(self):
+        self.accumulator.remove(("d1", 0, 0, "167", 6))
+        labels = {"date": ["d1"], "level": [0], "number": [0], "param": ["167"], "step": [0, 6]}
+        with pytest.raises(KeyError):
+            list(self.accumulator.groups(labels, ("date", "number"), ("step", "level")))
+        ((_, values),) = self.accumulator.groups(labels, ("date", "number"), ("step", "level"), skip_missing=True)
+        assert values["167"].tolist() == [0, 1, 10, 11]
@@ -0,0 +1,97 @@
+import numpy as np
+import orjson
+import pytest
+import xarray as xr
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.encoder.polygon import contains, polygons
+
+SQUARE_WITH_HOLE = "POLYGON ((-1 0, 2 0, 2 2, -1 2, -1 0), (0.9 0.9, 1.2 0.9, 1.2 1.2, 0.9 1.2, 0.9 0.9))"
+
+
+class GeoInterface:
+    def __init__(self, geometry):
+        self.__geo_interface__ = geometry
+
+
+class TestPolygons:
+    def test_polygon(self):
+        (rings,) = polygons(SQUARE_WITH_HOLE)
+        assert len(rings) == 2
+        assert rings[0].tolist() == [[-1, 0], [2, 0], [2, 2], [-1, 2], [-1, 0]]
+
+    def test_multipolygon(self):
+        parts = polygons("MULTIPOLYGON Z (((0 0 1, 1 0 1, 1 1 1, 0 0 1)), ((5 5 0, 6 5 0, 6 6 0)))")
+        assert [len(rings) for rings in parts] == [1, 1]
+        # Rings are closed and only keep lon and lat
+        assert parts[1][0].tolist() == [[5, 5], [6, 5], [6, 6], [5, 5]]
+
+    def test_empty(self):
+        assert polygons("POLYGON EMPTY") == []
+
+    def test_geo_interface(self):
+        geometry = {"type": "MultiPolygon", "coordinates": [[[[0, 0], [1, 0], [1, 1], [0, 0]]]]}
+        assert len(polygons(GeoInterface(geometry))) == 1
+        collection = {"type": "FeatureCollection", "features": [{"type": "Feature", "geometry": geometry}] * 2}
+        assert len(polygons(collection)) == 2
+        assert len(polygons([SQUARE_WITH_HOLE, geometry])) == 2
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            polygons("LINESTRING (0 0, 1 1)")
+        with pytest.raises(ValueError):
+            polygons("POLYGON ((0 0, 1 0, 1 1, 0 0)")
+        with pytest.raises(TypeError):
+            polygons(42)
+
+
+class TestContains:
+    def test_holes(self):
+        lons = [0.5, 1.0, 1.5, 3.0, -0.5]
+        lats = [0.5, 1.0, 1.5, 1.0, 1.9]
+        assert contains(SQUARE_WITH_HOLE, lons, lats).tolist() == [True, False, True, False, True]
+
+    def test_multipolygon(self):
+        geometry = "MULTIPOLYGON (((0 0, 1 0, 1 1, 0 1, 0 0)), ((10 10, 11 10, 11 11, 10 11, 10 10)))"
+        assert contains(geometry, [0.5, 10.5, 5.0], [0.5, 10.5, 5.0]).tolist() == [True, True, False]
+
+    def test_longitude_range(self):
+        assert contains(SQUARE_WITH_HOLE, [359.5, -360.5, 358.0], [0.5, 0.5, 0.5]).tolist() == [True, True, False]
+
+    def test_against_shapely(self):
+        shapely = pytest.importorskip("shapely")
+        rng = np.random.default_rng(0)
+        geometry = shapely.Point(0, 0).buffer(10).difference(shapely.Point(2, 2).buffer(3))
+        lons, lats = rng.uniform(-12, 12, (2, 5000))
+        expected = shapely.contains_xy(geometry, lons, lats)
+        assert (contains(geometry, lons, lats) == expected).all()
+        assert (contains(geometry.wkt, lons, lats) == expected).all()
+
+
+class TestFromXarray:
+    def setup_method(self, method):
+        self.dataset = xr.Dataset(
+            {"167": ("points", np.arange(6, dtype=np.float64))},
+            coords=dict(
+                points=("points", np.arange(6)),
+                x=("points", [0.5, 1.0, 1.5, 5.0, 0.5, 1.5]),
+                y=("points", [0.5, 1.0, 1.5, 5.0, 359.5, -1.0]),
+            ),
+            attrs={"date": ["2017-01-01T00:00:00Z"], "number": 0},
+        )
+
+    @pytest.mark.parametrize("feature", ["polygon", "shapefile"])
+    def test_polygon(self, feature):
+        encoder = Covjsonkit({"param_db": "ecmwf"}).encode("CoverageCollection", feature)
+        encoder.from_xarray(self.dataset, polygon=SQUARE_WITH_HOLE)
+        (coverage,) = orjson.loads(encoder.get_json())["coverages"]
+        # x is the latitude and y the longitude of each point
+        assert coverage["domain"]["axes"]["composite"]["values"] == [[0.5, 0.5], [1.5, 1.5], [0.5, 359.5], [1.5, -1.0]]
+        assert coverage["ranges"]["2t"]["values"] == [0.0, 2.0, 4.0, 5.0]
+        assert coverage["ranges"]["2t"]["shape"] == [4]
+
+    def test_without_polygon(self):
+        encoder = Covjsonkit({"param_db": "ecmwf"}).encode("CoverageCollection", "polygon")
+        encoder.from_xarray(self.dataset)
+        (coverage,) = orjson.loads(encoder.get_json())["coverages"]
+        assert len(coverage["domain"]["axes"]["composite"]["values"]) == 6
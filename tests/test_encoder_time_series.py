@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from covjson_pydantic.coverage import CoverageCollection
 
 from covjsonkit.api import Covjsonkit
+from covjsonkit.encoder.table import time_axis
 
 
 def get_timestamps(start_dt, end_dt, delta):
@@ -237,3 +238,20 @@ class TestEncoder:
     #    ds = xr.open_dataset("new_timeseries.nc")
     #    encoder = Covjsonkit().encode("CoverageCollection", "PointSeries")
     #    encoder.from_xarray(ds)
+
+    def test_compact_time_axis(self):
+        date = "2017-01-01 00:00:00Z"
+        assert time_axis(date, [0, 6, 12], compact=True) == {
+            "start": "2017-01-01T00:00:00Z",
+            "stop": "2017-01-01T12:00:00Z",
+            "num": 3,
+        }
+        assert time_axis(date, [0, 6, 18], compact=True) == {
+            "values": ["2017-01-01T00:00:00Z", "2017-01-01T06:00:00Z", "2017-01-01T18:00:00Z"]
+        }
+        assert "values" in time_axis(date, [0, 6, 12])
+
+        encoder = Covjsonkit().encode("CoverageCollection", "PointSeries")
+        coverage = {"domain": {}}
+        encoder.add_domain(coverage, {"x": [3], "y": [7], "z": [1], "t": time_axis(date, [0, 6, 12], compact=True)})
+        assert coverage["domain"]["axes"]["t"]["num"] == 3
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from covjsonkit.encoder.valid_time import (
+    iso_format,
+    step_offsets,
+    valid_time_grid,
+    valid_times,
+)
+
+
+def legacy_valid_time(date, step):
+    date_format = "%Y%m%dT%H%M%S"
+    start_time = datetime.strptime(pd.Timestamp(date).strftime(date_format), date_format)
+    return (start_time + timedelta(hours=int(step))).isoformat() + "Z"
+
+
+class TestValidTime:
+    def test_matches_legacy(self):
+        date = "2024-01-01 12:00:00Z"
+        steps = [0, 1, 6, 24, 240, 8760]
+        assert iso_format(valid_times(date, steps)) == [legacy_valid_time(date, step) for step in steps]
+        assert iso_format(valid_times(date, ["6"])) == ["2024-01-01T18:00:00Z"]
+
+    def test_step_offsets(self):
+        assert step_offsets([0.5, 1]).tolist() == [timedelta(minutes=30), timedelta(hours=1)]
+        assert step_offsets([pd.Timedelta(minutes=15)]).tolist() == [timedelta(minutes=15)]
+        assert step_offsets(np.array([90], dtype="timedelta64[m]")).tolist() == [timedelta(minutes=90)]
+
+    def test_grid(self):
+        times = valid_time_grid(["2024-01-01", "2024-01-02"], [0, 12])
+        assert times.shape == (2, 2)
+        assert iso_format(times) == [
+            "2024-01-01T00:00:00Z",
+            "2024-01-01T12:00:00Z",
+            "2024-01-02T00:00:00Z",
+            "2024-01-02T12:00:00Z",
+        ]
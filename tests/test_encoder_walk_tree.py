@@ -0,0 +1,94 @@
+import pandas as pd
+from trees import Node
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.encoder.accumulator import RangeAccumulator
+
+
+class TestWalkTree:
+    def setup_method(self, method):
+        # 2 params x 2 steps x 2 longitudes per latitude
+        self.tree = Node(
+            "root",
+            [None],
+            [
+                Node(
+                    "class",
+                    ["od"],
+                    [
+                        Node(
+                            "date",
+                            [pd.Timestamp("20240101")],
+                            [
+                                Node(
+                                    "param",
+                                    ["167", "168"],
+                                    [
+                                        Node(
+                                            "step",
+                                            [0, 6],
+                                            [
+                                                Node(
+                                                    "latitude",
+                                                    [10.0],
+                                                    [Node("longitude", [20, 21], result=list(range(8)))],
+                                                ),
+                                                Node(
+                                                    "latitude",
+                                                    [11.0],
+                                                    [Node("longitude", [20, 21], result=list(range(10, 18)))],
+                                                ),
+                                            ],
+                                        )
+                                    ],
+                                )
+                            ],
+                        )
+                    ],
+                )
+            ],
+        )
+
+    def test_walk_tree(self):
+        encoder = Covjsonkit().encode("CoverageCollection", "BoundingBox")
+        fields = {"lat": 0, "param": 0, "number": [0], "step": 0, "dates": [], "levels": [0]}
+        coords, mars_metadata, accumulator = {}, {}, RangeAccumulator()
+
+        encoder.walk_tree(self.tree, fields, coords, mars_metadata, accumulator)
+
+        date = "2024-01-01 00:00:00Z"
+        assert fields["dates"] == [date]
+        assert fields["param"] == ("167", "168")
+        assert fields["step"] == (0, 6)
+        assert mars_metadata == {"class": "od", "Forecast date": "2024-01-01 00:00:00", "step": 0}
+        assert coords[date] == [(10.0, (20, 21)), (11.0, (20, 21))]
+        assert {key: accumulator[key].tolist() for key in accumulator.keys()} == {
+            (date, 0, 0, "167", 0): [0.0, 1.0, 10.0, 11.0],
+            (date, 0, 0, "167", 6): [2.0, 3.0, 12.0, 13.0],
+            (date, 0, 0, "168", 0): [4.0, 5.0, 14.0, 15.0],
+            (date, 0, 0, "168", 6): [6.0, 7.0, 16.0, 17.0],
+        }
+
+    def test_walk_tree_does_not_modify_tree(self):
+        encoder = Covjsonkit().encode("CoverageCollection", "BoundingBox")
+        fields = {"lat": 0, "param": 0, "number": [0], "step": 0, "dates": [], "levels": [0]}
+        encoder.walk_tree(self.tree, fields, {}, {}, RangeAccumulator())
+
+        leaf = self.tree.children[0].children[0].children[0].children[0].children[0].children[0]
+        assert leaf.values == (20, 21)
+        assert leaf.result == list(range(8))
+
+    def test_flatten(self):
+        encoder = Covjsonkit().encode("CoverageCollection", "BoundingBox")
+        table = encoder.flatten(self.tree)
+
+        date = "2024-01-01 00:00:00Z"
+        assert table.dates == [date]
+        assert table.params == ("167", "168")
+        assert table.steps == (0, 6)
+        assert table.points[date].tolist() == [[10.0, 20.0], [10.0, 21.0], [11.0, 20.0], [11.0, 21.0]]
+        assert table.composite(date)[1] == [10.0, 21.0, 0]
+
+        group, values = next(table.groups(("date", "number", "step"), ("level",)))
+        assert table.metadata(group) == {"class": "od", "Forecast date": date, "step": 0, "number": 0}
+        assert values["168"].tolist() == [4.0, 5.0, 14.0, 15.0]
@@ -0,0 +1,48 @@
+import io
+
+import orjson
+from trees import make_tree
+
+from covjsonkit.api import Covjsonkit
+from covjsonkit.encoder.writer import CoverageCollectionWriter
+
+
+class Socket:
+    def __init__(self):
+        self.sent = []
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+
+class TestCoverageCollectionWriter:
+    def setup_method(self, method):
+        encoder = Covjsonkit().encode("CoverageCollection", "BoundingBox")
+        encoder.from_polytope(make_tree())
+        self.covjson = orjson.loads(encoder.get_json())
+
+    def encoder(self):
+        return Covjsonkit().encode("CoverageCollection", "BoundingBox")
+
+    def test_iter_json(self):
+        encoder = self.encoder()
+        chunks = list(encoder.iter_json(make_tree()))
+        assert len(chunks) == 2 * len(self.covjson["coverages"]) + 1
+        assert orjson.loads(b"".join(chunks)) == self.covjson
+        assert encoder.covjson["coverages"] == []
+
+    def test_write_json(self):
+        out = io.BytesIO()
+        self.encoder().write_json(make_tree(), out)
+        assert orjson.loads(out.getvalue()) == self.covjson
+
+        socket = Socket()
+        self.encoder().write_json(make_tree(), socket)
+        assert orjson.loads(b"".join(socket.sent)) == self.covjson
+
+    def test_empty(self):
+        out = io.BytesIO()
+        writer = CoverageCollectionWriter({"type": "CoverageCollection", "coverages": []}, out.write)
+        writer.close()
+        assert orjson.loads(out.getvalue()) == {"type": "CoverageCollection", "coverages": []}
+        assert len(writer) == 0
@@ -0,0 +1,172 @@
+import os
+import threading
+
+import pytest
+
+from covjsonkit import param_db
+from covjsonkit.api import Covjsonkit
+from covjsonkit.param_store import (
+    CompiledParamTable,
+    SqliteParamTable,
+    build_sqlite_param_db,
+    compile_table,
+    json_table_path,
+)
+
+
+class TestParamDB:
+    def setup_method(self, method):
+        param_db.clear_param_db_cache()
+
+    def teardown_method(self, method):
+        param_db.clear_param_db_cache()
+
+    def test_table_is_cached(self):
+        params = param_db.get_param_db_table("ecmwf", "param")
+        assert params["167"]["shortname"] == "2t"
+        assert param_db.get_param_db_table("ecmwf", "param") is params
+
+    def test_cache_keyed_by_param_db(self):
+        ecmwf = param_db.get_param_db_table("ecmwf", "param")
+        dwd = param_db.get_param_db_table("dwd", "param")
+        assert ecmwf is not dwd
+
+    def test_encoders_share_tables(self):
+        encoder1 = Covjsonkit().encode("CoverageCollection", "BoundingBox")
+        encoder2 = Covjsonkit().encode("CoverageCollection", "PointSeries")
+        assert encoder1.params is encoder2.params
+        assert encoder1.units is encoder2.units
+        assert encoder1.param_ids is encoder2.param_ids
+
+    def test_clear_param_db_cache(self):
+        params = param_db.get_param_db_table("ecmwf", "param")
+        units = param_db.get_param_db_table("dwd", "unit")
+        param_db.clear_param_db_cache("ecmwf")
+        assert param_db.get_param_db_table("ecmwf", "param") is not params
+        assert param_db.get_param_db_table("dwd", "unit") is units
+
+    def test_reload_param_db(self):
+        params = param_db.get_param_db_table("ecmwf", "param")
+        param_db.reload_param_db("ecmwf")
+        reloaded = param_db.get_param_db_table("ecmwf", "param")
+        assert reloaded is not params
+        assert reloaded == params
+
+    def test_concurrent_loads(self):
+        tables = []
+
+        def load():
+            tables.append(param_db.get_param_db_table("ecmwf", "unit"))
+
+        threads = [threading.Thread(target=load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(table is tables[0] for table in tables)
+
+
+class TestCompiledParamTable:
+    def setup_method(self, method):
+        param_db.clear_param_db_cache()
+
+    def teardown_method(self, method):
+        param_db.clear_param_db_cache()
+
+    def test_lookup(self, tmp_path):
+        params = param_db.get_param_db_table("ecmwf", "param")
+        path = str(tmp_path / "param.bin")
+        compile_table(params, path)
+
+        table = CompiledParamTable(path)
+        assert len(table) == len(params)
+        assert table["167"] == params["167"]
+        assert table[167] == params["167"]
+        assert "167" in table
+        assert "not-a-param" not in table
+        with pytest.raises(KeyError):
+            table["not-a-param"]
+        assert sorted(table) == sorted(params)
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "param.bin"
+        path.write_bytes(b"not a compiled table")
+        with pytest.raises(ValueError):
+            CompiledParamTable(str(path))
+
+    def test_loader_prefers_compiled_table(self, tmp_path, monkeypatch):
+        units = param_db.get_param_db_table("ecmwf", "unit")
+        compile_table(units, str(tmp_path / "unit.bin"), json_table_path("ecmwf", "unit"))
+        param_db.clear_param_db_cache()
+
+        monkeypatch.setattr(param_db, "compiled_table_path", lambda db, table: str(tmp_path / f"{table}.bin"))
+        compiled = param_db.get_param_db_table("ecmwf", "unit")
+        assert isinstance(compiled, CompiledParamTable)
+        assert compiled["2"] == units["2"]
+
+        # No compiled file for this table, so the JSON source is used
+        params = param_db.get_param_db_table("ecmwf", "param")
+        assert isinstance(params, dict)
+
+    def test_loader_ignores_stale_table(self, tmp_path, monkeypatch):
+        source = tmp_path / "unit.json"
+        source.write_text('{"2": {"name": "Kelvin"}}')
+        monkeypatch.setattr(param_db, "json_table_path", lambda db, table: str(tmp_path / f"{table}.json"))
+        monkeypatch.setattr(param_db, "compiled_table_path", lambda db, table: str(tmp_path / f"{table}.bin"))
+        compile_table({"2": {"name": "Kelvin"}}, str(tmp_path / "unit.bin"), str(source))
+        assert isinstance(param_db.get_param_db_table("ecmwf", "unit"), CompiledParamTable)
+
+        # Copied or installed without its modification time, so still current
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        param_db.clear_param_db_cache()
+        assert isinstance(param_db.get_param_db_table("ecmwf", "unit"), CompiledParamTable)
+
+        # Edited after compiling, even to the same size, so out of date
+        source.write_text('{"2": {"name": "Kelvim"}}')
+        param_db.clear_param_db_cache()
+        assert param_db.get_param_db_table("ecmwf", "unit") == {"2": {"name": "Kelvim"}}
+
+        source.write_text('{"2": {"name": "K"}}')
+        param_db.clear_param_db_cache()
+        assert param_db.get_param_db_table("ecmwf", "unit") == {"2": {"name": "K"}}
+
+        # As is one compiled by another version
+        (tmp_path / "unit.bin").write_bytes(b"CJKP\x01\x00\x00\x00\x00\x00\x00\x00")
+        param_db.clear_param_db_cache()
+        assert param_db.get_param_db_table("ecmwf", "unit") == {"2": {"name": "K"}}
+
+
+class TestSqliteParamTable:
+    def setup_method(self, method):
+        param_db.clear_param_db_cache()
+
+    def teardown_method(self, method):
+        param_db.clear_param_db_cache()
+
+    def test_lookup(self, tmp_path):
+        path = str(tmp_path / "ecmwf.sqlite")
+        build_sqlite_param_db("ecmwf", path)
+
+        params = param_db.get_param_db_table("ecmwf", "param")
+        table = SqliteParamTable(path, "param")
+        assert len(table) == len(params)
+        assert table["167"] == params["167"]
+        assert "not-a-param" not in table
+
+        param_ids = SqliteParamTable(path, "param_id")
+        assert param_ids["2t"] == "167"
+
+    def test_encoder_with_sqlite_param_db(self, tmp_path):
+        path = str(tmp_path / "ecmwf.sqlite")
+        build_sqlite_param_db("ecmwf", path)
+
+        encoder = Covjsonkit({"param_db": path}).encode("CoverageCollection", "BoundingBox")
+        assert isinstance(encoder.params, SqliteParamTable)
+        encoder.add_parameter(167)
+        assert encoder.covjson["parameters"]["2t"]["unit"]["symbol"] == "K"
+        assert encoder.convert_param_id_to_param(167) == "2t"
+
+    def test_missing_catalogue(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            SqliteParamTable(str(tmp_path / "missing.sqlite"), "param")
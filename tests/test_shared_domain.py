@@ -0,0 +1,38 @@
+import orjson
+import pytest
+from trees import encode, make_tree
+
+from covjsonkit.api import Covjsonkit
+
+# 3 numbers x 2 params x 2 steps x 3 points
+TREE = dict(lons_by_lat=[(10.0, [20, 21, 22])], numbers=[0, 1, 2])
+
+
+class TestSharedDomain:
+    def setup_method(self, method):
+        self.inline = encode(make_tree(**TREE), shared_domain=False)
+        self.shared = encode(make_tree(**TREE), shared_domain=True)
+
+    def test_encode(self):
+        coverages = self.shared["coverages"]
+        assert len(coverages) == 6
+        assert coverages[0]["domain"]["id"] == "#domain-0"
+        assert all(coverage["domain"] == "#domain-0" for coverage in coverages[1:])
+        assert len(orjson.dumps(self.shared)) < len(orjson.dumps(self.inline))
+
+    def test_decode(self):
+        shared = Covjsonkit().decode(self.shared)
+        inline = Covjsonkit().decode(self.inline)
+        assert shared.get_coordinates()["composite"] == inline.get_coordinates()["composite"]
+        assert shared.to_xarray().equals(inline.to_xarray())
+
+    def test_input_unchanged(self):
+        decoder = Covjsonkit().decode(self.shared)
+        assert all(coverage["domain"] == "#domain-0" for coverage in self.shared["coverages"][1:])
+        assert decoder.coverages[1]["domain"] is self.shared["coverages"][0]["domain"]
+        assert decoder.covjson["coverages"][1]["ranges"] is self.shared["coverages"][1]["ranges"]
+
+    def test_unresolved_reference(self):
+        del self.shared["coverages"][0]["domain"]["id"]
+        with pytest.raises(ValueError):
+            Covjsonkit().decode(self.shared)
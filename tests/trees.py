@@ -0,0 +1,48 @@
+"""
+Polytope result trees for the tests. Nodes mimic TensorIndexTree:
+axis.name, values, children and, on the longitude leaves, result.
+"""
+
+import orjson
+import pandas as pd
+
+from covjsonkit.api import Covjsonkit
+
+
+class Axis:
+    def __init__(self, name):
+        self.name = name
+
+
+class Node:
+    def __init__(self, name, values, children=(), result=None):
+        self.axis = Axis(name)
+        self.values = tuple(values)
+        self.children = list(children)
+        self.result = result
+
+
+def make_tree(
+    lons_by_lat=((10.0, (20, 21)),), numbers=(0, 1), params=("167", "168"), steps=(0, 6), levels=None, date="20240101"
+):
+    """
+    A tree of one date with a leaf per latitude in ``lons_by_lat``. The
+    values of the i-th latitude count up from 100 * i in the order they
+    are returned, every level, number, param and step over every longitude.
+    """
+    fields = len(levels or (0,)) * len(numbers) * len(params) * len(steps)
+    leaves = [
+        Node("latitude", [lat], [Node("longitude", lons, result=[100.0 * i + v for v in range(fields * len(lons))])])
+        for i, (lat, lons) in enumerate(lons_by_lat)
+    ]
+    children = [Node("number", numbers, [Node("param", params, [Node("step", steps, leaves)])])]
+    if levels:
+        children = [Node("levelist", levels, children)]
+    return Node("root", [None], [Node("date", [pd.Timestamp(date)], children)])
+
+
+def encode(tree, feature="BoundingBox", **config):
+    """The CoverageCollection encoded from ``tree``, parsed back from its JSON."""
+    encoder = Covjsonkit({"param_db": "ecmwf", **config}).encode("CoverageCollection", feature)
+    encoder.from_polytope(tree)
+    return orjson.loads(encoder.get_json())